@@ -18,7 +18,12 @@ variable_declaration: type_name ID (ASSIGN value)? SEMI;
 statement: value_statement | throw_statement;
 throw_statement: THROW value_statement;
 value_statement: value SEMI;
-value: expression | logic;
+// A value is always parsed as logic: an expression is a logic chain without
+// operators, so there is nothing to predict. Alternatives `expression | logic`
+// would share every expression as a prefix, and adaptivePredict would have to
+// read to the end of it, falling back to full LL, to choose between them. The
+// listener turns an operator-free logic chain back into a bare Expression.
+value: logic;
 
 logic: or;
 or: and ((OR) and)*;
@@ -26,8 +31,15 @@ and: equality((AND) equality)*;
 equality: comparable ((EQ | NE) comparable)*;
 relational: expression((LT | LE | GT | GE) expression)*;
 
-comparable: relational | method_call | concept;
-concept: type_name | method_signature;
+// A method call and a plain type name are already relationals (through factor),
+// so `relational | method_call | concept` with `concept: type_name | ...` gave
+// the same input several parses and left the choice to full-context
+// prediction. Each alternative now starts with a token of its own: METHOD for
+// a method signature, anything else for a relational. A generic type name such
+// as `T<U>` cannot be told from the relational `T < U` in bounded lookahead, so
+// a concept used as a comparable is named without type arguments.
+comparable: relational | concept;
+concept: method_signature;
 method_signature: METHOD ID LPAREN params RPAREN;
 
 expression: term ((PLUS | MINUS) term)*;
@@ -10,7 +10,7 @@ else:
 
 def serializedATN():
     return [
-        4,1,26,196,2,0,7,0,2,1,7,1,2,2,7,2,2,3,7,3,2,4,7,4,2,5,7,5,2,6,7,
+        4,1,26,194,2,0,7,0,2,1,7,1,2,2,7,2,2,3,7,3,2,4,7,4,2,5,7,5,2,6,7,
         6,2,7,7,7,2,8,7,8,2,9,7,9,2,10,7,10,2,11,7,11,2,12,7,12,2,13,7,13,
         2,14,7,14,2,15,7,15,2,16,7,16,2,17,7,17,2,18,7,18,2,19,7,19,2,20,
         7,20,1,0,1,0,1,0,1,0,5,0,47,8,0,10,0,12,0,50,9,0,1,1,1,1,1,1,1,1,
@@ -18,64 +18,63 @@ def serializedATN():
         3,1,3,1,3,1,3,1,3,1,3,1,3,1,3,1,3,3,3,78,8,3,1,4,1,4,1,4,1,4,1,4,
         1,4,5,4,86,8,4,10,4,12,4,89,9,4,3,4,91,8,4,1,5,1,5,5,5,95,8,5,10,
         5,12,5,98,9,5,1,6,1,6,1,6,1,6,3,6,104,8,6,1,6,1,6,1,7,1,7,1,7,1,
-        8,1,8,1,8,1,8,1,9,1,9,3,9,117,8,9,1,10,1,10,1,11,1,11,1,11,5,11,
-        124,8,11,10,11,12,11,127,9,11,1,12,1,12,1,12,5,12,132,8,12,10,12,
-        12,12,135,9,12,1,13,1,13,1,13,5,13,140,8,13,10,13,12,13,143,9,13,
-        1,14,1,14,1,14,5,14,148,8,14,10,14,12,14,151,9,14,1,15,1,15,1,15,
-        5,15,156,8,15,10,15,12,15,159,9,15,1,16,1,16,1,16,5,16,164,8,16,
-        10,16,12,16,167,9,16,1,17,1,17,1,17,1,17,1,17,1,17,1,17,3,17,176,
-        8,17,1,18,1,18,1,18,1,18,1,18,5,18,183,8,18,10,18,12,18,186,9,18,
-        3,18,188,8,18,1,18,1,18,1,19,1,19,1,20,1,20,1,20,0,0,21,0,2,4,6,
-        8,10,12,14,16,18,20,22,24,26,28,30,32,34,36,38,40,0,4,1,0,18,19,
-        1,0,14,17,1,0,20,21,1,0,22,23,199,0,48,1,0,0,0,2,51,1,0,0,0,4,64,
-        1,0,0,0,6,67,1,0,0,0,8,90,1,0,0,0,10,96,1,0,0,0,12,99,1,0,0,0,14,
-        107,1,0,0,0,16,110,1,0,0,0,18,116,1,0,0,0,20,118,1,0,0,0,22,120,
-        1,0,0,0,24,128,1,0,0,0,26,136,1,0,0,0,28,144,1,0,0,0,30,152,1,0,
-        0,0,32,160,1,0,0,0,34,175,1,0,0,0,36,177,1,0,0,0,38,191,1,0,0,0,
-        40,193,1,0,0,0,42,47,3,2,1,0,43,47,3,6,3,0,44,47,3,12,6,0,45,47,
-        3,14,7,0,46,42,1,0,0,0,46,43,1,0,0,0,46,44,1,0,0,0,46,45,1,0,0,0,
-        47,50,1,0,0,0,48,46,1,0,0,0,48,49,1,0,0,0,49,1,1,0,0,0,50,48,1,0,
-        0,0,51,52,5,3,0,0,52,58,5,24,0,0,53,54,5,5,0,0,54,55,3,4,2,0,55,
-        56,5,6,0,0,56,59,1,0,0,0,57,59,5,9,0,0,58,53,1,0,0,0,58,57,1,0,0,
-        0,59,3,1,0,0,0,60,63,3,6,3,0,61,63,3,12,6,0,62,60,1,0,0,0,62,61,
-        1,0,0,0,63,66,1,0,0,0,64,62,1,0,0,0,64,65,1,0,0,0,65,5,1,0,0,0,66,
-        64,1,0,0,0,67,68,5,4,0,0,68,69,5,24,0,0,69,70,5,7,0,0,70,71,3,8,
-        4,0,71,77,5,8,0,0,72,73,5,5,0,0,73,74,3,10,5,0,74,75,5,6,0,0,75,
-        78,1,0,0,0,76,78,5,9,0,0,77,72,1,0,0,0,77,76,1,0,0,0,78,7,1,0,0,
-        0,79,80,3,40,20,0,80,87,5,24,0,0,81,82,5,10,0,0,82,83,3,40,20,0,
-        83,84,5,24,0,0,84,86,1,0,0,0,85,81,1,0,0,0,86,89,1,0,0,0,87,85,1,
-        0,0,0,87,88,1,0,0,0,88,91,1,0,0,0,89,87,1,0,0,0,90,79,1,0,0,0,90,
-        91,1,0,0,0,91,9,1,0,0,0,92,95,3,12,6,0,93,95,3,14,7,0,94,92,1,0,
-        0,0,94,93,1,0,0,0,95,98,1,0,0,0,96,94,1,0,0,0,96,97,1,0,0,0,97,11,
-        1,0,0,0,98,96,1,0,0,0,99,100,3,40,20,0,100,103,5,24,0,0,101,102,
-        5,11,0,0,102,104,3,30,15,0,103,101,1,0,0,0,103,104,1,0,0,0,104,105,
-        1,0,0,0,105,106,5,9,0,0,106,13,1,0,0,0,107,108,3,30,15,0,108,109,
-        5,9,0,0,109,15,1,0,0,0,110,111,5,5,0,0,111,112,3,0,0,0,112,113,5,
-        6,0,0,113,17,1,0,0,0,114,117,3,30,15,0,115,117,3,20,10,0,116,114,
-        1,0,0,0,116,115,1,0,0,0,117,19,1,0,0,0,118,119,3,22,11,0,119,21,
-        1,0,0,0,120,125,3,24,12,0,121,122,5,13,0,0,122,124,3,24,12,0,123,
-        121,1,0,0,0,124,127,1,0,0,0,125,123,1,0,0,0,125,126,1,0,0,0,126,
-        23,1,0,0,0,127,125,1,0,0,0,128,133,3,26,13,0,129,130,5,12,0,0,130,
-        132,3,26,13,0,131,129,1,0,0,0,132,135,1,0,0,0,133,131,1,0,0,0,133,
-        134,1,0,0,0,134,25,1,0,0,0,135,133,1,0,0,0,136,141,3,28,14,0,137,
-        138,7,0,0,0,138,140,3,28,14,0,139,137,1,0,0,0,140,143,1,0,0,0,141,
-        139,1,0,0,0,141,142,1,0,0,0,142,27,1,0,0,0,143,141,1,0,0,0,144,149,
-        3,30,15,0,145,146,7,1,0,0,146,148,3,30,15,0,147,145,1,0,0,0,148,
-        151,1,0,0,0,149,147,1,0,0,0,149,150,1,0,0,0,150,29,1,0,0,0,151,149,
-        1,0,0,0,152,157,3,32,16,0,153,154,7,2,0,0,154,156,3,32,16,0,155,
-        153,1,0,0,0,156,159,1,0,0,0,157,155,1,0,0,0,157,158,1,0,0,0,158,
-        31,1,0,0,0,159,157,1,0,0,0,160,165,3,34,17,0,161,162,7,3,0,0,162,
-        164,3,34,17,0,163,161,1,0,0,0,164,167,1,0,0,0,165,163,1,0,0,0,165,
-        166,1,0,0,0,166,33,1,0,0,0,167,165,1,0,0,0,168,169,5,7,0,0,169,170,
-        3,30,15,0,170,171,5,8,0,0,171,176,1,0,0,0,172,176,3,36,18,0,173,
-        176,5,24,0,0,174,176,5,25,0,0,175,168,1,0,0,0,175,172,1,0,0,0,175,
-        173,1,0,0,0,175,174,1,0,0,0,176,35,1,0,0,0,177,178,5,24,0,0,178,
-        187,5,7,0,0,179,184,3,18,9,0,180,181,5,10,0,0,181,183,3,18,9,0,182,
-        180,1,0,0,0,183,186,1,0,0,0,184,182,1,0,0,0,184,185,1,0,0,0,185,
-        188,1,0,0,0,186,184,1,0,0,0,187,179,1,0,0,0,187,188,1,0,0,0,188,
-        189,1,0,0,0,189,190,5,8,0,0,190,37,1,0,0,0,191,192,5,1,0,0,192,39,
-        1,0,0,0,193,194,5,24,0,0,194,41,1,0,0,0,21,46,48,58,62,64,77,87,
-        90,94,96,103,116,125,133,141,149,157,165,175,184,187
+        8,1,8,1,8,1,8,1,9,1,9,1,10,1,10,1,11,1,11,1,11,5,11,122,8,11,10,
+        11,12,11,125,9,11,1,12,1,12,1,12,5,12,130,8,12,10,12,12,12,133,9,
+        12,1,13,1,13,1,13,5,13,138,8,13,10,13,12,13,141,9,13,1,14,1,14,1,
+        14,5,14,146,8,14,10,14,12,14,149,9,14,1,15,1,15,1,15,5,15,154,8,
+        15,10,15,12,15,157,9,15,1,16,1,16,1,16,5,16,162,8,16,10,16,12,16,
+        165,9,16,1,17,1,17,1,17,1,17,1,17,1,17,1,17,3,17,174,8,17,1,18,1,
+        18,1,18,1,18,1,18,5,18,181,8,18,10,18,12,18,184,9,18,3,18,186,8,
+        18,1,18,1,18,1,19,1,19,1,20,1,20,1,20,0,0,21,0,2,4,6,8,10,12,14,
+        16,18,20,22,24,26,28,30,32,34,36,38,40,0,4,1,0,18,19,1,0,14,17,1,
+        0,20,21,1,0,22,23,196,0,48,1,0,0,0,2,51,1,0,0,0,4,64,1,0,0,0,6,67,
+        1,0,0,0,8,90,1,0,0,0,10,96,1,0,0,0,12,99,1,0,0,0,14,107,1,0,0,0,
+        16,110,1,0,0,0,18,114,1,0,0,0,20,116,1,0,0,0,22,118,1,0,0,0,24,126,
+        1,0,0,0,26,134,1,0,0,0,28,142,1,0,0,0,30,150,1,0,0,0,32,158,1,0,
+        0,0,34,173,1,0,0,0,36,175,1,0,0,0,38,189,1,0,0,0,40,191,1,0,0,0,
+        42,47,3,2,1,0,43,47,3,6,3,0,44,47,3,12,6,0,45,47,3,14,7,0,46,42,
+        1,0,0,0,46,43,1,0,0,0,46,44,1,0,0,0,46,45,1,0,0,0,47,50,1,0,0,0,
+        48,46,1,0,0,0,48,49,1,0,0,0,49,1,1,0,0,0,50,48,1,0,0,0,51,52,5,3,
+        0,0,52,58,5,24,0,0,53,54,5,5,0,0,54,55,3,4,2,0,55,56,5,6,0,0,56,
+        59,1,0,0,0,57,59,5,9,0,0,58,53,1,0,0,0,58,57,1,0,0,0,59,3,1,0,0,
+        0,60,63,3,6,3,0,61,63,3,12,6,0,62,60,1,0,0,0,62,61,1,0,0,0,63,66,
+        1,0,0,0,64,62,1,0,0,0,64,65,1,0,0,0,65,5,1,0,0,0,66,64,1,0,0,0,67,
+        68,5,4,0,0,68,69,5,24,0,0,69,70,5,7,0,0,70,71,3,8,4,0,71,77,5,8,
+        0,0,72,73,5,5,0,0,73,74,3,10,5,0,74,75,5,6,0,0,75,78,1,0,0,0,76,
+        78,5,9,0,0,77,72,1,0,0,0,77,76,1,0,0,0,78,7,1,0,0,0,79,80,3,40,20,
+        0,80,87,5,24,0,0,81,82,5,10,0,0,82,83,3,40,20,0,83,84,5,24,0,0,84,
+        86,1,0,0,0,85,81,1,0,0,0,86,89,1,0,0,0,87,85,1,0,0,0,87,88,1,0,0,
+        0,88,91,1,0,0,0,89,87,1,0,0,0,90,79,1,0,0,0,90,91,1,0,0,0,91,9,1,
+        0,0,0,92,95,3,12,6,0,93,95,3,14,7,0,94,92,1,0,0,0,94,93,1,0,0,0,
+        95,98,1,0,0,0,96,94,1,0,0,0,96,97,1,0,0,0,97,11,1,0,0,0,98,96,1,
+        0,0,0,99,100,3,40,20,0,100,103,5,24,0,0,101,102,5,11,0,0,102,104,
+        3,30,15,0,103,101,1,0,0,0,103,104,1,0,0,0,104,105,1,0,0,0,105,106,
+        5,9,0,0,106,13,1,0,0,0,107,108,3,30,15,0,108,109,5,9,0,0,109,15,
+        1,0,0,0,110,111,5,5,0,0,111,112,3,0,0,0,112,113,5,6,0,0,113,17,1,
+        0,0,0,114,115,3,20,10,0,115,19,1,0,0,0,116,117,3,22,11,0,117,21,
+        1,0,0,0,118,123,3,24,12,0,119,120,5,13,0,0,120,122,3,24,12,0,121,
+        119,1,0,0,0,122,125,1,0,0,0,123,121,1,0,0,0,123,124,1,0,0,0,124,
+        23,1,0,0,0,125,123,1,0,0,0,126,131,3,26,13,0,127,128,5,12,0,0,128,
+        130,3,26,13,0,129,127,1,0,0,0,130,133,1,0,0,0,131,129,1,0,0,0,131,
+        132,1,0,0,0,132,25,1,0,0,0,133,131,1,0,0,0,134,139,3,28,14,0,135,
+        136,7,0,0,0,136,138,3,28,14,0,137,135,1,0,0,0,138,141,1,0,0,0,139,
+        137,1,0,0,0,139,140,1,0,0,0,140,27,1,0,0,0,141,139,1,0,0,0,142,147,
+        3,30,15,0,143,144,7,1,0,0,144,146,3,30,15,0,145,143,1,0,0,0,146,
+        149,1,0,0,0,147,145,1,0,0,0,147,148,1,0,0,0,148,29,1,0,0,0,149,147,
+        1,0,0,0,150,155,3,32,16,0,151,152,7,2,0,0,152,154,3,32,16,0,153,
+        151,1,0,0,0,154,157,1,0,0,0,155,153,1,0,0,0,155,156,1,0,0,0,156,
+        31,1,0,0,0,157,155,1,0,0,0,158,163,3,34,17,0,159,160,7,3,0,0,160,
+        162,3,34,17,0,161,159,1,0,0,0,162,165,1,0,0,0,163,161,1,0,0,0,163,
+        164,1,0,0,0,164,33,1,0,0,0,165,163,1,0,0,0,166,167,5,7,0,0,167,168,
+        3,30,15,0,168,169,5,8,0,0,169,174,1,0,0,0,170,174,3,36,18,0,171,
+        174,5,24,0,0,172,174,5,25,0,0,173,166,1,0,0,0,173,170,1,0,0,0,173,
+        171,1,0,0,0,173,172,1,0,0,0,174,35,1,0,0,0,175,176,5,24,0,0,176,
+        185,5,7,0,0,177,182,3,18,9,0,178,179,5,10,0,0,179,181,3,18,9,0,180,
+        178,1,0,0,0,181,184,1,0,0,0,182,180,1,0,0,0,182,183,1,0,0,0,183,
+        186,1,0,0,0,184,182,1,0,0,0,185,177,1,0,0,0,185,186,1,0,0,0,186,
+        187,1,0,0,0,187,188,5,8,0,0,188,37,1,0,0,0,189,190,5,1,0,0,190,39,
+        1,0,0,0,191,192,5,24,0,0,192,41,1,0,0,0,20,46,48,58,62,64,77,87,
+        90,94,96,103,123,131,139,147,155,163,173,182,185
     ]
 
 class ExpressoParser ( Parser ):
@@ -833,10 +832,6 @@ class ExpressoParser ( Parser ):
             super().__init__(parent, invokingState)
             self.parser = parser
 
-        def expression(self):
-            return self.getTypedRuleContext(ExpressoParser.ExpressionContext,0)
-
-
         def logic(self):
             return self.getTypedRuleContext(ExpressoParser.LogicContext,0)
 
@@ -860,22 +855,9 @@ class ExpressoParser ( Parser ):
         localctx = ExpressoParser.ValueContext(self, self._ctx, self.state)
         self.enterRule(localctx, 18, self.RULE_value)
         try:
-            self.state = 116
-            self._errHandler.sync(self)
-            la_ = self._interp.adaptivePredict(self._input,11,self._ctx)
-            if la_ == 1:
-                self.enterOuterAlt(localctx, 1)
-                self.state = 114
-                self.expression()
-                pass
-
-            elif la_ == 2:
-                self.enterOuterAlt(localctx, 2)
-                self.state = 115
-                self.logic()
-                pass
-
-
+            self.enterOuterAlt(localctx, 1)
+            self.state = 114
+            self.logic()
         except RecognitionException as re:
             localctx.exception = re
             self._errHandler.reportError(self, re)
@@ -916,7 +898,7 @@ class ExpressoParser ( Parser ):
         self.enterRule(localctx, 20, self.RULE_logic)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 118
+            self.state = 116
             self.or_()
         except RecognitionException as re:
             localctx.exception = re
@@ -968,17 +950,17 @@ class ExpressoParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 120
+            self.state = 118
             self.and_()
-            self.state = 125
+            self.state = 123
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             while _la==13:
-                self.state = 121
+                self.state = 119
                 self.match(ExpressoParser.OR)
-                self.state = 122
+                self.state = 120
                 self.and_()
-                self.state = 127
+                self.state = 125
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
@@ -1032,17 +1014,17 @@ class ExpressoParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 128
+            self.state = 126
             self.equality()
-            self.state = 133
+            self.state = 131
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             while _la==12:
-                self.state = 129
+                self.state = 127
                 self.match(ExpressoParser.AND)
-                self.state = 130
+                self.state = 128
                 self.equality()
-                self.state = 135
+                self.state = 133
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
@@ -1102,22 +1084,22 @@ class ExpressoParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 136
+            self.state = 134
             self.relational()
-            self.state = 141
+            self.state = 139
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             while _la==18 or _la==19:
-                self.state = 137
+                self.state = 135
                 _la = self._input.LA(1)
                 if not(_la==18 or _la==19):
                     self._errHandler.recoverInline(self)
                 else:
                     self._errHandler.reportMatch(self)
                     self.consume()
-                self.state = 138
+                self.state = 136
                 self.relational()
-                self.state = 143
+                self.state = 141
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
@@ -1189,22 +1171,22 @@ class ExpressoParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 144
+            self.state = 142
             self.expression()
-            self.state = 149
+            self.state = 147
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             while (((_la) & ~0x3f) == 0 and ((1 << _la) & 245760) != 0):
-                self.state = 145
+                self.state = 143
                 _la = self._input.LA(1)
                 if not((((_la) & ~0x3f) == 0 and ((1 << _la) & 245760) != 0)):
                     self._errHandler.recoverInline(self)
                 else:
                     self._errHandler.reportMatch(self)
                     self.consume()
-                self.state = 146
+                self.state = 144
                 self.expression()
-                self.state = 151
+                self.state = 149
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
@@ -1264,22 +1246,22 @@ class ExpressoParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 152
+            self.state = 150
             self.term()
-            self.state = 157
+            self.state = 155
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             while _la==20 or _la==21:
-                self.state = 153
+                self.state = 151
                 _la = self._input.LA(1)
                 if not(_la==20 or _la==21):
                     self._errHandler.recoverInline(self)
                 else:
                     self._errHandler.reportMatch(self)
                     self.consume()
-                self.state = 154
+                self.state = 152
                 self.term()
-                self.state = 159
+                self.state = 157
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
@@ -1339,22 +1321,22 @@ class ExpressoParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 160
+            self.state = 158
             self.factor()
-            self.state = 165
+            self.state = 163
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             while _la==22 or _la==23:
-                self.state = 161
+                self.state = 159
                 _la = self._input.LA(1)
                 if not(_la==22 or _la==23):
                     self._errHandler.recoverInline(self)
                 else:
                     self._errHandler.reportMatch(self)
                     self.consume()
-                self.state = 162
+                self.state = 160
                 self.factor()
-                self.state = 167
+                self.state = 165
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
@@ -1413,34 +1395,34 @@ class ExpressoParser ( Parser ):
         localctx = ExpressoParser.FactorContext(self, self._ctx, self.state)
         self.enterRule(localctx, 34, self.RULE_factor)
         try:
-            self.state = 175
+            self.state = 173
             self._errHandler.sync(self)
-            la_ = self._interp.adaptivePredict(self._input,18,self._ctx)
+            la_ = self._interp.adaptivePredict(self._input,17,self._ctx)
             if la_ == 1:
                 self.enterOuterAlt(localctx, 1)
-                self.state = 168
+                self.state = 166
                 self.match(ExpressoParser.LPAREN)
-                self.state = 169
+                self.state = 167
                 self.expression()
-                self.state = 170
+                self.state = 168
                 self.match(ExpressoParser.RPAREN)
                 pass
 
             elif la_ == 2:
                 self.enterOuterAlt(localctx, 2)
-                self.state = 172
+                self.state = 170
                 self.method_call()
                 pass
 
             elif la_ == 3:
                 self.enterOuterAlt(localctx, 3)
-                self.state = 173
+                self.state = 171
                 self.match(ExpressoParser.ID)
                 pass
 
             elif la_ == 4:
                 self.enterOuterAlt(localctx, 4)
-                self.state = 174
+                self.state = 172
                 self.match(ExpressoParser.NUMBER)
                 pass
 
@@ -1504,31 +1486,31 @@ class ExpressoParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 177
+            self.state = 175
             self.match(ExpressoParser.ID)
-            self.state = 178
+            self.state = 176
             self.match(ExpressoParser.LPAREN)
-            self.state = 187
+            self.state = 185
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             if (((_la) & ~0x3f) == 0 and ((1 << _la) & 50331776) != 0):
-                self.state = 179
+                self.state = 177
                 self.value()
-                self.state = 184
+                self.state = 182
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
                 while _la==10:
-                    self.state = 180
+                    self.state = 178
                     self.match(ExpressoParser.COMMA)
-                    self.state = 181
+                    self.state = 179
                     self.value()
-                    self.state = 186
+                    self.state = 184
                     self._errHandler.sync(self)
                     _la = self._input.LA(1)
 
 
 
-            self.state = 189
+            self.state = 187
             self.match(ExpressoParser.RPAREN)
         except RecognitionException as re:
             localctx.exception = re
@@ -1567,7 +1549,7 @@ class ExpressoParser ( Parser ):
         self.enterRule(localctx, 38, self.RULE_placeholder)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 191
+            self.state = 189
             self.match(ExpressoParser.T__0)
         except RecognitionException as re:
             localctx.exception = re
@@ -1608,7 +1590,7 @@ class ExpressoParser ( Parser ):
         self.enterRule(localctx, 40, self.RULE_type_name)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 193
+            self.state = 191
             self.match(ExpressoParser.ID)
         except RecognitionException as re:
             localctx.exception = re
@@ -1,312 +1,319 @@
+# Every node keeps its fields in __slots__, without a per-instance __dict__.
+# Empty ops and args are the shared empty tuple rather than a fresh list each.
+#
+# Equality, hashing and repr are structural and defined once, here, by
+# nodes_equal, node_hash and node_repr, which walk the tree with an explicit
+# stack, so trees of any depth work without raising the recursion limit.
 class ASTNode:
-    pass
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return nodes_equal(self, other)
+
+    def __hash__(self):
+        return node_hash(self)
+
+    def __repr__(self):
+        return node_repr(self)
 
 
 class Program(ASTNode):
+    __slots__ = ('body',)
+
     def __init__(self, body):
         self.body = body
-    
-    def __eq__(self, value):
-        if not isinstance(value, Program):
-            return False
-        return self.body == value.body
-    
-    def __repr__(self):
-        return f"Program(body={self.body})"
 
 
 class TypeDeclaration(ASTNode):
+    __slots__ = ('name', 'body')
+
     def __init__(self, name, body):
         self.name = name
         self.body = body
-    
-    def __eq__(self, value):
-        if not isinstance(value, TypeDeclaration):
-            return False
-        return self.name == value.name and self.body == value.body
-    
-    def __repr__(self):
-        return f"TypeDeclaration(name={self.name}, body={self.body})"
 
 
 class TypeBody(ASTNode):
+    __slots__ = ('body',)
+
     def __init__(self, body):
         self.body = body
-    
-    def __eq__(self, value):
-        if not isinstance(value, TypeBody):
-            return False
-        return self.body == value.body
-    
-    def __repr__(self):
-        return f"TypeBody(body={self.body})"
 
 
 class MethodDeclaration(ASTNode):
+    __slots__ = ('name', 'params', 'body')
+
     def __init__(self, name, params, body):
         self.name = name
         self.params = params
         self.body = body
-    
-    def __eq__(self, value):
-        if not isinstance(value, MethodDeclaration):
-            return False
-        return self.name == value.name and self.params == value.params and self.body == value.body
-    
-    def __repr__(self):
-        return f"MethodDeclaration(name={self.name}, params={self.params}, body={self.body})"
 
 
 class Params(ASTNode):
+    __slots__ = ('parameters',)
+
     def __init__(self, parameters):
         self.parameters = parameters
-    
-    def __eq__(self, value):
-        if not isinstance(value, Params):
-            return False
-        return self.parameters == value.parameters
-    
-    def __repr__(self):
-        return f"Params(parameters={self.parameters})"
 
 
 class MethodBody(ASTNode):
+    __slots__ = ('body',)
+
     def __init__(self, body):
         self.body = body
-    
-    def __eq__(self, value):
-        if not isinstance(value, MethodBody):
-            return False
-        return self.body == value.body
-    
-    def __repr__(self):
-        return f"MethodBody(body={self.body})"
 
 
 class VariableDeclaration(ASTNode):
+    __slots__ = ('type', 'name', 'expression')
+
     def __init__(self, type, name, expression=None):
         self.type = type
         self.name = name
         self.expression = expression
-    
-    def __eq__(self, value):
-        if not isinstance(value, VariableDeclaration):
-            return False
-        return self.type == value.type and self.name == value.name and self.expression == value.expression
-    
-    def __repr__(self):
-        return f"VariableDeclaration(type={self.type}, name={self.name}, expression={self.expression})"
 
 class Expression(ASTNode):
+    __slots__ = ('term', 'ops')
+
     def __init__(self, term, ops=None):
         self.term = term
-        self.ops = ops or []
-
-    def __eq__(self, other):
-        if not isinstance(other, Expression):
-            return False
-        return self.term == other.term and self.ops == other.ops
-
-    def __repr__(self):
-        return f"Expression(term={self.term}, ops={self.ops})"
+        self.ops = tuple(ops) if ops else ()
 
 
 class Term(ASTNode):
+    __slots__ = ('factor', 'ops')
+
     def __init__(self, factor, ops=None):
         self.factor = factor
-        self.ops = ops or []
-
-    def __eq__(self, other):
-        if not isinstance(other, Term):
-            return False
-        return self.factor == other.factor and self.ops == other.ops
-
-    def __repr__(self):
-        return f"Term(factor={self.factor}, ops={self.ops})"
+        self.ops = tuple(ops) if ops else ()
 
 
 class Factor(ASTNode):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
-    def __eq__(self, other):
-        if not isinstance(other, Factor):
-            return False
-        return self.value == other.value
-
-    def __repr__(self):
-        return f"Factor(value={self.value})"
-
 
 class MethodCall(ASTNode):
+    __slots__ = ('name', 'args')
+
     def __init__(self, name, args=None):
         self.name = name
-        self.args = args or []
-
-    def __eq__(self, other):
-        if not isinstance(other, MethodCall):
-            return False
-        return self.name == other.name and self.args == other.args
-
-    def __repr__(self):
-        return f"MethodCall(name={self.name}, args={self.args})"
+        self.args = tuple(args) if args else ()
 
 class Statement(ASTNode):
+    __slots__ = ('body',)
+
     def __init__(self, body):
         self.body = body
 
-    def __eq__(self, other):
-        if not isinstance(other, Statement):
-            return False
-        return self.body == other.body
-
-    def __repr__(self):
-        return f"Statement(body={self.body})"
-
 class IfStatement(ASTNode):
+    __slots__ = ('condition', 'block')
+
     def __init__(self, condition, block):
         self.condition = condition
         self.block = block
 
-    def __eq__(self, other):
-        if not isinstance(other, IfStatement):
-            return False
-        return self.condition == other.condition and self.block == other.block
-
-    def __repr__(self):
-        return f"IfStatement(condition={self.condition}, block={self.block})"
-
 class Relational(ASTNode):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
         self.right = right
 
-    def __eq__(self, other):
-        if not isinstance(other, Relational):
-            return False
-        return self.left == other.left and self.op == other.op and self.right == other.right
-
-    def __repr__(self):
-        return f"Relational(left={self.left}, op={self.op}, right={self.right})"
-
 
 class Equality(ASTNode):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
         self.right = right
 
-    def __eq__(self, other):
-        if not isinstance(other, Equality):
-            return False
-        return self.left == other.left and self.op == other.op and self.right == other.right
-
-    def __repr__(self):
-        return f"Equality(left={self.left}, op={self.op}, right={self.right})"
-
 
 class And(ASTNode):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
 
-    def __eq__(self, other):
-        if not isinstance(other, And):
-            return False
-        return self.left == other.left and self.right == other.right
-
-    def __repr__(self):
-        return f"And(left={self.left}, right={self.right})"
-
 
 class Or(ASTNode):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
 
-    def __eq__(self, other):
-        if not isinstance(other, Or):
-            return False
-        return self.left == other.left and self.right == other.right
-
-    def __repr__(self):
-        return f"Or(left={self.left}, right={self.right})"
-
 
 class Logic(ASTNode):
+    __slots__ = ('or_expression',)
+
     def __init__(self, or_expression):
         self.or_expression = or_expression
 
-    def __eq__(self, other):
-        if not isinstance(other, Logic):
-            return False
-        return self.or_expression == other.or_expression
-
-    def __repr__(self):
-        return f"Logic(or_expression={self.or_expression})"
-
 
 class Placeholder(ASTNode):
-    def __eq__(self, value):
-        if not isinstance(value, Placeholder):
-            return False
-        return True
-    
-    def __repr__(self):
-        return f"Placeholder()"
+    __slots__ = ()
 
 class Concept(ASTNode):
+    __slots__ = ('name', 'type_var', 'constraints')
+
     def __init__(self, name, type_var, constraints):
         self.name = name
         self.type_var = type_var
         self.constraints = constraints
 
-    def __eq__(self, value):
-        if not isinstance(value, Concept):
-            return False
-        return self.name == value.name and self.type_var == value.type_var and self.constraints == value.constraints
-
-    def __repr__(self):
-        return f"Concept(name={self.name}, type_var={self.type_var}, constraints={self.constraints})"
-
 
 class Constraint(ASTNode):
+    __slots__ = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression
 
-    def __eq__(self, value):
-        if not isinstance(value, Constraint):
-            return False
-        return self.expression == value.expression
-
-    def __repr__(self):
-        return f"Constraint(expression={self.expression})"
-
 
 class GenericParameter(ASTNode):
+    __slots__ = ('concept', 'type_var')
+
     def __init__(self, concept, type_var):
         self.concept = concept
         self.type_var = type_var
 
-    def __eq__(self, value):
-        if not isinstance(value, GenericParameter):
-            return False
-        return self.concept == value.concept and self.type_var == value.type_var
-
-    def __repr__(self):
-        return f"GenericParameter(concept={self.concept}, type_var={self.type_var})"
-
 
 class GenericType(ASTNode):
+    __slots__ = ('base_type', 'type_arguments')
+
     def __init__(self, base_type, type_arguments):
         self.base_type = base_type
         self.type_arguments = type_arguments
 
-    def __eq__(self, value):
-        if not isinstance(value, GenericType):
-            return False
-        return self.base_type == value.base_type and self.type_arguments == value.type_arguments
 
-    def __repr__(self):
-        return f"GenericType(base_type={self.base_type}, type_arguments={self.type_arguments})"
+# (node class, field names) for a node type. The node class is the one that
+# defines the fields: the type itself, or for a subclass defined elsewhere
+# (such as an interned node) the ast_nodes class it extends.
+def node_layout(node_type):
+    layout = _LAYOUTS.get(node_type)
+    if layout is None:
+        cls = next(klass for klass in node_type.__mro__ if klass.__module__ == __name__)
+        layout = _LAYOUTS[node_type] = (cls, cls.__slots__)
+    return layout
+
+_LAYOUTS = {}
+
+# Values that node_repr and nodes_equal descend into rather than handle directly
+_COMPOSITE = (ASTNode, list, tuple)
+
+
+# Structural equality of two values that may contain nodes. A node equals
+# another value when that value is an instance of its class with equal fields;
+# lists and tuples compare element by element, and never equal each other.
+def nodes_equal(a, b):
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if isinstance(a, ASTNode):
+            cls, fields = node_layout(type(a))
+            if not isinstance(b, cls):
+                return False
+            pairs = [(getattr(a, field), getattr(b, field)) for field in fields]
+        elif isinstance(b, ASTNode):
+            return False
+        elif isinstance(a, list):
+            if not isinstance(b, list) or len(a) != len(b):
+                return False
+            pairs = zip(a, b)
+        elif isinstance(a, tuple):
+            if not isinstance(b, tuple) or len(a) != len(b):
+                return False
+            pairs = zip(a, b)
+        else:
+            if not a == b:
+                return False
+            continue
+        for x, y in pairs:
+            if x is y:
+                continue
+            if isinstance(x, _COMPOSITE) or isinstance(y, ASTNode):
+                stack.append((x, y))
+            elif not x == y:
+                return False
+    return True
+
+
+# Structural hash of a value that may contain nodes, consistent with
+# nodes_equal: a node hashes its node class (see node_layout) and fields, a list
+# or tuple its kind and items. A node below the top whose class defines its own
+# __hash__, as an interned node does, is hashed with it. The work stack holds
+# values still to be hashed, and (count, kind) entries that combine the last
+# count hashes into that of a node or container.
+def node_hash(value):
+    top = value
+    hashes = []
+    stack = [(value, None)]
+    while stack:
+        value, kind = stack.pop()
+        if kind is not None:
+            items = hashes[len(hashes) - value:]
+            del hashes[len(hashes) - value:]
+            hashes.append(hash((kind, *items)))
+            continue
+        if isinstance(value, ASTNode):
+            if value is not top and type(value).__hash__ is not ASTNode.__hash__:
+                hashes.append(hash(value))
+                continue
+            kind, fields = node_layout(type(value))
+            items = [getattr(value, field) for field in fields]
+        elif isinstance(value, list):
+            kind, items = list, value
+        elif isinstance(value, tuple):
+            kind, items = tuple, value
+        else:
+            hashes.append(hash(value))
+            continue
+        stack.append((len(items), kind))
+        stack.extend((item, None) for item in reversed(items))
+    return hashes[0]
+
+
+# Text of Name(field=value, ...) for a node. Fields are shown with str(), and
+# the items of lists and tuples with repr(), as f-strings and containers do.
+# The work stack holds literal text (str) and values still to be rendered.
+def node_repr(node):
+    parts = []
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if value.__class__ is str:
+            parts.append(value)
+            continue
+        items = []
+        if isinstance(value, ASTNode):
+            cls, fields = node_layout(type(value))
+            text = cls.__name__ + '('
+            for i, field in enumerate(fields):
+                text += f"{', ' if i else ''}{field}="
+                item = getattr(value, field)
+                if isinstance(item, _COMPOSITE):
+                    items.append(text)
+                    items.append(item)
+                    text = ''
+                else:
+                    text += str(item)
+            text += ')'
+        else:
+            text = '[' if isinstance(value, list) else '('
+            for i, item in enumerate(value):
+                if i:
+                    text += ', '
+                if isinstance(item, _COMPOSITE):
+                    items.append(text)
+                    items.append(item)
+                    text = ''
+                else:
+                    text += repr(item)
+            text += ']' if isinstance(value, list) else ',)' if len(value) == 1 else ')'
+        items.append(text)
+        items.reverse()
+        stack.extend(items)
+    return ''.join(parts)
@@ -0,0 +1,66 @@
+# Purpose: Cold and warm build times with the on-disk AST cache
+#
+# Writes a project of generated .xprs files to a temporary directory and builds
+# it three times: without the cache, with an empty cache, and again with the
+# cache the second build filled. Run from anywhere:
+#
+#     python benchmarks/bench_ast_cache.py --files 500 --frontend antlr
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from expresso_ast_cache import ASTCache
+from expresso_build import build, FRONTEND_ANTLR, FRONTEND_NATIVE
+
+TEMPLATE = """
+type Example{i} {{
+    int exampleVar = {i};
+    method doSomething(int a, float b) {{
+        int total = a + b * (c - {i});
+        foo(total, 2) / 3;
+    }}
+}}
+int globalVar{i} = bar({i});
+"""
+
+
+def timed_build(root, workers, frontend, cache):
+    start = time.perf_counter()
+    results = build(root, workers, frontend, cache)
+    elapsed = time.perf_counter() - start
+    assert all(result.error is None for result in results)
+    return elapsed, sum(result.cached for result in results)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Cold and warm build times with the AST cache')
+    arg_parser.add_argument('--files', type=int, default=500)
+    arg_parser.add_argument('--copies', type=int, default=4, help='declarations per file, in copies of the template')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None)
+    arg_parser.add_argument('--frontend', choices=[FRONTEND_ANTLR, FRONTEND_NATIVE], default=FRONTEND_ANTLR)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'src')
+        os.makedirs(root)
+        for n in range(args.files):
+            with open(os.path.join(root, f'file{n}.xprs'), 'w') as f:
+                f.write(''.join(TEMPLATE.format(i=n * args.copies + i) for i in range(args.copies)))
+        cache = ASTCache(os.path.join(tmp, 'cache'))
+
+        print(f"{'build':<10} {'seconds':>9} {'cached':>7}")
+        for name, build_cache in (('no cache', None), ('cold', cache), ('warm', cache)):
+            elapsed, cached = timed_build(root, args.jobs, args.frontend, build_cache)
+            print(f"{name:<10} {elapsed:>9.3f} {cached:>7}")
+        count, size = cache.stats()
+        print(f"{count} entries, {size / count:.0f} bytes each")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# Purpose: Memory benchmark for the Expresso AST
+#
+# Parses a source repeated many times with the native parser and reports the
+# memory the resulting AST holds, per node. Run from anywhere:
+#
+#     python benchmarks/bench_ast_memory.py --scale 1000
+#
+# The default source is the repository's sample.xprs when the grammar accepts
+# it, and a representative program otherwise: sample.xprs is written in the
+# full Expresso language (subjects, aspects, strings, member access), most of
+# which the current grammar does not parse yet.
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ast_nodes import ASTNode
+from expresso_native import parse_native, ExpressoSyntaxError
+
+SAMPLE = os.path.join(ROOT, 'sample.xprs')
+
+FALLBACK_SOURCE = """
+type Animal {
+    int legs = 4;
+    method eat(Food food, int amount) {
+        int eaten = amount * (food + 1) - legs / 2;
+        digest(food, eaten <= amount and eaten > 0);
+    }
+    method sleep();
+}
+type Food;
+int farmSize = 100;
+method main() {
+    Animal dog = 1;
+    feed(dog, 2 * farmSize);
+    observe(dog);
+}
+"""
+
+
+# Number of AST nodes reachable from node
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, ASTNode):
+            count += 1
+            stack.extend(_attributes(value))
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return count
+
+
+# Attribute values of a node, whether it keeps them in a __dict__ or in slots
+def _attributes(node):
+    if hasattr(node, '__dict__'):
+        return list(vars(node).values())
+    return [getattr(node, name) for klass in type(node).__mro__ for name in getattr(klass, '__slots__', ())]
+
+
+def load_source(path):
+    if path is not None:
+        with open(path, encoding='utf-8') as f:
+            return path, f.read()
+    with open(SAMPLE, encoding='utf-8') as f:
+        sample = f.read()
+    try:
+        parse_native(sample)
+        return SAMPLE, sample
+    except ExpressoSyntaxError:
+        return '<fallback>', FALLBACK_SOURCE
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Memory benchmark for the Expresso AST')
+    arg_parser.add_argument('--scale', type=int, default=1000, help='number of copies of the source')
+    arg_parser.add_argument('--source', help='file to parse instead of sample.xprs')
+    args = arg_parser.parse_args()
+
+    name, source = load_source(args.source)
+    source = source * args.scale
+    gc.collect()
+    tracemalloc.start()
+    program = parse_native(source)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    nodes = count_nodes(program)
+    print(f"source: {name} x {args.scale} ({len(source) / (1 << 20):.1f} MB)")
+    print(f"{nodes} nodes, {size / (1 << 20):.1f} MB, {size / nodes:.1f} bytes per node")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# Purpose: Encode/decode throughput of the binary AST format against pickle
+#
+# Parses a representative program repeated many times with the native parser,
+# then times encoding and decoding the whole Program with expresso_binary and
+# with pickle, and reading one declaration lazily out of the encoded data.
+# Run from anywhere:
+#
+#     python benchmarks/bench_binary.py --scale 2000
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ast_nodes import ASTNode
+from expresso_binary import ASTReader, decode, encode
+from expresso_native import parse_native
+
+SOURCE = """
+type Animal {
+    int legs = 4;
+    method eat(Food food, int amount) {
+        int eaten = amount * (food + 1) - legs / 2;
+        digest(food, eaten <= amount and eaten > 0);
+    }
+    method sleep();
+}
+type Food;
+int farmSize = 100;
+"""
+
+# Format name -> (encode, decode)
+FORMATS = {
+    'pickle': (lambda program: pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+    'binary': (encode, decode),
+}
+
+
+# Number of AST nodes reachable from value
+def count_nodes(value):
+    count = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, ASTNode):
+            count += 1
+            stack.extend(getattr(value, field) for field in type(value).__slots__)
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return count
+
+
+# Best time of repeat calls of fn(), and its last result
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Binary AST format against pickle')
+    arg_parser.add_argument('--scale', type=int, default=2000, help='copies of the source to parse')
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    program = parse_native(SOURCE * args.scale)
+    declarations = len(program.body)
+    nodes = count_nodes(program)
+    print(f"{nodes} nodes in {declarations} declarations")
+
+    print(f"{'format':<8} {'bytes':>10} {'encode s':>9} {'decode s':>9} {'bytes/node':>11} {'encode kn/s':>12} {'decode kn/s':>12}")
+    for name, (encode_fn, decode_fn) in FORMATS.items():
+        encode_s, data = best_of(args.repeat, lambda: encode_fn(program))
+        decode_s, decoded = best_of(args.repeat, lambda: decode_fn(data))
+        assert decoded == program
+        print(f"{name:<8} {len(data):>10} {encode_s:>9.3f} {decode_s:>9.3f} {len(data) / nodes:>11.1f} "
+              f"{nodes / encode_s / 1000:>12.0f} {nodes / decode_s / 1000:>12.0f}")
+
+    # Materialize only the last declaration, as a query that needs one subtree would
+    data = encode(program)
+    lazy_s, last = best_of(args.repeat, lambda: ASTReader(data).root().body[-1].materialize())
+    assert last == program.body[-1]
+    print(f"lazy: last of {declarations} declarations in {lazy_s * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
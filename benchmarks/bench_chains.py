@@ -0,0 +1,49 @@
+# Purpose: Scaling benchmark for long operator chains in the ANTLR front-end
+#
+# Generates statements made of one long chain of operands and reports the time
+# to parse them and the time ExpressoListener takes to build their AST, which
+# should grow linearly with the number of operands. Run from anywhere:
+#
+#     python benchmarks/bench_chains.py --sizes 1000 10000 100000
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from expresso_parse import build_ast, parse_tree, MODE_SLL
+from expresso_tokens import ArrayTokenStream
+
+# Chain name -> function building a statement with n operands
+CHAINS = {
+    'sum': lambda n: ' + '.join(f'a{i}' for i in range(n)) + ';',
+    'product': lambda n: ' * '.join(f'a{i}' for i in range(n)) + ';',
+    'args': lambda n: 'f(' + ', '.join(f'a{i}' for i in range(n)) + ');',
+    'logic': lambda n: 'f(' + ' and '.join(f'a{i} < {i}' for i in range(n // 2)) + ' or a == b);',
+}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Scaling benchmark for long operator chains')
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    arg_parser.add_argument('--chain', choices=sorted(CHAINS), action='append')
+    args = arg_parser.parse_args()
+
+    print(f"{'chain':<8} {'operands':>9} {'parse s':>9} {'ast s':>9} {'ast us/operand':>15}")
+    for name in args.chain or list(CHAINS):
+        for size in args.sizes:
+            source = CHAINS[name](size)
+            start = time.perf_counter()
+            tree, _ = parse_tree(ArrayTokenStream(source), MODE_SLL)
+            parsed = time.perf_counter()
+            build_ast(tree)
+            built = time.perf_counter()
+            print(f"{name:<8} {size:>9} {parsed - start:>9.3f} {built - parsed:>9.3f} "
+                  f"{(built - parsed) / size * 1e6:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
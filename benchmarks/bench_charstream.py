@@ -0,0 +1,74 @@
+# Purpose: Memory and lexing-time benchmark for the Expresso CharStreams
+#
+# Builds a source of the requested size and reports, for each CharStream, the
+# memory the stream holds per MB of input and the time to lex the whole input.
+# Run from anywhere:
+#
+#     python benchmarks/bench_charstream.py --mb 4
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from antlr4 import InputStream
+from ExpressoLexer import ExpressoLexer
+from expresso_charstream import ByteCharStream, MappedCharStream
+
+DECLARATION = "type Example { int exampleVar = 0; method doSomething(int a) { foo(a, 1) + 2 * a; } }\n"
+
+# Stream name -> function building the stream from the source text and the path of a file holding it
+STREAMS = {
+    'InputStream': lambda source, path: InputStream(source),
+    'ByteCharStream': lambda source, path: ByteCharStream(source.encode('utf-8')),
+    'MappedCharStream': lambda source, path: MappedCharStream(path),
+}
+
+
+# Bytes allocated while building a stream, excluding the source it was built from
+def stream_memory(build, source, path):
+    tracemalloc.start()
+    stream = build(source, path)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return stream, size
+
+
+def lex_seconds(stream):
+    lexer = ExpressoLexer(stream)
+    start = time.perf_counter()
+    token = lexer.nextToken()
+    while token.type != token.EOF:
+        token = lexer.nextToken()
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Memory and lexing-time benchmark for the Expresso CharStreams')
+    arg_parser.add_argument('--mb', type=float, default=1.0, help='size of the generated source in MB')
+    arg_parser.add_argument('--stream', choices=sorted(STREAMS), action='append')
+    args = arg_parser.parse_args()
+
+    source = DECLARATION * max(1, int(args.mb * (1 << 20) / len(DECLARATION)))
+    megabytes = len(source) / (1 << 20)
+    with tempfile.NamedTemporaryFile('w', suffix='.xprs', delete=False) as f:
+        f.write(source)
+    try:
+        print(f"{'stream':<18} {'MB held per input MB':>21} {'lex s':>8}")
+        for name in args.stream or list(STREAMS):
+            stream, size = stream_memory(STREAMS[name], source, f.name)
+            seconds = lex_seconds(stream)
+            if isinstance(stream, MappedCharStream):
+                stream.close()
+            print(f"{name:<18} {size / (1 << 20) / megabytes:>21.3f} {seconds:>8.2f}")
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == '__main__':
+    main()
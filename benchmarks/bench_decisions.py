@@ -0,0 +1,64 @@
+# Purpose: Lookahead report for the prediction decisions of ExpressoParser
+#
+# Parses a representative program and reports, for every decision of the
+# generated parser that adaptivePredict was called for: how often, the average
+# and largest number of tokens SLL prediction looked at, and how often (and how
+# far) prediction fell back to full-context LL. Decisions that are LL(1) in the
+# grammar are taken by the generated code without adaptivePredict and do not
+# show up. expresso_profile has the full per-decision profile. Run from anywhere:
+#
+#     python benchmarks/bench_decisions.py --scale 50
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ExpressoParser import ExpressoParser
+from expresso_parse import MODE_LL, MODE_SLL, _configure_sll
+from expresso_profile import ParseProfile, ProfilingATNSimulator
+from expresso_tokens import ArrayTokenStream
+
+SOURCE = """
+type Animal {
+    int legs = 4;
+    method eat(Food food, int amount) {
+        int eaten = amount * (food + 1) - legs / 2;
+        digest(food, eaten <= amount and eaten > 0);
+        log(eaten, amount * 2 + legs, size(food) * (legs - 1) / 3 + weight(food, 2));
+    }
+}
+method main() {
+    feed(dog, 2 * farmSize, count(dog) + 1 == limit or hungry(dog));
+    observe(dog);
+}
+"""
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Lookahead report for the decisions of ExpressoParser')
+    arg_parser.add_argument('--scale', type=int, default=50, help='copies of the source to parse')
+    arg_parser.add_argument('--mode', choices=[MODE_LL, MODE_SLL], default=MODE_LL)
+    args = arg_parser.parse_args()
+
+    parser = ExpressoParser(ArrayTokenStream(SOURCE * args.scale))
+    profile = ParseProfile()
+    parser._interp = ProfilingATNSimulator(parser, profile)
+    if args.mode == MODE_SLL:
+        _configure_sll(parser)
+    start = time.perf_counter()
+    parser.program()
+    seconds = time.perf_counter() - start
+
+    print(f"{'decision':>8} {'rule':<22} {'calls':>7} {'avg k':>7} {'max k':>6} {'LL':>6} {'max LL k':>9}")
+    for d in sorted(profile.decisions.values(), key=lambda d: d.decision):
+        print(f"{d.decision:>8} {d.rule:<22} {d.invocations:>7} {d.sll_total_look / d.invocations:>7.2f} "
+              f"{d.sll_max_look:>6} {d.ll_fallbacks:>6} {d.ll_max_look or 0:>9}")
+    print(f"parse: {seconds:.3f}s ({args.mode})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Purpose: Overhead of parse limits that never trigger
+#
+# Times parse_program on a representative program repeated many times without
+# limits and with a token budget, deadline and cancel token that are never hit.
+# Run from anywhere:
+#
+#     python benchmarks/bench_limits.py --scale 500
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from expresso_limits import CancelToken, ParseLimits
+from expresso_parse import LEXER_ANTLR, LEXER_ARRAY, parse_program
+
+SOURCE = """
+type Animal {
+    int legs = 4;
+    method eat(Food food, int amount) {
+        int eaten = amount * (food + 1) - legs / 2;
+        digest(food, eaten <= amount and eaten > 0);
+    }
+}
+method main() {
+    feed(dog, 2 * farmSize);
+}
+"""
+
+
+# Best times of repeat calls of each of fns, run in turn so that noise on the
+# machine hits all of them alike; garbage left by one is collected before the next
+def best_of(repeat, *fns):
+    best = [float('inf')] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            gc.collect()
+            start = time.perf_counter()
+            fn()
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Overhead of parse limits that never trigger')
+    arg_parser.add_argument('--scale', type=int, default=500, help='copies of the source to parse')
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    source = SOURCE * args.scale
+    # Warm the shared DFA first, so neither case pays for it
+    parse_program(source)
+    print(f"{'lexer':<8} {'no limits':>10} {'limits':>10} {'overhead':>9}")
+    for lexer in (LEXER_ANTLR, LEXER_ARRAY):
+        plain, limited = best_of(
+            args.repeat,
+            lambda: parse_program(source, lexer=lexer),
+            lambda: parse_program(source, lexer=lexer,
+                                  limits=ParseLimits(max_tokens=10 ** 9, timeout=3600, cancel=CancelToken())))
+        print(f"{lexer:<8} {plain:>10.3f} {limited:>10.3f} {(limited / plain - 1) * 100:>8.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Purpose: Whole-program queries on a NodeTable against walking the AST
+#
+# Parses a representative program repeated many times with the native parser,
+# builds its NodeTable and times one query both ways: "every call of log inside
+# a type declaration", once as array operations on the table and once as a walk
+# over the ast_nodes objects. Needs NumPy. Run from anywhere:
+#
+#     python benchmarks/bench_node_table.py --scale 20000
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ast_nodes import ASTNode, MethodCall, TypeDeclaration, node_layout
+from expresso_native import parse_native
+from expresso_table import NodeTable
+
+SOURCE = """
+type Animal {
+    int legs = 4;
+    method eat(Food food, int amount) {
+        int eaten = amount * (food + 1) - legs / 2;
+        log(food, eaten <= amount and eaten > 0);
+    }
+    method sleep();
+}
+int farmSize = log(100);
+"""
+
+
+# The same query as a walk over the objects, tracking how many type declarations enclose each node
+def walk_query(program):
+    found = 0
+    stack = [(program, False)]
+    while stack:
+        value, in_type = stack.pop()
+        if isinstance(value, ASTNode):
+            if isinstance(value, MethodCall) and value.name == 'log' and in_type:
+                found += 1
+            inner = in_type or isinstance(value, TypeDeclaration)
+            stack.extend((getattr(value, field), inner) for field in node_layout(type(value))[1])
+        elif isinstance(value, (list, tuple)):
+            stack.extend((item, in_type) for item in value)
+    return found
+
+
+def table_query(table):
+    return len(table.inside(table.rows(MethodCall, 'log'), table.rows(TypeDeclaration)))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='NodeTable queries against walking the AST')
+    arg_parser.add_argument('--scale', type=int, default=20000, help='copies of the source to parse')
+    args = arg_parser.parse_args()
+
+    program = parse_native(SOURCE * args.scale)
+    start = time.perf_counter()
+    table = NodeTable(program)
+    built = time.perf_counter()
+    print(f"{len(table)} nodes, table built in {built - start:.2f} s")
+
+    start = time.perf_counter()
+    walked = walk_query(program)
+    walk_s = time.perf_counter() - start
+    start = time.perf_counter()
+    queried = table_query(table)
+    table_s = time.perf_counter() - start
+    assert walked == queried
+    print(f"{queried} calls of log inside a type: walk {walk_s * 1000:.1f} ms, table {table_s * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    counts = table.counts()
+    print(f"counts of {len(counts)} node classes in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Purpose: Outline parsing with lazy method bodies against lexing and full parses
+#
+# Times, on a representative program repeated many times: lexing alone, the
+# outline parse (method bodies skipped), the outline parse with every body then
+# read, and the full native parse. Run from anywhere:
+#
+#     python benchmarks/bench_outline.py --scale 2000
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ast_nodes import MethodDeclaration, TypeDeclaration
+from expresso_native import parse_native, parse_outline, tokenize
+
+SOURCE = """
+type Animal {
+    int legs = 4;
+    method eat(Food food, int amount) {
+        int eaten = amount * (food + 1) - legs / 2;
+        digest(food, eaten <= amount and eaten > 0);
+        log(eaten, amount * 2 + legs);
+    }
+    method sleep(int hours) {
+        int rested = hours * (legs + 1);
+        dream(rested, hours > 8 or rested < 2);
+    }
+}
+method main() {
+    feed(dog, 2 * farmSize);
+    observe(dog);
+}
+"""
+
+
+# Read every method body, as a caller that needs all of them would
+def read_bodies(program):
+    for declaration in program.body:
+        if isinstance(declaration, TypeDeclaration) and declaration.body is not None:
+            methods = [member for member in declaration.body.body if isinstance(member, MethodDeclaration)]
+        elif isinstance(declaration, MethodDeclaration):
+            methods = [declaration]
+        else:
+            methods = []
+        for method in methods:
+            if method.body is not None:
+                method.body.body
+    return program
+
+
+# Best time of repeat calls of fn()
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Outline parsing against lexing and full parses')
+    arg_parser.add_argument('--scale', type=int, default=2000, help='copies of the source to parse')
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = SOURCE * args.scale
+    assert read_bodies(parse_outline(source)) == parse_native(source)
+
+    cases = [
+        ('lex', lambda: tokenize(source)),
+        ('outline', lambda: parse_outline(source)),
+        ('outline+bodies', lambda: read_bodies(parse_outline(source))),
+        ('full', lambda: parse_native(source)),
+    ]
+    lex_s = None
+    print(f"{'case':<16} {'seconds':>9} {'x lex':>7}")
+    for name, fn in cases:
+        seconds = best_of(args.repeat, fn)
+        lex_s = lex_s or seconds
+        print(f"{name:<16} {seconds:>9.3f} {seconds / lex_s:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
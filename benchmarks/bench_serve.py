@@ -0,0 +1,97 @@
+# Purpose: Latency of the `expresso serve` daemon against parsing in process
+#
+# Starts a daemon on a socket in a temporary directory, then reports:
+#
+#     - the round trip of small parse requests over one connection, each of a
+#       source the daemon has not seen and again of one it has (from memory)
+#     - the same parses done in process by a warm parser, for comparison
+#     - the wall time of `main.py check` on a small file in a fresh interpreter,
+#       with the daemon running and without it
+#
+# Run from anywhere:
+#
+#     python benchmarks/bench_serve.py --requests 200
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from expresso_serve import ParseClient
+
+SOURCE = "type Example {{ int exampleVar = {0}; method doSomething(int a) {{ foo(a, {0} < b) + 2 * a; }} }}"
+
+
+def percentiles(seconds):
+    ordered = sorted(seconds)
+    return (statistics.median(ordered) * 1000, ordered[int(len(ordered) * 0.95)] * 1000)
+
+
+def time_requests(parse, sources):
+    seconds = []
+    for source in sources:
+        start = time.perf_counter()
+        parse(source)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def time_cli(args, env, runs):
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT, 'main.py')] + args, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Latency of the parse daemon')
+    arg_parser.add_argument('--requests', type=int, default=200)
+    arg_parser.add_argument('--runs', type=int, default=10, help='CLI runs with and without the daemon')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, EXPRESSO_CACHE_DIR=directory)
+        socket_path = os.path.join(directory, 'serve.sock')
+        daemon = subprocess.Popen([sys.executable, os.path.join(ROOT, 'main.py'), 'serve', '--no-cache',
+                                   '--socket', socket_path], env=env, stdout=subprocess.PIPE, text=True)
+        try:
+            daemon.stdout.readline()
+            sources = [SOURCE.format(i) for i in range(args.requests)]
+            with ParseClient(socket_path, fallback=False) as client:
+                fresh = time_requests(client.parse, sources)
+                repeated = time_requests(client.parse, sources)
+            local = ParseClient(os.path.join(directory, 'none.sock'))
+            local.parse(SOURCE.format(args.requests))
+            in_process = time_requests(local.parse, sources)
+
+            path = os.path.join(directory, 'small.xprs')
+            with open(path, 'w') as f:
+                f.write(SOURCE.format(1))
+            with_daemon = time_cli(['check', '--socket', socket_path, path], env, args.runs)
+            without = time_cli(['check', '--socket', os.path.join(directory, 'none.sock'), path], env, args.runs)
+        finally:
+            try:
+                ParseClient(socket_path, fallback=False).shutdown()
+            except OSError:
+                daemon.terminate()
+            daemon.wait()
+
+    print(f"{'':<28} {'median ms':>10} {'p95 ms':>8}")
+    for name, seconds in (('daemon, new source', fresh), ('daemon, repeated source', repeated),
+                          ('in process, warm', in_process), ('CLI check with daemon', with_daemon),
+                          ('CLI check without daemon', without)):
+        median, p95 = percentiles(seconds)
+        print(f"{name:<28} {median:>10.2f} {p95:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# Purpose: Cold-start benchmark for the Expresso front-ends
+#
+# Every sample runs in a fresh interpreter and measures the time to import the
+# parsing entry point, then the time of the first parse. Run from anywhere:
+#
+#     python benchmarks/bench_startup.py --runs 20
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOURCE = "type Example { int exampleVar = 0; method doSomething(int a) { foo(a, 1) + 2 * a; } }"
+
+# Child-side snippets: import the entry point, then parse once
+FRONTENDS = {
+    'antlr': ("from expresso_parse import parse_program", "parse_program(SOURCE)"),
+    'native': ("from expresso_native import parse_native", "parse_native(SOURCE)"),
+}
+
+CHILD = """
+import json, time
+SOURCE = {source!r}
+start = time.perf_counter()
+{import_stmt}
+imported = time.perf_counter()
+{parse_stmt}
+parsed = time.perf_counter()
+print(json.dumps({{'import': imported - start, 'first_parse': parsed - imported}}))
+"""
+
+
+def sample(frontend):
+    import_stmt, parse_stmt = FRONTENDS[frontend]
+    code = CHILD.format(source=SOURCE, import_stmt=import_stmt, parse_stmt=parse_stmt)
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Cold-start benchmark for the Expresso front-ends')
+    arg_parser.add_argument('--runs', type=int, default=10)
+    arg_parser.add_argument('--frontend', choices=sorted(FRONTENDS), action='append')
+    args = arg_parser.parse_args()
+
+    print(f"{'frontend':<10} {'import ms':>10} {'first parse ms':>15} {'total ms':>10}")
+    for frontend in args.frontend or sorted(FRONTENDS):
+        samples = [sample(frontend) for _ in range(args.runs)]
+        imports = statistics.median(s['import'] for s in samples) * 1000
+        parses = statistics.median(s['first_parse'] for s in samples) * 1000
+        totals = statistics.median(s['import'] + s['first_parse'] for s in samples) * 1000
+        print(f"{frontend:<10} {imports:>10.2f} {parses:>15.2f} {totals:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+# Purpose: Parser and AST benchmark suite over a synthetic corpus, with baselines
+#
+# Three commands:
+#
+#     generate DIR     write a corpus of .xprs files made by expresso_corpus
+#     run              time every stage over a corpus (a directory, or one
+#                      generated in memory) and print or save the results as JSON
+#     compare OLD NEW  compare two saved results and flag regressions
+#
+# The stages are lexing (RegexLexer into an ArrayTokenStream), parsing the
+# lexed tokens into a parse tree, walking the trees with the listener, the whole
+# default parse_program path, and the native parser. Each reports tokens/s,
+# AST nodes/s and MB/s of source over the best of --repeat runs, and the peak
+# memory allocated while it runs over the corpus one file at a time. For example:
+#
+#     python benchmarks/bench_suite.py run --files 20 --declarations 200 --out baseline.json
+#     ... change the parser ...
+#     python benchmarks/bench_suite.py run --files 20 --declarations 200 --out current.json
+#     python benchmarks/bench_suite.py compare baseline.json current.json --threshold 10
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ast_nodes import ASTNode
+from expresso_build import find_sources
+from expresso_corpus import ProgramGenerator, write_corpus
+from expresso_listener import node_children
+from expresso_native import parse_native
+from expresso_parse import build_ast, parse_program, parse_tree
+from expresso_tokens import ArrayTokenStream
+
+# Bump when the layout of the results changes
+FORMAT_VERSION = 1
+
+# Throughput metrics, where lower is worse; for peak_kb higher is worse
+METRICS = ('tokens_per_s', 'nodes_per_s', 'mb_per_s')
+
+
+def count_nodes(program):
+    count = 0
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ASTNode):
+            count += 1
+            stack.extend(node_children(node))
+    return count
+
+
+# Best time of repeat calls of fn()
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Peak memory in bytes allocated while fn() runs
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def generator_settings(args):
+    return {'declarations': args.declarations, 'members': args.members, 'statements': args.statements,
+            'depth': args.depth, 'chain': args.chain, 'logic': args.logic}
+
+
+def load_corpus(args):
+    if args.corpus is not None:
+        sources = []
+        for path in find_sources(args.corpus):
+            with open(path, encoding='utf-8') as f:
+                sources.append(f.read())
+        return sources, {'directory': args.corpus}
+    settings = generator_settings(args)
+    generator = ProgramGenerator(args.seed, **settings)
+    return [generator.program() for _ in range(args.files)], dict(settings, seed=args.seed, files=args.files)
+
+
+def run(args):
+    sources, settings = load_corpus(args)
+    streams = [ArrayTokenStream(source) for source in sources]
+    trees = [parse_tree(stream)[0] for stream in streams]
+    programs = [build_ast(tree) for tree in trees]
+    corpus = {
+        'files': len(sources),
+        'bytes': sum(len(source.encode('utf-8')) for source in sources),
+        'tokens': sum(len(stream.types) - 1 for stream in streams),
+        'nodes': sum(count_nodes(program) for program in programs),
+        'settings': settings,
+    }
+    del programs
+
+    def lex():
+        for source in sources:
+            ArrayTokenStream(source)
+
+    def parse():
+        for stream in streams:
+            stream.seek(0)
+            parse_tree(stream)
+
+    def listener():
+        for tree in trees:
+            build_ast(tree)
+
+    def end_to_end():
+        for source in sources:
+            parse_program(source)
+
+    def native():
+        for source in sources:
+            parse_native(source)
+
+    stages = {}
+    for name, fn in (('lex', lex), ('parse', parse), ('listener', listener),
+                     ('end_to_end', end_to_end), ('native', native)):
+        fn()
+        seconds = best_of(args.repeat, fn)
+        stages[name] = {
+            'seconds': seconds,
+            'tokens_per_s': corpus['tokens'] / seconds,
+            'nodes_per_s': corpus['nodes'] / seconds,
+            'mb_per_s': corpus['bytes'] / seconds / 1e6,
+            'peak_kb': peak_memory(fn) / 1024,
+        }
+    results = {'version': FORMAT_VERSION, 'python': platform.python_version(), 'corpus': corpus, 'stages': stages}
+
+    print(f"{corpus['files']} files, {corpus['bytes'] / 1e6:.2f} MB, {corpus['tokens']} tokens, {corpus['nodes']} nodes")
+    print(f"{'stage':<12} {'seconds':>9} {'tokens/s':>11} {'nodes/s':>11} {'MB/s':>8} {'peak KB':>10}")
+    for name, stage in stages.items():
+        print(f"{name:<12} {stage['seconds']:>9.3f} {stage['tokens_per_s']:>11.0f} {stage['nodes_per_s']:>11.0f} "
+              f"{stage['mb_per_s']:>8.3f} {stage['peak_kb']:>10.0f}")
+    if args.out is not None:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+    return 0
+
+
+# Flag every stage metric that got worse by more than threshold percent
+def compare(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    if baseline['corpus'] != current['corpus']:
+        print("warning: the results were measured on different corpora")
+    regressions = 0
+    print(f"{'stage':<12} {'metric':<13} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, old in baseline['stages'].items():
+        new = current['stages'].get(name)
+        if new is None:
+            continue
+        for metric in METRICS + ('peak_kb',):
+            change = (new[metric] / old[metric] - 1) * 100 if old[metric] else 0.0
+            worse = change > args.threshold if metric == 'peak_kb' else -change > args.threshold
+            regressions += worse
+            print(f"{name:<12} {metric:<13} {old[metric]:>12.4g} {new[metric]:>12.4g} {change:>+7.1f}%"
+                  f"{'  REGRESSION' if worse else ''}")
+    print(f"{regressions} regressions beyond {args.threshold}%")
+    return 1 if regressions else 0
+
+
+def generate(args):
+    paths = write_corpus(args.directory, args.files, args.seed, **generator_settings(args))
+    print(f"wrote {len(paths)} files to {args.directory}")
+    return 0
+
+
+def add_generator_arguments(parser):
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--declarations', type=int, default=100, help='top-level items per file')
+    parser.add_argument('--members', type=int, default=4, help='most members per type')
+    parser.add_argument('--statements', type=int, default=4, help='most statements per method body')
+    parser.add_argument('--depth', type=int, default=3, help='expression nesting depth')
+    parser.add_argument('--chain', type=int, default=3, help='most terms per expression')
+    parser.add_argument('--logic', type=float, default=0.3, help='share of call arguments that are logic')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Parser and AST benchmark suite')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = commands.add_parser('generate', help='write a synthetic corpus')
+    generate_parser.add_argument('directory')
+    add_generator_arguments(generate_parser)
+
+    run_parser = commands.add_parser('run', help='benchmark every stage')
+    run_parser.add_argument('--corpus', default=None, help='directory of .xprs files (default: generate one)')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--out', default=None, help='save the results to this JSON file')
+    add_generator_arguments(run_parser)
+
+    compare_parser = commands.add_parser('compare', help='compare two saved results')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=10.0, help='percent')
+
+    args = arg_parser.parse_args()
+    return {'generate': generate, 'run': run, 'compare': compare}[args.command](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
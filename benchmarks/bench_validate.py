@@ -0,0 +1,70 @@
+# Purpose: Syntax-only validation against the full parse pipeline
+#
+# Times validate() (no parse tree, no AST, errors collected) and parse_program
+# with the array token stream (parse tree, listener, AST) on a valid program
+# repeated many times, and on the same program with an error in every copy.
+# Run from anywhere:
+#
+#     python benchmarks/bench_validate.py --scale 500
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from expresso_parse import LEXER_ARRAY, parse_program
+from expresso_validate import validate
+
+SOURCE = """
+type Animal {
+    int legs = 4;
+    method eat(Food food, int amount) {
+        int eaten = amount * (food + 1) - legs / 2;
+        digest(food, eaten <= amount and eaten > 0);
+    }
+}
+method main() {
+    feed(dog, 2 * farmSize);
+}
+"""
+
+BROKEN = SOURCE.replace("legs / 2;", "legs / ;")
+
+
+# Best time of repeat calls of fn(), with anything printed to stderr discarded
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Syntax-only validation against full parses')
+    arg_parser.add_argument('--scale', type=int, default=500, help='copies of the source to parse')
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    valid = SOURCE * args.scale
+    broken = BROKEN * args.scale
+    assert validate(valid) == []
+    assert len(validate(broken)) == args.scale
+
+    print(f"{'input':<8} {'case':<10} {'seconds':>9} {'KB/s':>9}")
+    for label, source in (('valid', valid), ('errors', broken)):
+        for name, fn in (('validate', lambda: validate(source)),
+                         ('parse', lambda: parse_program(source, lexer=LEXER_ARRAY))):
+            seconds = best_of(args.repeat, fn)
+            print(f"{label:<8} {name:<10} {seconds:>9.3f} {len(source) / 1024 / seconds:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
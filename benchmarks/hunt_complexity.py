@@ -0,0 +1,82 @@
+# Purpose: Hunt for parse inputs whose time grows superlinearly, and keep them
+#
+# Two commands:
+#
+#     hunt   grow every construct of the grammar (see expresso_complexity) around
+#            a new unit expression each round, print the growth exponents of the
+#            parser and the listener, and save minimized reproducers of every
+#            superlinear one into the perf regression corpus
+#     check  grow and measure every reproducer of the corpus again; exits 1 if
+#            any of them still grows faster than the threshold
+#
+# For example:
+#
+#     python benchmarks/hunt_complexity.py hunt --rounds 5 --grower params --grower calls
+#     python benchmarks/hunt_complexity.py check --threshold 1.3
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from expresso_complexity import DEFAULT_THRESHOLD, GROWERS, check_corpus, hunt
+
+CORPUS = os.path.join(ROOT, 'benchmarks', 'perf_corpus')
+
+
+def print_header():
+    print(f"{'grower':<12} {'tokens':>13} {'parse exp':>9} {'listener exp':>12}  unit")
+
+
+def print_measurement(measurement, flag):
+    tokens = f"{measurement.tokens[0]}-{measurement.tokens[-1]}"
+    print(f"{measurement.grower.name:<12} {tokens:>13} {measurement.parse_exponent:>9.2f} "
+          f"{measurement.listener_exponent:>12.2f}  {measurement.unit}{'  SUPERLINEAR' if flag else ''}")
+
+
+def run_hunt(args):
+    growers = [GROWERS[name] for name in args.grower] if args.grower else None
+    print_header()
+    findings = hunt(args.rounds, args.seed, args.threshold, growers, args.steps, args.repeat,
+                    None if args.dry_run else args.corpus, print_measurement)
+    print(f"{len(findings)} superlinear constructs"
+          + (f", reproducers saved to {args.corpus}" if findings and not args.dry_run else ''))
+    for measurement in findings:
+        print_measurement(measurement, True)
+    return 0
+
+
+def run_check(args):
+    print_header()
+    failures = 0
+    for entry, measurement in check_corpus(args.corpus, args.repeat):
+        flag = measurement.superlinear(args.threshold)
+        failures += flag
+        print_measurement(measurement, flag)
+    print(f"{failures} reproducers still superlinear beyond {args.threshold}")
+    return 1 if failures else 0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Hunt for superlinear parse inputs')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    for name, help in (('hunt', 'look for superlinear constructs'), ('check', 'measure the corpus again')):
+        command = commands.add_parser(name, help=help)
+        command.add_argument('--corpus', default=CORPUS, help='perf regression corpus directory')
+        command.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='largest linear exponent')
+        command.add_argument('--repeat', type=int, default=3)
+        if name == 'hunt':
+            command.add_argument('--rounds', type=int, default=3)
+            command.add_argument('--seed', type=int, default=0)
+            command.add_argument('--steps', type=int, default=4, help='doublings of every construct')
+            command.add_argument('--grower', choices=sorted(GROWERS), action='append')
+            command.add_argument('--dry-run', action='store_true', help='save no reproducers')
+
+    args = arg_parser.parse_args()
+    return run_hunt(args) if args.command == 'hunt' else run_check(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
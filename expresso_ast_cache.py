@@ -0,0 +1,163 @@
+# Purpose: Content-addressed on-disk cache of parsed Expresso ASTs
+#
+# Like .pyc files for Python, an ASTCache keeps the Program parsed from a source
+# so that an unchanged source is loaded instead of lexed and parsed again. Entries
+# are .xprsc files named after a hash of the source text, the front-end, and a
+# fingerprint of everything that decides the shape of the AST: the grammar, the
+# generated lexer and parser (and with them the serialized ATNs), the RegexLexer,
+# the parse entry points (expresso_parse), the listener, the native parser, the
+# ast_nodes classes and the binary encoding of entries (expresso_binary).
+# Editing any of them changes every key, so stale entries are simply never
+# looked up again.
+#
+# Only ASTs of sources without syntax errors are stored: the front-ends of the
+# build and of the parse daemon raise on them rather than recover, and a parse
+# that raises stores nothing.
+#
+# Entries are written to a temporary file and renamed into place, so concurrent
+# builds sharing a cache never read a partial entry. Each entry also records the
+# length and CRC-32 of its body, so one damaged on disk is a miss, and deleted,
+# rather than a hit that fails later in decode(). Only the standard library is
+# imported here; a warm lookup never loads the ANTLR runtime.
+
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+
+import ast_nodes
+from ast_nodes import ASTNode
+from expresso_binary import decode, encode
+
+# Bump when the layout of .xprsc files changes
+FORMAT_VERSION = 3
+
+CACHE_SUFFIX = '.xprsc'
+
+# File header: magic, then format version, then the full key the entry was
+# written for, then the length and CRC-32 of the body
+_MAGIC = b'XPRSC'
+_BODY = struct.Struct('<II')
+_HEADER_SIZE = len(_MAGIC) + 1 + 32 + _BODY.size
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Files whose contents decide what AST a source parses to, or how it is stored
+FINGERPRINT_FILES = ('Expresso.g4', 'ExpressoLexer.py', 'ExpressoParser.py', 'expresso_regex_lexer.py',
+                     'expresso_parse.py', 'expresso_listener.py', 'expresso_native.py', 'ast_nodes.py',
+                     'expresso_binary.py')
+
+_fingerprint = None
+
+
+# Directory holding cached ASTs: ast/ under the Expresso cache directory, which
+# EXPRESSO_CACHE_DIR overrides
+def default_cache_dir():
+    root = os.environ.get('EXPRESSO_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'expresso')
+    return os.path.join(root, 'ast')
+
+
+# Names and fields of every AST node class, in definition order
+def ast_schema():
+    return ';'.join(f"{cls.__name__}({','.join(cls.__slots__)})" for cls in vars(ast_nodes).values()
+                    if isinstance(cls, type) and issubclass(cls, ASTNode))
+
+
+# Hash of the parser sources and the AST schema, computed once per process
+def parser_fingerprint():
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256(f"xprsc {FORMAT_VERSION}\n{ast_schema()}\n".encode('utf-8'))
+        for name in FINGERPRINT_FILES:
+            with open(os.path.join(_HERE, name), 'rb') as f:
+                digest.update(name.encode('utf-8') + b'\0' + hashlib.sha256(f.read()).digest())
+        _fingerprint = digest.digest()
+    return _fingerprint
+
+
+class ASTCache:
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+
+    # Raw 32-byte key of a source for a front-end
+    def key(self, source, frontend):
+        digest = hashlib.sha256(parser_fingerprint())
+        digest.update(frontend.encode('utf-8') + b'\0')
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+
+    # Entries are spread over 256 subdirectories, like git objects
+    def path(self, key):
+        name = key.hex()
+        return os.path.join(self.cache_dir, name[:2], name[2:] + CACHE_SUFFIX)
+
+    # The encoded Program cached for key, or None. Entries written for another
+    # key or format version count as missing; entries whose body does not match
+    # its length and CRC-32 are damaged, and are deleted as well.
+    def load_payload(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        prefix = _MAGIC + bytes([FORMAT_VERSION]) + key
+        if data[:len(prefix)] != prefix:
+            return None
+        payload = data[_HEADER_SIZE:]
+        if len(data) < _HEADER_SIZE or _BODY.unpack_from(data, len(prefix)) != (len(payload), zlib.crc32(payload)):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return payload
+
+    def store_payload(self, key, payload):
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_MAGIC + bytes([FORMAT_VERSION]) + key + _BODY.pack(len(payload), zlib.crc32(payload)))
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    # The Program cached for source, or None
+    def load(self, source, frontend):
+        payload = self.load_payload(self.key(source, frontend))
+        if payload is None:
+            return None
+        try:
+            return decode(payload)
+        except Exception:
+            return None
+
+    def store(self, source, frontend, program):
+        self.store_payload(self.key(source, frontend), encode(program))
+
+    # Number of entries and their total size in bytes
+    def stats(self):
+        count = size = 0
+        for directory, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(CACHE_SUFFIX):
+                    count += 1
+                    size += os.path.getsize(os.path.join(directory, name))
+        return count, size
+
+
+# Parse source with parse(source) -> Program, going through cache
+def cached_parse(source, parse, frontend, cache=None):
+    cache = cache or ASTCache()
+    program = cache.load(source, frontend)
+    if program is None:
+        program = parse(source)
+        cache.store(source, frontend, program)
+    return program
@@ -0,0 +1,336 @@
+# Purpose: Compact binary encoding of Expresso ASTs
+#
+# encode() turns any value built from ast_nodes, lists, tuples, strings, ints,
+# floats, bools and None into bytes, and decode() turns those bytes back into the
+# same value. The layout is
+#
+#     b'XAST' version:u8 schema:u32 string-count:varint (length:varint utf-8)*  root
+#
+# where every value starts with a one-byte tag. Strings (identifiers, type names,
+# operators) are stored once in the string table and referenced by index. Ints
+# are zigzag varints. Nodes, lists and tuples give the size in bytes of their
+# contents right after the tag, so a reader can step over a whole subtree:
+#
+#     node:   16 + kind, size:varint, one value per field (in __slots__ order)
+#     list:   LIST,  size:varint, count:varint, values
+#     tuple:  TUPLE, size:varint, count:varint, values
+#
+# ASTReader reads a buffer in place through a memoryview (bytes, a bytearray or
+# an mmap) and hands out LazyNodes, which decode their fields only when they are
+# accessed; materialize() decodes a subtree into ordinary nodes.
+#
+# Both directions keep their work on explicit stacks, so trees of any depth can
+# be encoded and decoded. Subtrees shared between parents, as made by a
+# HashConsFactory, are written out once per parent.
+
+import math
+import struct
+import zlib
+
+import ast_nodes
+from ast_nodes import ASTNode, node_layout
+
+MAGIC = b'XAST'
+
+# Bump when the layout of encoded values changes
+FORMAT_VERSION = 1
+
+# Value tags; node tags are _NODE + the index of the node class in KINDS
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_STR = 4
+_FLOAT = 5
+_LIST = 6
+_TUPLE = 7
+_NODE = 16
+
+# Node classes in ast_nodes definition order; a node's kind is its index here
+KINDS = tuple(cls for cls in vars(ast_nodes).values()
+              if isinstance(cls, type) and issubclass(cls, ASTNode) and cls is not ASTNode)
+_KIND_INDEX = {cls: kind for kind, cls in enumerate(KINDS)}
+# Node tag -> (node class, number of fields)
+_NODE_TAGS = {_NODE + kind: (cls, len(cls.__slots__)) for kind, cls in enumerate(KINDS)}
+
+# Encoded data carries a checksum of the node classes and their fields, so that
+# data written for another version of ast_nodes is rejected rather than misread
+SCHEMA = zlib.crc32(';'.join(f"{cls.__name__}({','.join(cls.__slots__)})" for cls in KINDS).encode('ascii'))
+
+_FLOAT_STRUCT = struct.Struct('<d')
+_HEADER = MAGIC + bytes([FORMAT_VERSION]) + SCHEMA.to_bytes(4, 'little')
+
+_COMPOSITE = (ASTNode, list, tuple)
+
+
+def _varint(n):
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _varint_size(n):
+    return 1 if n < 0x80 else (n.bit_length() + 6) // 7
+
+
+def _zigzag(n):
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+
+# Tag and payload of a scalar, as bytes; strings are numbered in strings on first use
+def _scalar(value, strings):
+    if value is None:
+        return b'\x00'
+    if value is False:
+        return b'\x01'
+    if value is True:
+        return b'\x02'
+    if isinstance(value, str):
+        encoded = strings.get(value)
+        if encoded is None:
+            encoded = strings[value] = bytes([_STR]) + _varint(len(strings))
+        return encoded
+    if isinstance(value, int):
+        return bytes([_INT]) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return bytes([_FLOAT]) + _FLOAT_STRUCT.pack(value)
+    raise TypeError(f"cannot encode {type(value).__name__} value {value!r}")
+
+
+# Tag of a composite value, and the values it contains
+def _composite(value):
+    if isinstance(value, ASTNode):
+        cls, fields = node_layout(type(value))
+        return _NODE + _KIND_INDEX[cls], [getattr(value, field) for field in fields]
+    if isinstance(value, list):
+        return _LIST, value
+    return _TUPLE, value
+
+
+# Encode value (usually a Program) into bytes.
+# The tree is written out back to front, last child first and each value's bytes
+# reversed, so that a composite's size is known by the time its tag and size are
+# written; the output is turned around at the end.
+def encode(value):
+    strings = {}
+    # (class, value) -> encoded scalar, reversed. Floats are keyed by their sign
+    # too: -0.0 == 0.0, and must not come back as whichever was seen first.
+    scalars = {}
+    out = bytearray()
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        cls = item.__class__
+        if cls is _Close:
+            if item.tag < _NODE:
+                out += _varint(item.count)[::-1]
+            out += _varint(len(out) - item.start)[::-1]
+            out.append(item.tag)
+        elif isinstance(item, _COMPOSITE):
+            tag, children = _composite(item)
+            stack.append(_Close(tag, len(out), len(children)))
+            stack.extend(children)
+        else:
+            key = (cls, item, math.copysign(1.0, item)) if isinstance(item, float) else (cls, item)
+            encoded = scalars.get(key)
+            if encoded is None:
+                encoded = scalars[key] = _scalar(item, strings)[::-1]
+            out += encoded
+    out.reverse()
+
+    head = bytearray(_HEADER)
+    head += _varint(len(strings))
+    for string in strings:
+        encoded = string.encode('utf-8', 'surrogatepass')
+        head += _varint(len(encoded))
+        head += encoded
+    return bytes(head + out)
+
+
+# Stack entry of encode: the children of a composite have all been written
+class _Close:
+    __slots__ = ('tag', 'start', 'count')
+
+    def __init__(self, tag, start, count):
+        self.tag = tag
+        self.start = start
+        self.count = count
+
+
+# Reads encoded data in place. Strings are decoded up front; everything else
+# only when it is asked for.
+class ASTReader:
+
+    def __init__(self, data):
+        view = memoryview(data)
+        if view.format != 'B' or view.ndim != 1:
+            view = view.cast('B')
+        self.view = view
+        if bytes(view[:4]) != MAGIC:
+            raise ValueError("not an encoded Expresso AST")
+        if view[4] != FORMAT_VERSION:
+            raise ValueError(f"unsupported AST format version {view[4]}")
+        if int.from_bytes(view[5:9], 'little') != SCHEMA:
+            raise ValueError("AST data was encoded for different ast_nodes classes")
+        count, pos = self._varint(9)
+        strings = []
+        for _ in range(count):
+            length, pos = self._varint(pos)
+            strings.append(str(view[pos:pos + length], 'utf-8', 'surrogatepass'))
+            pos += length
+        self.strings = strings
+        # Offset of the root value
+        self.offset = pos
+
+    def _varint(self, pos):
+        view = self.view
+        byte = view[pos]
+        pos += 1
+        n = byte & 0x7f
+        shift = 7
+        while byte & 0x80:
+            byte = view[pos]
+            pos += 1
+            n |= (byte & 0x7f) << shift
+            shift += 7
+        return n, pos
+
+    # The value at offset as a scalar or a LazyNode; lists and tuples come back as
+    # lists and tuples of those. Also returns the offset just past the value.
+    def value_at(self, offset):
+        tag = self.view[offset]
+        if tag >= _NODE:
+            size, pos = self._varint(offset + 1)
+            return LazyNode(self, offset), pos + size
+        if tag == _LIST or tag == _TUPLE:
+            size, pos = self._varint(offset + 1)
+            end = pos + size
+            count, pos = self._varint(pos)
+            items = []
+            for _ in range(count):
+                item, pos = self.value_at(pos)
+                items.append(item)
+            return (items if tag == _LIST else tuple(items)), end
+        return self._scalar_at(offset)
+
+    def _scalar_at(self, offset):
+        tag = self.view[offset]
+        if tag == _STR:
+            index, pos = self._varint(offset + 1)
+            return self.strings[index], pos
+        if tag == _INT:
+            n, pos = self._varint(offset + 1)
+            return (n >> 1) ^ -(n & 1), pos
+        if tag == _NONE:
+            return None, offset + 1
+        if tag == _FALSE or tag == _TRUE:
+            return tag == _TRUE, offset + 1
+        if tag == _FLOAT:
+            return _FLOAT_STRUCT.unpack_from(self.view, offset + 1)[0], offset + 9
+        raise ValueError(f"bad value tag {tag} at offset {offset}")
+
+    # The root value, decoded lazily
+    def root(self):
+        return self.value_at(self.offset)[0]
+
+    # Decode the value at offset (by default the root) into ordinary nodes
+    def materialize(self, offset=None):
+        view = self.view
+        strings = self.strings
+        varint = self._varint
+        pos = self.offset if offset is None else offset
+        # Composites still being decoded: [class or container type, values still missing, values]
+        frames = []
+        while True:
+            tag = view[pos]
+            if tag >= _NODE:
+                # Step over the size, which is only needed to skip the node
+                pos += 1
+                while view[pos] & 0x80:
+                    pos += 1
+                pos += 1
+                cls, fields = _NODE_TAGS[tag]
+                if fields:
+                    frames.append([cls, fields, []])
+                    continue
+                value = cls()
+            elif tag == _STR:
+                byte = view[pos + 1]
+                if byte < 0x80:
+                    value = strings[byte]
+                    pos += 2
+                else:
+                    index, pos = varint(pos + 1)
+                    value = strings[index]
+            elif tag == _INT and view[pos + 1] < 0x80:
+                byte = view[pos + 1]
+                value = (byte >> 1) ^ -(byte & 1)
+                pos += 2
+            elif tag == _LIST or tag == _TUPLE:
+                _, pos = varint(pos + 1)
+                count, pos = varint(pos)
+                if count:
+                    frames.append([list if tag == _LIST else tuple, count, []])
+                    continue
+                value = [] if tag == _LIST else ()
+            else:
+                value, pos = self._scalar_at(pos)
+            # Hand the value to the composites waiting for it, finishing those that are complete
+            while frames:
+                frame = frames[-1]
+                frame[2].append(value)
+                frame[1] -= 1
+                if frame[1]:
+                    break
+                frames.pop()
+                build, _, values = frame
+                if build is list:
+                    value = values
+                elif build is tuple:
+                    value = tuple(values)
+                else:
+                    value = build(*values)
+            else:
+                return value
+
+
+# A node of an ASTReader, decoded field by field on access
+class LazyNode:
+    __slots__ = ('reader', 'offset', 'kind')
+
+    def __init__(self, reader, offset):
+        self.reader = reader
+        self.offset = offset
+        self.kind = KINDS[reader.view[offset] - _NODE]
+
+    def __getattr__(self, name):
+        try:
+            index = self.kind.__slots__.index(name)
+        except ValueError:
+            raise AttributeError(f"{self.kind.__name__} has no field {name!r}") from None
+        reader = self.reader
+        _, pos = reader._varint(self.offset + 1)
+        # Step over the fields before it
+        for _ in range(index):
+            tag = reader.view[pos]
+            if tag >= _NODE or tag == _LIST or tag == _TUPLE:
+                size, pos = reader._varint(pos + 1)
+                pos += size
+            else:
+                _, pos = reader._scalar_at(pos)
+        return reader.value_at(pos)[0]
+
+    # The subtree as ordinary nodes
+    def materialize(self):
+        return self.reader.materialize(self.offset)
+
+    def __repr__(self):
+        return f"LazyNode({self.kind.__name__} at {self.offset})"
+
+
+# Decode data written by encode() into ordinary nodes
+def decode(data):
+    return ASTReader(data).materialize()
@@ -0,0 +1,162 @@
+# Purpose: Project-level build driver for the Expresso language
+#
+# Finds every .xprs file under a directory and parses them in parallel in a
+# process pool. Each worker imports the parser and warms its DFAs once, when it
+# starts, rather than once per file. With an ASTCache, sources parsed by an
+# earlier build are loaded from the cache up front, and the pool is only started
+# for the ones that are not there; the workers add what they parse.
+
+import os
+import time
+
+from expresso_binary import decode, encode
+
+FRONTEND_ANTLR = 'antlr'
+FRONTEND_NATIVE = 'native'
+
+SOURCE_SUFFIX = '.xprs'
+
+# Parsed once by every worker before it takes any files
+WARMUP_SOURCE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a, float b) {
+        int total = a + b * (c - 1);
+        foo(total, 2) / 3;
+    }
+}
+int globalVar = 0;
+"""
+
+_parse = None
+_frontend = None
+_cache = None
+
+
+# The outcome of parsing one file. The AST travels back from the worker as a
+# compact binary encoding (expresso_binary), so that it is serialized once in the
+# worker and decoded on demand.
+class FileResult:
+    def __init__(self, path, seconds, payload, error, cached=False):
+        self.path = path
+        self.seconds = seconds
+        self.payload = payload
+        self.error = error
+        self.cached = cached
+
+    @property
+    def program(self):
+        return decode(self.payload) if self.payload is not None else None
+
+    def __repr__(self):
+        return f"FileResult(path={self.path}, seconds={self.seconds}, error={self.error}, cached={self.cached})"
+
+
+# All .xprs files under root, in a stable order
+def find_sources(root):
+    sources = []
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        sources.extend(os.path.join(directory, name) for name in sorted(files) if name.endswith(SOURCE_SUFFIX))
+    return sources
+
+
+def _parser_for(frontend):
+    if frontend == FRONTEND_NATIVE:
+        from expresso_native import parse_native
+        return parse_native
+    if frontend == FRONTEND_ANTLR:
+        from expresso_dfa_cache import load_dfa_cache
+        from expresso_parse import parse_checked
+        load_dfa_cache()
+        return lambda source: parse_checked(source).program
+    raise ValueError(f"unknown frontend: {frontend!r}")
+
+
+# Pool initializer: import the front-end and warm it up once per worker
+def _init_worker(frontend, cache_dir=None):
+    global _parse, _frontend, _cache
+    _parse = _parser_for(frontend)
+    _frontend = frontend
+    if cache_dir is not None:
+        from expresso_ast_cache import ASTCache
+        _cache = ASTCache(cache_dir)
+    _parse(WARMUP_SOURCE)
+
+
+def _parse_file(path):
+    start = time.perf_counter()
+    try:
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        program = _parse(source)
+        payload = encode(program)
+        if _cache is not None:
+            _cache.store_payload(_cache.key(source, _frontend), payload)
+        error = None
+    except Exception as e:
+        payload = None
+        error = f"{type(e).__name__}: {e}"
+    return FileResult(path, time.perf_counter() - start, payload, error)
+
+
+# The FileResult of a source found in cache, or None
+def _load_cached(path, frontend, cache):
+    start = time.perf_counter()
+    try:
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError):
+        # Left for a worker to report
+        return None
+    payload = cache.load_payload(cache.key(source, frontend))
+    if payload is None:
+        return None
+    return FileResult(path, time.perf_counter() - start, payload, None, cached=True)
+
+
+# Parse every source under root in a pool of workers, returning FileResults in path order.
+# With an ASTCache, only the sources missing from it are parsed.
+def build(root, workers=None, frontend=FRONTEND_ANTLR, cache=None):
+    sources = find_sources(root)
+    results = {}
+    if cache is not None:
+        for path in sources:
+            result = _load_cached(path, frontend, cache)
+            if result is not None:
+                results[path] = result
+    pending = [path for path in sources if path not in results]
+    if pending:
+        # Imported here: it is slow to import, and the parse daemon's client
+        # (expresso_serve) imports this module for its constants
+        from concurrent.futures import ProcessPoolExecutor
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(pending) // (workers * 4))
+        cache_dir = cache.cache_dir if cache is not None else None
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(frontend, cache_dir)) as executor:
+            for result in executor.map(_parse_file, pending, chunksize=chunksize):
+                results[result.path] = result
+    return [results[path] for path in sources]
+
+
+# Entry point of `expresso build <dir>`: build and print per-file timings and throughput
+def build_command(root, workers=None, frontend=FRONTEND_ANTLR, out=None, cache=None):
+    start = time.perf_counter()
+    results = build(root, workers, frontend, cache)
+    elapsed = time.perf_counter() - start
+
+    failures = 0
+    for result in results:
+        path = os.path.relpath(result.path, root)
+        if result.error is None:
+            print(f"{result.seconds * 1000:10.2f} ms  {path}{'  (cached)' if result.cached else ''}", file=out)
+        else:
+            failures += 1
+            print(f"{result.seconds * 1000:10.2f} ms  {path}  FAILED {result.error}", file=out)
+
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+    cached = sum(result.cached for result in results)
+    print(f"{len(results)} files, {failures} failed, in {elapsed:.3f} s ({rate:.1f} files/sec, {cached} cached)",
+          file=out)
+    return 1 if failures else 0
@@ -0,0 +1,110 @@
+# Purpose: Compact CharStreams for ExpressoLexer over bytes and mmap buffers
+#
+# ANTLR's InputStream keeps the source twice: as a str and as a list of code
+# points, one pointer per character. ByteCharStream reads the characters straight
+# out of a bytes-like buffer instead. Every token of Expresso.g4 is ASCII, so an
+# ASCII buffer is lexed in place, one byte per character, and a file can be lexed
+# from an mmap without ever being read into a Python string. Other UTF-8 input is
+# decoded once into a UTF-32 buffer, four bytes per character.
+#
+# Tokens made by the default CommonTokenFactory do not copy their text; it is
+# sliced from the stream and decoded the first time a token's text is read.
+
+import mmap
+import re
+
+from antlr4.Token import Token
+
+# Any byte outside the ASCII range
+_NON_ASCII = re.compile(rb'[^\x00-\x7f]')
+
+
+class ByteCharStream:
+    __slots__ = ('name', 'data', 'encoding', '_index', '_size')
+
+    def __init__(self, buffer, name='<bytes>'):
+        self.name = name
+        if _NON_ASCII.search(buffer) is None:
+            self.data = buffer
+            self.encoding = 'ascii'
+        else:
+            text = str(buffer, 'utf-8')
+            self.data = memoryview(text.encode('utf-32-le')).cast('I')
+            self.encoding = 'utf-32-le'
+        self._index = 0
+        self._size = len(self.data)
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def size(self):
+        return self._size
+
+    def reset(self):
+        self._index = 0
+
+    def consume(self):
+        if self._index >= self._size:
+            raise Exception("cannot consume EOF")
+        self._index += 1
+
+    def LA(self, offset):
+        if offset == 0:
+            return 0
+        if offset < 0:
+            offset += 1
+        pos = self._index + offset - 1
+        if pos < 0 or pos >= self._size:
+            return Token.EOF
+        return self.data[pos]
+
+    def LT(self, offset):
+        return self.LA(offset)
+
+    # The whole buffer is always available, so marks need no bookkeeping
+    def mark(self):
+        return -1
+
+    def release(self, marker):
+        pass
+
+    def seek(self, index):
+        self._index = min(index, self._size)
+
+    def getText(self, start, stop):
+        if start >= self._size:
+            return ""
+        return str(self.data[start:min(stop, self._size - 1) + 1], self.encoding)
+
+    def __str__(self):
+        return self.getText(0, self._size - 1)
+
+
+# A ByteCharStream over a memory-mapped file.
+# The stream stays usable until close(); it can also be used as a context manager.
+class MappedCharStream(ByteCharStream):
+    __slots__ = ('_file', '_map')
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._map = None
+        super().__init__(self._map if self._map is not None else b'', name=path)
+
+    def close(self):
+        self.data = b''
+        self._size = 0
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,301 @@
+# Purpose: Hunt for Expresso inputs whose parse time grows faster than their size
+#
+# A Grower takes one construct of Expresso.g4 and makes it n times bigger: a
+# chain of n operands of one operator rule (relational, equality, and, or,
+# expression, term), n levels of nesting through parentheses or call arguments,
+# or n arguments, parameters, members or statements. What it repeats is a unit,
+# an expression drawn from expresso_corpus.ProgramGenerator, so each round of
+# the hunt grows the same constructs around different content.
+#
+# measure() parses a grower's program at doubling sizes and fits the growth
+# exponent of the ExpressoParser time and of the ExpressoListener time against
+# the number of tokens, log(seconds) = exponent * log(tokens) + c. Linear work
+# has an exponent near 1; one above the threshold is a finding. A finding is
+# measured again before it is believed, its unit is cut down for as long as the
+# growth stays superlinear, and it is saved into a perf regression corpus: the
+# program at its largest size, and an entry in the corpus manifest from which
+# check_corpus() grows and measures it again.
+#
+#     python benchmarks/hunt_complexity.py hunt --rounds 5
+#     python benchmarks/hunt_complexity.py check
+
+import gc
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+
+from expresso_corpus import ProgramGenerator
+from expresso_parse import MODE_TWO_STAGE, build_ast, parse_tree
+from expresso_tokens import ArrayTokenStream
+from expresso_validate import validate
+
+# Bump when the layout of the corpus manifest changes
+FORMAT_VERSION = 1
+
+# Exponents above this are superlinear. Linear work measures anywhere from 0.8
+# to 1.4 on a busy machine; quadratic work measures close to 2.
+DEFAULT_THRESHOLD = 1.5
+
+MANIFEST = 'manifest.json'
+
+# Smallest nesting measured, and fewest tokens of the smallest other program
+NESTING_START = 8
+MIN_TOKENS = 250
+
+# A grower stops at the first size whose parse or walk takes longer than this,
+# once it has three sizes to fit, so that superlinear growth stays affordable
+MAX_SECONDS = 0.5
+
+
+# One construct of the grammar grown n times around a unit expression. Nesting
+# costs recursion depth in the parser, so a nesting grower starts at
+# NESTING_START levels; the others start at as many repeats as make
+# MIN_TOKENS tokens, so that even the smallest size takes measurable time.
+class Grower:
+
+    def __init__(self, name, rule, build, nesting=False):
+        self.name = name
+        self.rule = rule
+        self.build = build
+        self.nesting = nesting
+
+    # steps doubling sizes to grow to around a unit of unit_tokens tokens
+    def sizes(self, unit_tokens, steps):
+        start = NESTING_START if self.nesting else max(NESTING_START, -(-MIN_TOKENS // unit_tokens))
+        return [start << step for step in range(steps)]
+
+    def __repr__(self):
+        return f"Grower(name={self.name!r}, rule={self.rule!r})"
+
+
+# unit joined n times by the operators, taken in turn
+def _chain(unit, n, operators):
+    ops = itertools.cycle(operators)
+    parts = [unit]
+    for _ in range(n - 1):
+        parts += [next(ops), unit]
+    return ' '.join(parts)
+
+
+GROWERS = {grower.name: grower for grower in (
+    Grower('relational', 'relational', lambda unit, n: f"f({_chain(unit, n, ('<', '<=', '>', '>='))});"),
+    Grower('equality', 'equality', lambda unit, n: f"f({_chain(unit, n, ('==', '!='))});"),
+    Grower('and', 'and', lambda unit, n: f"f({_chain(unit, n, ('and',))});"),
+    Grower('or', 'or', lambda unit, n: f"f({_chain(unit, n, ('or',))});"),
+    Grower('expression', 'expression', lambda unit, n: f"{_chain(unit, n, ('+', '-'))};"),
+    Grower('term', 'term', lambda unit, n: f"{_chain(f'({unit})', n, ('*', '/'))};"),
+    Grower('parens', 'factor', lambda unit, n: '(' * n + unit + ')' * n + ';', nesting=True),
+    Grower('calls', 'method_call', lambda unit, n: 'f(' * n + unit + ')' * n + ';', nesting=True),
+    Grower('logic_calls', 'value', lambda unit, n: f'f({unit} < ' * n + unit + ')' * n + ';', nesting=True),
+    Grower('arguments', 'method_call', lambda unit, n: f"f({', '.join([unit] * n)});"),
+    Grower('params', 'params',
+           lambda unit, n: f"method m({', '.join(f'int p{i}' for i in range(n))}) {{ {unit}; }}"),
+    Grower('type_body', 'type_body', lambda unit, n: 'type T {' + f' int v = {unit};' * n + ' }'),
+    Grower('method_body', 'method_body', lambda unit, n: 'method m() {' + f' {unit};' * n + ' }'),
+    Grower('program', 'program', lambda unit, n: f'{unit};\n' * n),
+)}
+
+
+# Median of the slopes of log(seconds) against log(sizes) between every two
+# points (the Theil-Sen estimator): one size slowed down by the machine moves
+# it far less than it would a least-squares fit
+def growth_exponent(sizes, seconds):
+    points = [(math.log(size), math.log(max(second, 1e-9))) for size, second in zip(sizes, seconds)]
+    slopes = sorted((y2 - y1) / (x2 - x1) for (x1, y1), (x2, y2) in itertools.combinations(points, 2)
+                    if x2 != x1)
+    if not slopes:
+        return 0.0
+    middle = len(slopes) // 2
+    return slopes[middle] if len(slopes) % 2 else (slopes[middle - 1] + slopes[middle]) / 2
+
+
+# Timings of one grower around one unit, at sizes (growths) holding tokens tokens
+class Measurement:
+
+    def __init__(self, grower, unit, sizes, tokens, parse_seconds, listener_seconds):
+        self.grower = grower
+        self.unit = unit
+        self.sizes = sizes
+        self.tokens = tokens
+        self.parse_seconds = parse_seconds
+        self.listener_seconds = listener_seconds
+        self.parse_exponent = growth_exponent(tokens, parse_seconds)
+        self.listener_exponent = growth_exponent(tokens, listener_seconds)
+
+    def superlinear(self, threshold=DEFAULT_THRESHOLD):
+        return self.parse_exponent > threshold or self.listener_exponent > threshold
+
+    def __repr__(self):
+        return (f"Measurement(grower={self.grower.name!r}, unit={self.unit!r}, "
+                f"parse_exponent={self.parse_exponent:.2f}, listener_exponent={self.listener_exponent:.2f})")
+
+
+# Best CPU time of repeat calls of fn(). CPU time rather than wall time, as the
+# other processes of a busy machine would otherwise decide the exponent; and
+# with the collector off, so that its pauses do not land on whichever size
+# happens to trigger them.
+def _best_of(repeat, fn):
+    best = float('inf')
+    enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.process_time()
+            fn()
+            best = min(best, time.process_time() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+# The token texts of unit
+def _unit_tokens(unit):
+    stream = ArrayTokenStream(unit)
+    return [stream.text(i) for i in range(len(stream.types) - 1)]
+
+
+# Parse grower's program around unit at steps doubling sizes and time the
+# parser and the listener apart, each the best of repeat runs
+def measure(grower, unit, steps=4, repeat=3):
+    sizes = grower.sizes(len(_unit_tokens(unit)), steps)
+    tokens = []
+    parse_seconds = []
+    listener_seconds = []
+    for size in sizes:
+        stream = ArrayTokenStream(grower.build(unit, size))
+        tokens.append(len(stream.types) - 1)
+
+        def parse():
+            stream.seek(0)
+            return parse_tree(stream, MODE_TWO_STAGE)[0]
+
+        tree = parse()
+        parse_seconds.append(_best_of(repeat, parse))
+        listener_seconds.append(_best_of(repeat, lambda: build_ast(tree)))
+        if len(tokens) >= 3 and max(parse_seconds[-1], listener_seconds[-1]) > MAX_SECONDS:
+            break
+    sizes = sizes[:len(tokens)]
+    return Measurement(grower, unit, sizes, tokens, parse_seconds, listener_seconds)
+
+
+# Cut unit down to as few tokens as keep grower's program valid and
+# still_bad(unit) true: try the single identifier 'a', then drop ever smaller
+# runs of tokens, then try the runs that are left on their own, shortest first,
+# which finds an argument or operand inside brackets. At most max_checks units
+# are passed to still_bad.
+def minimize_unit(grower, unit, still_bad, max_checks=12):
+    checks = 0
+
+    def accept(candidate):
+        nonlocal checks
+        if not candidate or checks >= max_checks or validate(grower.build(' '.join(candidate), 2)):
+            return False
+        checks += 1
+        return still_bad(' '.join(candidate))
+
+    if unit != 'a' and accept(['a']):
+        return 'a'
+    tokens = _unit_tokens(unit)
+    run = len(tokens) // 2
+    while run >= 1:
+        start = 0
+        while start < len(tokens):
+            candidate = tokens[:start] + tokens[start + run:]
+            if accept(candidate):
+                tokens = candidate
+            else:
+                start += run
+        run //= 2
+    for length in range(1, len(tokens)):
+        slices = (tokens[start:start + length] for start in range(len(tokens) - length + 1))
+        found = next((candidate for candidate in slices if accept(candidate)), None)
+        if found is not None:
+            return ' '.join(found)
+    return ' '.join(tokens)
+
+
+def load_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {'version': FORMAT_VERSION, 'entries': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Save measurement into the corpus in directory: its program at the largest
+# size measured, and its entry in the manifest, replacing any older one for
+# the same grower and unit. Returns the path of the program.
+def save_reproducer(directory, measurement, steps):
+    grower = measurement.grower
+    digest = hashlib.sha1(measurement.unit.encode('utf-8')).hexdigest()[:8]
+    name = f"{grower.name}_{digest}.xprs"
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(grower.build(measurement.unit, measurement.sizes[-1]) + '\n')
+
+    manifest = load_manifest(directory)
+    entries = [entry for entry in manifest['entries'] if entry['file'] != name]
+    entries.append({
+        'file': name,
+        'grower': grower.name,
+        'rule': grower.rule,
+        'unit': measurement.unit,
+        'steps': steps,
+        'tokens': measurement.tokens[-1],
+        'parse_exponent': round(measurement.parse_exponent, 2),
+        'listener_exponent': round(measurement.listener_exponent, 2),
+    })
+    manifest['entries'] = sorted(entries, key=lambda entry: entry['file'])
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    return path
+
+
+# Grow and measure every reproducer of the corpus in directory again, returning
+# (entry, Measurement) pairs
+def check_corpus(directory, repeat=3):
+    results = []
+    for entry in load_manifest(directory)['entries']:
+        results.append((entry, measure(GROWERS[entry['grower']], entry['unit'], entry['steps'], repeat)))
+    return results
+
+
+# Run rounds of the hunt: every grower around the plain unit 'a', then around
+# one expression from a ProgramGenerator(seed) per further round. Findings are
+# confirmed, minimized and, when corpus is a directory, saved there. report is
+# called with every Measurement and whether it is a finding; returns the
+# confirmed Measurements.
+def hunt(rounds=3, seed=0, threshold=DEFAULT_THRESHOLD, growers=None, steps=4, repeat=3,
+         corpus=None, report=None, max_checks=12):
+    generator = ProgramGenerator(seed, depth=1, chain=3)
+    findings = []
+    for round_number in range(rounds):
+        unit = 'a' if round_number == 0 else generator.expression(generator.random.randint(0, 2))
+        for grower in growers or GROWERS.values():
+            try:
+                measurement = measure(grower, unit, steps, repeat)
+            except RecursionError:
+                # Deeper nesting than the recursive descent parser can take
+                continue
+            found = measurement.superlinear(threshold)
+            if found:
+                # Believe it only if a second, longer measurement agrees
+                found = measure(grower, unit, steps, repeat * 2).superlinear(threshold)
+            if report is not None:
+                report(measurement, found)
+            if not found:
+                continue
+            small = minimize_unit(grower, unit, lambda candidate: measure(grower, candidate, steps, repeat)
+                                  .superlinear(threshold), max_checks)
+            measurement = measure(grower, small, steps, repeat * 2)
+            findings.append(measurement)
+            if corpus is not None:
+                save_reproducer(corpus, measurement, steps)
+    return findings
@@ -0,0 +1,176 @@
+# Purpose: Synthetic Expresso programs of tunable size and shape
+#
+# ProgramGenerator writes random programs that follow Expresso.g4, one method
+# per grammar rule, so every program it makes is valid for both front-ends. The
+# same seed and settings always give the same programs. The settings:
+#
+#     declarations  top-level declarations and statements per program
+#     mix           relative weights of 'type', 'method', 'variable' and 'statement'
+#                   among the top-level items
+#     members       members per type body, methods and fields alike
+#     statements    statements and local variables per method body
+#     depth         how deep expressions may nest through parentheses and call arguments
+#     chain         most terms in an expression (a + b * c - d ...) and most
+#                   comparisons in a logic value
+#     logic         chance that a call argument is a logic value (a < b and c == d ...)
+#                   rather than a plain expression
+#
+# write_corpus fills a directory with such programs, as a workload for the
+# benchmarks and for `main.py build`.
+
+import os
+import random
+
+# Identifiers the generator draws from; none of them is a keyword
+NAMES = ('alpha', 'beta', 'gamma', 'delta', 'count', 'total', 'size', 'limit', 'value', 'item',
+         'index', 'left', 'right', 'node', 'amount', 'price', 'order', 'customer', 'legs', 'food')
+TYPE_NAMES = ('int', 'float', 'bool', 'Food', 'Order', 'Customer', 'Animal', 'List', 'Map', 'Price')
+
+DEFAULT_MIX = {'type': 3, 'method': 3, 'variable': 2, 'statement': 2}
+
+# Operators of relational and equality
+COMPARISONS = ('<', '<=', '>', '>=', '==', '!=')
+
+
+class ProgramGenerator:
+
+    def __init__(self, seed=0, declarations=20, mix=None, members=4, statements=4,
+                 depth=3, chain=3, logic=0.3):
+        self.random = random.Random(seed)
+        self.declarations = declarations
+        self.mix = mix or DEFAULT_MIX
+        self.members = members
+        self.statements = statements
+        self.depth = depth
+        self.chain = chain
+        self.logic = logic
+
+    def name(self):
+        return self.random.choice(NAMES)
+
+    def type_name(self):
+        return self.random.choice(TYPE_NAMES)
+
+    # program: (type_declaration | method_declaration | variable_declaration | statement)*
+    def program(self):
+        kinds = list(self.mix)
+        weights = [self.mix[kind] for kind in kinds]
+        items = []
+        for kind in self.random.choices(kinds, weights, k=self.declarations):
+            if kind == 'type':
+                items.append(self.type_declaration())
+            elif kind == 'method':
+                items.append(self.method_declaration(''))
+            elif kind == 'variable':
+                items.append(self.variable_declaration(''))
+            else:
+                items.append(self.statement(''))
+        return '\n'.join(items) + '\n'
+
+    # type_declaration: TYPE ID (LCURLY type_body RCURLY | SEMI)
+    def type_declaration(self):
+        name = self.type_name()
+        if self.members == 0 or self.random.random() < 0.1:
+            return f"type {name};"
+        members = []
+        for _ in range(self.random.randint(1, self.members)):
+            if self.random.random() < 0.5:
+                members.append(self.method_declaration('    '))
+            else:
+                members.append(self.variable_declaration('    '))
+        return f"type {name} {{\n" + '\n'.join(members) + "\n}"
+
+    # method_declaration: METHOD ID LPAREN params RPAREN (LCURLY method_body RCURLY | SEMI)
+    def method_declaration(self, indent):
+        params = ', '.join(f"{self.type_name()} {self.name()}" for _ in range(self.random.randint(0, 3)))
+        head = f"{indent}method {self.name()}({params})"
+        if self.random.random() < 0.1:
+            return head + ';'
+        body = []
+        for _ in range(self.random.randint(0, self.statements)):
+            if self.random.random() < 0.3:
+                body.append(self.variable_declaration(indent + '    '))
+            else:
+                body.append(self.statement(indent + '    '))
+        if not body:
+            return head + ' { }'
+        return head + " {\n" + '\n'.join(body) + f"\n{indent}}}"
+
+    # variable_declaration: type_name ID (ASSIGN expression)? SEMI
+    def variable_declaration(self, indent):
+        if self.random.random() < 0.2:
+            return f"{indent}{self.type_name()} {self.name()};"
+        return f"{indent}{self.type_name()} {self.name()} = {self.expression(self.depth)};"
+
+    # statement: expression SEMI
+    def statement(self, indent):
+        return f"{indent}{self.expression(self.depth)};"
+
+    # value: logic, which is a plain expression when it has no logic operator
+    def value(self, depth):
+        if self.random.random() < self.logic:
+            return self.logic_value(depth)
+        return self.expression(depth)
+
+    # Comparisons (relational and equality) joined by 'and' and 'or'; the first
+    # operand carries the nesting
+    def logic_value(self, depth):
+        parts = []
+        for i in range(self.random.randint(1, max(1, self.chain))):
+            if i:
+                parts.append(self.random.choice(('and', 'or')))
+            parts.append(f"{self.expression(depth if i == 0 else 0)} {self.random.choice(COMPARISONS)} "
+                         f"{self.expression(0)}")
+        return ' '.join(parts)
+
+    # expression: term ((PLUS | MINUS) term)*
+    # An expression nests depth levels deep through one of its factors, chosen at
+    # random; every other factor is an identifier or a number. That keeps the size
+    # of a program linear in depth and chain, however large they are.
+    def expression(self, depth):
+        count = self.random.randint(1, max(1, self.chain))
+        nested = self.random.randrange(count)
+        parts = []
+        for i in range(count):
+            if i:
+                parts.append(self.random.choice(('+', '-')))
+            parts.append(self.term(depth if i == nested else 0))
+        return ' '.join(parts)
+
+    # term: factor ((STAR | SLASH) factor)*, with one or two factors
+    def term(self, depth):
+        if self.random.random() < 0.7:
+            return self.factor(depth)
+        return f"{self.factor(depth)} {self.random.choice(('*', '/'))} {self.factor(0)}"
+
+    # factor: LPAREN expression RPAREN | method_call | ID | NUMBER
+    def factor(self, depth):
+        if depth > 0:
+            if self.random.random() < 0.4:
+                return f"({self.expression(depth - 1)})"
+            return self.method_call(depth - 1)
+        if self.random.random() < 0.7:
+            return self.name()
+        return str(self.random.randint(0, 999))
+
+    # method_call: ID LPAREN (value (COMMA value)*)? RPAREN
+    # A call nesting further holds the nesting in one of its arguments.
+    def method_call(self, depth):
+        count = self.random.randint(1, 3)
+        nested = self.random.randrange(count)
+        args = ', '.join(self.value(depth if i == nested else 0) for i in range(count))
+        return f"{self.name()}({args})"
+
+
+# Write files programs made by a ProgramGenerator(seed, **settings) into
+# directory as corpus_0000.xprs, corpus_0001.xprs, ...; returns their paths
+def write_corpus(directory, files, seed=0, **settings):
+    generator = ProgramGenerator(seed, **settings)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"corpus_{i:04d}.xprs")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generator.program())
+        paths.append(path)
+    return paths
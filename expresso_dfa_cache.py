@@ -0,0 +1,299 @@
+# Purpose: Persistent warm DFA cache for ExpressoLexer and ExpressoParser
+#
+# ANTLR learns DFA states for the lexer and for every parser decision as it
+# goes, but keeps them only in class-level lists (decisionsToDFA) that start
+# empty in every process. This module exports those states to a versioned file
+# keyed on a hash of the serialized ATN, and loads them back into the empty
+# DFAs of a fresh process so it starts out as warm as a long-running one.
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from antlr4.Lexer import Lexer
+from antlr4.PredictionContext import PredictionContext, SingletonPredictionContext, ArrayPredictionContext
+from antlr4.atn.ATNConfig import ATNConfig, LexerATNConfig
+from antlr4.atn.ATNConfigSet import ATNConfigSet, OrderedATNConfigSet
+from antlr4.atn.ATNSimulator import ATNSimulator
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.LexerAction import LexerIndexedCustomAction
+from antlr4.atn.LexerActionExecutor import LexerActionExecutor
+from antlr4.atn.SemanticContext import SemanticContext
+from antlr4.dfa.DFAState import DFAState
+
+import ExpressoLexer as lexer_module
+import ExpressoParser as parser_module
+
+
+# Bump when the layout of the exported data changes
+FORMAT_VERSION = 1
+
+# Context id reserved for PredictionContext.EMPTY, and state id for the simulator's ERROR state
+_EMPTY_CONTEXT = 0
+_ERROR_STATE = -1
+
+
+# Raised while exporting a DFA that uses features the cache does not store
+# (predicates, precedence DFAs, unknown lexer actions); such DFAs are left out.
+class _Unsupported(Exception):
+    pass
+
+
+# Directory holding Expresso caches, overridable with EXPRESSO_CACHE_DIR
+def default_cache_dir():
+    return os.environ.get('EXPRESSO_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'expresso')
+
+
+# Hash of a recognizer module's serialized ATN, used to key its cache file
+def atn_hash(module):
+    serialized = ','.join(map(str, module.serializedATN()))
+    return hashlib.sha256(serialized.encode('ascii')).hexdigest()
+
+
+def cache_path(module, cache_dir=None):
+    name = module.__name__.rsplit('.', 1)[-1]
+    return os.path.join(cache_dir or default_cache_dir(), f"{name}-{atn_hash(module)[:16]}.dfa")
+
+
+class _Exporter:
+
+    def __init__(self, atn, error):
+        self.atn = atn
+        self.error = error
+        self.contexts = [None]   # index 0 is PredictionContext.EMPTY
+        self.context_ids = {}
+        self.executors = []
+        self.executor_ids = {}
+
+    def context(self, ctx):
+        if ctx is None:
+            return None
+        if ctx is PredictionContext.EMPTY:
+            return _EMPTY_CONTEXT
+        ctx_id = self.context_ids.get(id(ctx))
+        if ctx_id is not None:
+            return ctx_id
+        if isinstance(ctx, ArrayPredictionContext):
+            encoded = ('a', [self.context(parent) for parent in ctx.parents], list(ctx.returnStates))
+        else:
+            encoded = ('s', self.context(ctx.parentCtx), ctx.returnState)
+        ctx_id = len(self.contexts)
+        self.contexts.append(encoded)
+        self.context_ids[id(ctx)] = ctx_id
+        return ctx_id
+
+    def executor(self, executor):
+        if executor is None:
+            return None
+        executor_id = self.executor_ids.get(id(executor))
+        if executor_id is not None:
+            return executor_id
+        actions = []
+        for action in executor.lexerActions:
+            offset = None
+            if isinstance(action, LexerIndexedCustomAction):
+                offset, action = action.offset, action.action
+            if action not in self.atn.lexerActions:
+                raise _Unsupported(action)
+            actions.append((offset, self.atn.lexerActions.index(action)))
+        executor_id = len(self.executors)
+        self.executors.append(actions)
+        self.executor_ids[id(executor)] = executor_id
+        return executor_id
+
+    def config(self, config):
+        if config.semanticContext is not SemanticContext.NONE:
+            raise _Unsupported(config.semanticContext)
+        encoded = (config.state.stateNumber, config.alt, self.context(config.context),
+                   config.reachesIntoOuterContext, config.precedenceFilterSuppressed)
+        if isinstance(config, LexerATNConfig):
+            encoded += (self.executor(config.lexerActionExecutor), config.passedThroughNonGreedyDecision)
+        return encoded
+
+    def state(self, state, index):
+        if state.predicates is not None:
+            raise _Unsupported(state.predicates)
+        configs = state.configs
+        conflicting = sorted(configs.conflictingAlts) if configs.conflictingAlts is not None else None
+        edges = None
+        if state.edges is not None:
+            edges = (len(state.edges), [(i, _ERROR_STATE if target is self.error else index[target])
+                                        for i, target in enumerate(state.edges) if target is not None])
+        return ([self.config(config) for config in configs],
+                (configs.fullCtx, configs.uniqueAlt, conflicting, configs.dipsIntoOuterContext),
+                edges, state.isAcceptState, state.prediction, state.requiresFullContext,
+                self.executor(state.lexerActionExecutor))
+
+    def dfa(self, dfa):
+        if dfa.precedenceDfa or dfa.s0 is None:
+            return None
+        ordered = sorted(dfa.states, key=lambda s: s.stateNumber)
+        index = {state: i for i, state in enumerate(ordered)}
+        try:
+            states = [self.state(state, index) for state in ordered]
+        except _Unsupported:
+            return None
+        return (index[dfa.s0], states)
+
+
+class _Importer:
+
+    def __init__(self, atn, data, context_cache, lexer):
+        self.atn = atn
+        self.lexer = lexer
+        self.error = LexerATNSimulator.ERROR if lexer else ATNSimulator.ERROR
+        self.contexts = [PredictionContext.EMPTY]
+        for encoded in data['contexts'][1:]:
+            if encoded[0] == 'a':
+                ctx = ArrayPredictionContext([self.context(parent) for parent in encoded[1]], encoded[2])
+            else:
+                ctx = SingletonPredictionContext.create(self.context(encoded[1]), encoded[2])
+            if context_cache is not None:
+                ctx = context_cache.add(ctx)
+            self.contexts.append(ctx)
+        self.executors = [LexerActionExecutor([self.action(offset, index) for offset, index in actions])
+                          for actions in data['executors']]
+
+    def context(self, ctx_id):
+        return None if ctx_id is None else self.contexts[ctx_id]
+
+    def action(self, offset, index):
+        action = self.atn.lexerActions[index]
+        return action if offset is None else LexerIndexedCustomAction(offset, action)
+
+    def executor(self, executor_id):
+        return None if executor_id is None else self.executors[executor_id]
+
+    def config(self, encoded):
+        state = self.atn.states[encoded[0]]
+        if self.lexer:
+            config = LexerATNConfig(state, encoded[1], self.context(encoded[2]),
+                                    lexerActionExecutor=self.executor(encoded[5]))
+            config.passedThroughNonGreedyDecision = encoded[6]
+        else:
+            config = ATNConfig(state, encoded[1], self.context(encoded[2]))
+        config.reachesIntoOuterContext = encoded[3]
+        config.precedenceFilterSuppressed = encoded[4]
+        return config
+
+    def state(self, state_number, encoded):
+        configs_encoded, (full_ctx, unique_alt, conflicting, dips), _, accept, prediction, full_context, executor = encoded
+        configs = OrderedATNConfigSet() if self.lexer else ATNConfigSet(full_ctx)
+        configs.fullCtx = full_ctx
+        configs.configs = [self.config(config) for config in configs_encoded]
+        configs.uniqueAlt = unique_alt
+        configs.conflictingAlts = set(conflicting) if conflicting is not None else None
+        configs.hasSemanticContext = False
+        configs.dipsIntoOuterContext = dips
+        configs.setReadonly(True)
+        state = DFAState(state_number, configs)
+        state.isAcceptState = accept
+        state.prediction = prediction
+        state.requiresFullContext = full_context
+        state.lexerActionExecutor = self.executor(executor)
+        return state
+
+    # The (s0, states) of a DFA from its exported form
+    def dfa(self, encoded):
+        s0, states_encoded = encoded
+        states = [self.state(number, state) for number, state in enumerate(states_encoded)]
+        for state, state_encoded in zip(states, states_encoded):
+            edges = state_encoded[2]
+            if edges is not None:
+                size, targets = edges
+                state.edges = [None] * size
+                for i, target in targets:
+                    state.edges[i] = self.error if target == _ERROR_STATE else states[target]
+        return states[s0], states
+
+
+# Export the learned DFA states of a recognizer class as plain data
+def export_dfa(recognizer):
+    lexer = issubclass(recognizer, Lexer)
+    exporter = _Exporter(recognizer.atn, LexerATNSimulator.ERROR if lexer else ATNSimulator.ERROR)
+    decisions = [exporter.dfa(dfa) for dfa in recognizer.decisionsToDFA]
+    return {
+        'contexts': exporter.contexts,
+        'executors': exporter.executors,
+        'decisions': decisions,
+    }
+
+
+# Load exported DFA states into a recognizer class. Only DFAs that are still
+# empty are filled, so states learned in this process are never replaced, and
+# none is filled before all of them have been read, so data that fails to load
+# leaves the recognizer as it was. Returns the number of DFA states loaded.
+def import_dfa(recognizer, data, context_cache=None):
+    importer = _Importer(recognizer.atn, data, context_cache, lexer=issubclass(recognizer, Lexer))
+    imported = []
+    for dfa, encoded in zip(recognizer.decisionsToDFA, data['decisions']):
+        if encoded is None or dfa.s0 is not None or len(dfa.states) > 0:
+            continue
+        imported.append((dfa, importer.dfa(encoded)))
+    loaded = 0
+    for dfa, (s0, states) in imported:
+        for state in states:
+            dfa.states[state] = state
+        dfa.s0 = s0
+        loaded += len(dfa.states)
+    return loaded
+
+
+def _recognizers():
+    parser = parser_module.ExpressoParser
+    lexer = lexer_module.ExpressoLexer
+    return [(parser_module, parser, parser.sharedContextCache), (lexer_module, lexer, None)]
+
+
+# Write the current DFA states of ExpressoParser and ExpressoLexer to the cache.
+# Each file is written to a temporary name and renamed into place, so readers
+# never observe a partial file.
+def save_dfa_cache(cache_dir=None):
+    cache_dir = cache_dir or default_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    for module, recognizer, _ in _recognizers():
+        data = {
+            'version': FORMAT_VERSION,
+            'atn': atn_hash(module),
+            'dfa': export_dfa(recognizer),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path(module, cache_dir))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+# Load cached DFA states for ExpressoParser and ExpressoLexer, if present.
+# Files written for another ATN or format version are ignored, and files that
+# fail to load in any way (truncated, corrupt, not a cache at all) are removed,
+# leaving that recognizer to start cold. Returns the number of DFA states loaded.
+def load_dfa_cache(cache_dir=None):
+    loaded = 0
+    for module, recognizer, context_cache in _recognizers():
+        path = cache_path(module, cache_dir)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            continue
+        try:
+            with f:
+                data = pickle.load(f)
+            if data.get('version') != FORMAT_VERSION or data.get('atn') != atn_hash(module):
+                continue
+            loaded += import_dfa(recognizer, data['dfa'], context_cache)
+        except Exception:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    return loaded
+
+
+# Total number of DFA states currently known to ExpressoParser and ExpressoLexer
+def dfa_state_count():
+    return sum(len(dfa.states) for _, recognizer, _ in _recognizers() for dfa in recognizer.decisionsToDFA)
@@ -0,0 +1,128 @@
+# Purpose: Incremental reparsing of edited Expresso sources
+#
+# Program.body is a flat list of independent top-level items, so after an edit
+# only the items the edit touches need to be lexed and parsed again. Every
+# other node of the previous Program is reused as is. Anything the region parse
+# cannot settle on its own (a syntax error, or tokens left over that would end
+# the program) falls back to a full parse, so the result always equals parsing
+# the new text from scratch with the native parser.
+#
+# Item spans are kept like a gap buffer: items before the gap store offsets from
+# the start of the source, items after it store offsets from the end, so an
+# edit shifts no spans at all. Moving the gap costs one step per item crossed,
+# which keeps the cost of an edit flat in the size of the file for local edits.
+
+from ast_nodes import Program
+from expresso_native import NativeParser, ExpressoSyntaxError
+
+
+# Replace source[start:end] with text
+class TextEdit:
+    def __init__(self, start, end, text):
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def apply(self, source):
+        return source[:self.start] + self.text + source[self.end:]
+
+    def __repr__(self):
+        return f"TextEdit(start={self.start}, end={self.end}, text={self.text!r})"
+
+
+# A parsed source: the text, its Program, and the span of each item of Program.body
+class ParsedSource:
+    def __init__(self, source, program, starts, stops):
+        self.source = source
+        self.program = program
+        # Spans of the items before the gap, as offsets from the start of the source
+        self.head_starts = starts
+        self.head_stops = stops
+        # Spans of the items after the gap, last item first, as offsets from the end
+        self.tail_starts = []
+        self.tail_stops = []
+
+    # (start, stop) of every item: the offsets of its first character and just past its last one
+    @property
+    def spans(self):
+        end = len(self.source)
+        tail = [(end - start, end - stop) for start, stop in zip(self.tail_starts, self.tail_stops)]
+        return list(zip(self.head_starts, self.head_stops)) + tail[::-1]
+
+    # Move the gap left past every item that ends at or after offset
+    def _gap_before(self, offset):
+        end = len(self.source)
+        head_starts, head_stops = self.head_starts, self.head_stops
+        while head_stops and head_stops[-1] >= offset:
+            self.tail_starts.append(end - head_starts.pop())
+            self.tail_stops.append(end - head_stops.pop())
+
+    # Move the gap right past every item that ends before offset
+    def _gap_after(self, offset):
+        end = len(self.source)
+        tail_starts, tail_stops = self.tail_starts, self.tail_stops
+        while tail_stops and end - tail_stops[-1] < offset:
+            self.head_starts.append(end - tail_starts.pop())
+            self.head_stops.append(end - tail_stops.pop())
+
+    def __repr__(self):
+        return f"ParsedSource(program={self.program}, spans={self.spans})"
+
+
+# Parse source[start:end] item by item, returning (nodes, starts, stops, parser)
+def _parse_items(source, start=0, end=None):
+    parser = NativeParser(source, start, end)
+    nodes = []
+    starts = []
+    stops = []
+    for node, item_start, item_stop in parser.declarations():
+        nodes.append(node)
+        starts.append(item_start)
+        stops.append(item_stop)
+    return nodes, starts, stops, parser
+
+
+# Parse a whole source, recording the span of every top-level item
+def parse_with_spans(source):
+    nodes, starts, stops, _ = _parse_items(source)
+    return ParsedSource(source, Program(nodes), starts, stops)
+
+
+# Apply an edit to a parsed source, reparsing only the items it touches.
+# The ParsedSource and its Program are updated in place and returned.
+def reparse(parsed, edit):
+    # Put the gap just before the first item the edit touches. Items that merely
+    # touch the edit are reparsed too, since their edge tokens may change.
+    parsed._gap_after(edit.start)
+    parsed._gap_before(edit.start)
+
+    old_end = len(parsed.source)
+    source = edit.apply(parsed.source)
+    tail_starts, tail_stops = parsed.tail_starts, parsed.tail_stops
+    touched = 0
+    while touched < len(tail_starts) and old_end - tail_starts[-1 - touched] <= edit.end:
+        touched += 1
+
+    region_start = parsed.head_stops[-1] if parsed.head_stops else 0
+    region_end = len(source) - tail_starts[-1 - touched] if touched < len(tail_starts) else len(source)
+    try:
+        nodes, starts, stops, parser = _parse_items(source, region_start, region_end)
+    except ExpressoSyntaxError:
+        parser = None
+    if parser is None or not parser.at_end():
+        full = parse_with_spans(source)
+        parsed.program.body[:] = full.program.body
+        parsed.head_starts, parsed.head_stops = full.head_starts, full.head_stops
+        parsed.tail_starts, parsed.tail_stops = full.tail_starts, full.tail_stops
+        parsed.source = source
+        return parsed
+
+    # Offsets from the end stay valid for the items after the edit
+    first = len(parsed.head_starts)
+    del tail_starts[len(tail_starts) - touched:]
+    del tail_stops[len(tail_stops) - touched:]
+    parsed.head_starts.extend(starts)
+    parsed.head_stops.extend(stops)
+    parsed.program.body[first:first + touched] = nodes
+    parsed.source = source
+    return parsed
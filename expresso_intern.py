@@ -0,0 +1,165 @@
+# Purpose: Hash-consing factory for Expresso ASTs
+#
+# A HashConsFactory keeps one instance of every distinct subtree it has seen.
+# Nodes it hands out are instances of an Interned subclass of the plain node
+# class (InternedFactor for Factor, and so on) that carries its structural hash,
+# computed once when the node is made. Leaf values are told apart by type as
+# well as value, so a True never comes back as a 1, nor a -0.0 as a 0.0; other
+# than for such literals, two interned nodes of the same factory are equal
+# exactly when they are the same object. They still compare equal to plain
+# nodes of the same shape, in either direction, and hash the same as them
+# (ast_nodes.node_hash).
+#
+# Interned nodes are shared, so they must never be mutated. Hashes are only
+# meaningful within one process, so interned nodes pickle as plain nodes.
+
+import math
+
+import ast_nodes
+from ast_nodes import ASTNode, node_hash, node_layout
+
+
+# Base of the interned node classes: identity first, then the precomputed hash,
+# and only then the structural comparison of the plain class
+class Interned:
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, Interned) and self._hash != other._hash:
+            return False
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        cls, _, fields = _LAYOUT[type(self)]
+        return _plain_node, (cls, fields, tuple(getattr(self, field) for field in fields))
+
+
+def _plain_node(cls, fields, values):
+    node = cls.__new__(cls)
+    for field, value in zip(fields, values):
+        setattr(node, field, value)
+    return node
+
+
+# Names of the fields of a plain node class, in slot order
+def _fields(cls):
+    fields = []
+    for klass in reversed(cls.__mro__):
+        fields.extend(klass.__dict__.get('__slots__', ()))
+    return tuple(fields)
+
+
+def _make_interned_class(cls):
+    interned = type('Interned' + cls.__name__, (Interned, cls), {'__slots__': ('_hash',)})
+    interned.__module__ = __name__
+    return interned
+
+
+# Plain node class -> its interned subclass, also defined at module level as Interned<Name>
+_INTERNED = {}
+for _cls in vars(ast_nodes).values():
+    if isinstance(_cls, type) and issubclass(_cls, ASTNode) and _cls is not ASTNode:
+        _INTERNED[_cls] = globals()[f'Interned{_cls.__name__}'] = _make_interned_class(_cls)
+
+# Any node class -> (plain class, interned class, field names)
+_LAYOUT = {}
+for _cls, _interned in _INTERNED.items():
+    _LAYOUT[_cls] = _LAYOUT[_interned] = (_cls, _interned, _fields(_cls))
+
+
+# A value as it goes into an intern table key. Lists become tuples, so that
+# keys are hashable, tagged so that a list and a tuple of the same items, which
+# are not equal, stay apart. Leaf values are keyed by their type too, as
+# True == 1 and False == 0, and floats by their sign, as -0.0 == 0.0: equal
+# literals of another type must not come back in their place.
+def _frozen(value):
+    if isinstance(value, ASTNode):
+        return value
+    if isinstance(value, list):
+        return (list, *map(_frozen, value))
+    if isinstance(value, tuple):
+        return (tuple, *map(_frozen, value))
+    if isinstance(value, float):
+        return (float, value, math.copysign(1.0, value))
+    return (type(value), value)
+
+
+class HashConsFactory:
+
+    def __init__(self):
+        self.table = {}
+        # factory.Factor(1), factory.Expression(term, ops), ... build interned nodes
+        for cls in _INTERNED:
+            setattr(self, cls.__name__, self._constructor(cls))
+
+    def _constructor(self, cls):
+        return lambda *args, **kwargs: self.intern(cls(*args, **kwargs))
+
+    def __len__(self):
+        return len(self.table)
+
+    def _key(self, cls, values):
+        return (cls, *map(_frozen, values))
+
+    # Return the shared interned node structurally equal to node, interning its
+    # subtrees first. Nodes that are already shared come back unchanged.
+    # The tree is walked with a stack of its own, so any depth can be interned.
+    def intern(self, node):
+        table = self.table
+        results = []
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if item.__class__ is _Build:
+                count = item.count
+                values = results[len(results) - count:]
+                del results[len(results) - count:]
+                results.append(self._build(item.kind, values))
+            elif isinstance(item, ASTNode):
+                layout = _LAYOUT.get(type(item)) or _LAYOUT[node_layout(type(item))[0]]
+                fields = layout[2]
+                if isinstance(item, Interned):
+                    # Subtrees of a shared node are shared too, so one lookup settles it
+                    key = self._key(layout[0], [getattr(item, field) for field in fields])
+                    if table.get(key) is item:
+                        results.append(item)
+                        continue
+                stack.append(_Build(layout, len(fields)))
+                stack.extend(getattr(item, field) for field in reversed(fields))
+            elif isinstance(item, (list, tuple)):
+                stack.append(_Build(list if isinstance(item, list) else tuple, len(item)))
+                stack.extend(reversed(item))
+            else:
+                results.append(item)
+        return results[0]
+
+    def _build(self, kind, values):
+        if kind is list:
+            return values
+        if kind is tuple:
+            return tuple(values)
+        cls, interned_cls, fields = kind
+        key = self._key(cls, values)
+        shared = self.table.get(key)
+        if shared is None:
+            shared = interned_cls.__new__(interned_cls)
+            for field, value in zip(fields, values):
+                setattr(shared, field, value)
+            shared._hash = node_hash(shared)
+            self.table[key] = shared
+        return shared
+
+
+# Stack entry of HashConsFactory.intern: make a node (kind is its layout), list
+# or tuple from the last count results
+class _Build:
+    __slots__ = ('kind', 'count')
+
+    def __init__(self, kind, count):
+        self.kind = kind
+        self.count = count
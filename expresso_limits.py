@@ -0,0 +1,125 @@
+# Purpose: Token budgets, deadlines and cancellation for parsing untrusted input
+#
+# A ParseLimits handed to parse_program bounds one parse in three ways:
+#
+#     max_tokens  the parser, lookahead included, may not read past this many tokens
+#     timeout     seconds the parse may take, counted from when the limits were made
+#     cancel      a CancelToken another thread can cancel to stop the parse
+#
+# Hitting a limit raises a ParseLimitError subclass out of parse_program. The
+# limits are checked by LimitedExpressoParser on every token it consumes and by
+# LimitedParserATNSimulator at the start of every prediction and of every ATN
+# simulation step, which is where pathological input burns its time. The token
+# budget is an integer comparison; the clock and the cancel token are read on
+# every prediction step but only on one consumed token in CLOCK_INTERVAL.
+# With LEXER_ARRAY the token budget is also enforced while lexing, so a source
+# with too many tokens is rejected without being lexed in full.
+#
+# A limit only ever stops a prediction between simulation steps, before it adds
+# anything to the DFA that ExpressoParser shares across parsers, so the other
+# parses of the process are unaffected.
+
+import time
+
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+
+from ExpressoParser import ExpressoParser
+
+# Consumed tokens between two reads of the clock and the cancel token
+CLOCK_INTERVAL = 256
+
+
+# Base class of the errors raised when a parse hits one of its limits.
+# token_index is the index of the token the parser was at.
+class ParseLimitError(Exception):
+
+    def __init__(self, msg, token_index):
+        super().__init__(msg)
+        self.msg = msg
+        self.token_index = token_index
+
+
+class TokenBudgetExceeded(ParseLimitError):
+    pass
+
+
+class DeadlineExceeded(ParseLimitError):
+    pass
+
+
+class ParseCancelled(ParseLimitError):
+    pass
+
+
+# Set from any thread to stop the parses it was given to
+class CancelToken:
+    __slots__ = ('cancelled',)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class ParseLimits:
+
+    # None leaves that limit off. The clock for timeout starts now, so make one
+    # ParseLimits per parse.
+    def __init__(self, max_tokens=None, timeout=None, cancel=None):
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.cancel = cancel
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        # Highest token index the parser may reach; EOF sits at index max_tokens
+        self.max_index = max_tokens if max_tokens is not None else float('inf')
+
+    # Raise if the parser, now at token index, has hit a limit
+    def check(self, index):
+        if index > self.max_index:
+            raise TokenBudgetExceeded(f"token budget of {self.max_tokens} exceeded", index)
+        if self.cancel is not None and self.cancel.cancelled:
+            raise ParseCancelled("parse cancelled", index)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise DeadlineExceeded(f"parse deadline of {self.timeout}s exceeded", index)
+
+    def __repr__(self):
+        return f"ParseLimits(max_tokens={self.max_tokens}, timeout={self.timeout}, cancel={self.cancel})"
+
+
+# ParserATNSimulator that checks the limits of its parser before every
+# prediction and every step of ATN simulation
+class LimitedParserATNSimulator(ParserATNSimulator):
+
+    def __init__(self, parser, atn, decisionToDFA, sharedContextCache, limits):
+        super().__init__(parser, atn, decisionToDFA, sharedContextCache)
+        self.limits = limits
+
+    def adaptivePredict(self, input, decision, outerContext):
+        self.limits.check(input.index)
+        return super().adaptivePredict(input, decision, outerContext)
+
+    def computeReachSet(self, closure, t, fullCtx):
+        self.limits.check(self.parser._input.index)
+        return super().computeReachSet(closure, t, fullCtx)
+
+
+# ExpressoParser held to limits
+class LimitedExpressoParser(ExpressoParser):
+
+    def __init__(self, input, limits):
+        super().__init__(input)
+        self._interp = LimitedParserATNSimulator(self, self.atn, self.decisionsToDFA,
+                                                 self.sharedContextCache, limits)
+        self.limits = limits
+        self._until_clock = CLOCK_INTERVAL
+
+    def consume(self):
+        index = self._input.index
+        self._until_clock -= 1
+        if self._until_clock == 0:
+            self._until_clock = CLOCK_INTERVAL
+            self.limits.check(index + 1)
+        elif index >= self.limits.max_index:
+            self.limits.check(index + 1)
+        return super().consume()
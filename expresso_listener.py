@@ -7,8 +7,15 @@ else:
     from ExpressoParser import ExpressoParser
     from ExpressoListener import ExpressoListener as ExpressoListenerBase
 
+from antlr4.tree.Tree import TerminalNode
+
 from ast_nodes import *
 
+# Token types read by exitFactor; ExpressoParser itself is deleted at the end of this module
+LPAREN = ExpressoParser.LPAREN
+ID = ExpressoParser.ID
+NUMBER = ExpressoParser.NUMBER
+
 
 # This class defines a complete listener for a parse tree produced by ExpressoParser.
 class ExpressoListener(ExpressoListenerBase):
@@ -68,9 +75,10 @@ class ExpressoListener(ExpressoListenerBase):
         return VariableDeclaration(param_type, param_name)
 
     # Enter a parse tree produced by ExpressoParser#params.
+    # ctx.type_name(i) and ctx.ID(i) each search the children from the start, so
+    # the lists of both are taken once; indexing them made this quadratic.
     def enterParams(self, ctx:ExpressoParser.ParamsContext):
-        param_count = len(ctx.type_name())
-        params_list = [self.processParam(ctx.type_name(i), ctx.ID(i)) for i in range(param_count)]
+        params_list = [self.processParam(type_name, id_token) for type_name, id_token in zip(ctx.type_name(), ctx.ID())]
         self.stack.append(params_list)
 
     # Exit a parse tree produced by ExpressoParser#params.
@@ -102,9 +110,12 @@ class ExpressoListener(ExpressoListenerBase):
 
     # Exit a parse tree produced by ExpressoParser#variable_declaration.
     def exitVariable_declaration(self, ctx:ExpressoParser.Variable_declarationContext):
-        expression = self.stack.pop()
-        variable_declaration = self.stack.pop()
-        variable_declaration.expression = expression
+        if ctx.expression() is not None:
+            expression = self.stack.pop()
+            variable_declaration = self.stack.pop()
+            variable_declaration.expression = expression
+        else:
+            variable_declaration = self.stack.pop()
         self.stack[-1].body.append(variable_declaration)
 
 
@@ -121,15 +132,53 @@ class ExpressoListener(ExpressoListenerBase):
         self.stack[-1].body.append(statement)
 
 
+    # Replace the operands of an operator chain on top of the stack with one node.
+    # A chain rule's children alternate operand, operator, operand, ..., so one
+    # pass over them finds the number of operands and the operators. The chain
+    # is folded left-associatively; a single operand is left as it is.
+    def foldChain(self, ctx, build):
+        ops = []
+        count = 0
+        for child in ctx.children:
+            if isinstance(child, TerminalNode):
+                ops.append(child.symbol.text)
+            else:
+                count += 1
+        stack = self.stack
+        if count == 1:
+            return
+        operands = stack[-count:]
+        del stack[-count:]
+        node = operands[0]
+        for op, operand in zip(ops, operands[1:]):
+            node = build(node, op, operand)
+        stack.append(node)
+
+    # Replace the operands of an additive or multiplicative chain on top of the
+    # stack with one node holding the first operand and the (op, operand) pairs
+    def collectChain(self, ctx, build):
+        ops = []
+        count = 0
+        for child in ctx.children:
+            if isinstance(child, TerminalNode):
+                ops.append(child.symbol.text)
+            else:
+                count += 1
+        stack = self.stack
+        if count == 1:
+            stack.append(build(stack.pop()))
+            return
+        operands = stack[-count:]
+        del stack[-count:]
+        stack.append(build(operands[0], list(zip(ops, operands[1:]))))
+
     # Enter a parse tree produced by ExpressoParser#expression.
     def enterExpression(self, ctx:ExpressoParser.ExpressionContext):
         pass
 
     # Exit a parse tree produced by ExpressoParser#expression.
     def exitExpression(self, ctx:ExpressoParser.ExpressionContext):
-        terms = [self.stack.pop() for i in range(len(ctx.term()))][::-1]
-        ops = [op.getText() for op in ctx.children if op.getText() in ('+', '-')]
-        self.stack.append(Expression(terms.pop(0), [(op, terms.pop(0)) for op in ops]))
+        self.collectChain(ctx, Expression)
 
 
     # Enter a parse tree produced by ExpressoParser#term.
@@ -138,9 +187,7 @@ class ExpressoListener(ExpressoListenerBase):
 
     # Exit a parse tree produced by ExpressoParser#term.
     def exitTerm(self, ctx:ExpressoParser.TermContext):
-        factors = [self.stack.pop() for i in range(len(ctx.factor()))][::-1]
-        ops = [op.getText() for op in ctx.children if op.getText() in ('*', '/')]
-        self.stack.append(Term(factors.pop(0), [(op, factors.pop(0)) for op in ops]))
+        self.collectChain(ctx, Term)
 
 
     # Enter a parse tree produced by ExpressoParser#factor.
@@ -149,18 +196,17 @@ class ExpressoListener(ExpressoListenerBase):
 
     # Exit a parse tree produced by ExpressoParser#factor.
     def exitFactor(self, ctx:ExpressoParser.FactorContext):
-        if ctx.expression():
-            expr = self.stack.pop()
-            self.stack.append(Factor(expr))
-        elif ctx.method_call():
+        first = ctx.children[0]
+        if not isinstance(first, TerminalNode):
             method_call = self.stack.pop()
             self.stack.append(Factor(method_call))
-        elif ctx.ID():
-            id = ctx.ID().getText()
-            self.stack.append(Factor(id))
-        elif ctx.NUMBER():
-            number = int(ctx.NUMBER().getText())
-            self.stack.append(Factor(number))
+        elif first.symbol.type == LPAREN:
+            expr = self.stack.pop()
+            self.stack.append(Factor(expr))
+        elif first.symbol.type == ID:
+            self.stack.append(Factor(first.symbol.text))
+        elif first.symbol.type == NUMBER:
+            self.stack.append(Factor(int(first.symbol.text)))
 
     # Enter a parse tree produced by ExpressoParser#function_call.
     def enterMethod_call(self, ctx:ExpressoParser.Method_callContext):
@@ -168,8 +214,16 @@ class ExpressoListener(ExpressoListenerBase):
 
     # Exit a parse tree produced by ExpressoParser#function_call.
     def exitMethod_call(self, ctx:ExpressoParser.Method_callContext):
-        name = ctx.ID().getText()
-        args = [self.stack.pop() for _ in range(len(ctx.value()))][::-1]
+        name = ctx.children[0].symbol.text
+        count = 0
+        for child in ctx.children:
+            if not isinstance(child, TerminalNode):
+                count += 1
+        if count:
+            args = self.stack[-count:]
+            del self.stack[-count:]
+        else:
+            args = None
         self.stack.append(MethodCall(name, args))
 
 
@@ -177,44 +231,34 @@ class ExpressoListener(ExpressoListenerBase):
         pass
 
     def exitRelational(self, ctx:ExpressoParser.RelationalContext):
-        left = self.stack.pop()
-        right = self.stack.pop()
-        op = ctx.getChild(1).getText()
-        relational = Relational(left, op, right)
-        self.stack.append(relational)
+        self.foldChain(ctx, Relational)
 
     def enterEquality(self, ctx:ExpressoParser.EqualityContext):
         pass
 
     def exitEquality(self, ctx:ExpressoParser.EqualityContext):
-        left = self.stack.pop()
-        right = self.stack.pop()
-        op = ctx.getChild(1).getText()
-        equality = Equality(left, op, right)
-        self.stack.append(equality)
+        self.foldChain(ctx, Equality)
 
     def enterAnd(self, ctx:ExpressoParser.AndContext):
         pass
 
     def exitAnd(self, ctx:ExpressoParser.AndContext):
-        left = self.stack.pop()
-        right = self.stack.pop()
-        and_node = And(left, right)
-        self.stack.append(and_node)
+        self.foldChain(ctx, lambda left, op, right: And(left, right))
 
     def enterOr(self, ctx:ExpressoParser.OrContext):
         pass
 
     def exitOr(self, ctx:ExpressoParser.OrContext):
-        left = self.stack.pop()
-        right = self.stack.pop()
-        or_node = Or(left, right)
-        self.stack.append(or_node)
+        self.foldChain(ctx, lambda left, op, right: Or(left, right))
 
     def enterLogic(self, ctx:ExpressoParser.LogicContext):
         pass
 
+    # A value is always parsed as logic; one without any logic operator folds down
+    # to its single Expression, which stands for the value as it is
     def exitLogic(self, ctx:ExpressoParser.LogicContext):
+        if isinstance(self.stack[-1], Expression):
+            return
         or_expression = self.stack.pop()
         logic_node = Logic(or_expression)
         self.stack.append(logic_node)
@@ -239,4 +283,88 @@ class ExpressoListener(ExpressoListenerBase):
 
 
 
+# An ExpressoListener that also records where in the source every node comes
+# from: spans maps id(node) to the (start, end) character offsets, end excluded,
+# of the rule that made it. Nodes made along with others by one rule (the inner
+# links of an operator chain) span the nodes they hold.
+class SpanListener(ExpressoListener):
+
+    def __init__(self):
+        super().__init__()
+        self.spans = {}
+
+    # Give value the span of ctx, and the nodes inside it that have no span yet
+    # the span of what they hold (or of ctx, when they hold no nodes)
+    def recordSpans(self, value, ctx):
+        spans = self.spans
+        new = []
+        pending = [value]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, ASTNode):
+                if id(item) not in spans:
+                    new.append(item)
+                    pending.extend(getattr(item, field) for field in node_layout(type(item))[1])
+            elif isinstance(item, (list, tuple)):
+                pending.extend(item)
+        if not new:
+            return
+        rule_span = context_span(ctx)
+        for node in reversed(new):
+            child_spans = [spans[id(child)] for child in node_children(node) if id(child) in spans]
+            if child_spans and node is not value:
+                spans[id(node)] = (min(span[0] for span in child_spans), max(span[1] for span in child_spans))
+            else:
+                spans[id(node)] = rule_span
+
+    # Each parameter spans its type and name
+    def enterParams(self, ctx):
+        super().enterParams(ctx)
+        for parameter, type_name, id_token in zip(self.stack[-1], ctx.type_name(), ctx.ID()):
+            self.spans[id(parameter)] = (type_name.start.start, id_token.symbol.stop + 1)
+
+    # Params are attached to their method rather than left on the stack
+    def exitParams(self, ctx):
+        super().exitParams(ctx)
+        self.recordSpans(self.stack[-1].params, ctx)
+
+
+# (start, end) character offsets of a rule context, end excluded
+def context_span(ctx):
+    start = ctx.start.start
+    stop = ctx.stop
+    return (start, stop.stop + 1 if stop is not None and stop.stop >= start else start)
+
+
+# The nodes directly held by node's fields, including inside lists and tuples
+def node_children(node):
+    children = []
+    for field in node_layout(type(node))[1]:
+        value = getattr(node, field)
+        if isinstance(value, ASTNode):
+            children.append(value)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    children.append(item)
+                elif isinstance(item, tuple):
+                    children.extend(part for part in item if isinstance(part, ASTNode))
+    return children
+
+
+# Wrap an enter/exit method of ExpressoListener so that the node it leaves on top
+# of the stack gets its span
+def _recording(method):
+    def record(self, ctx):
+        method(self, ctx)
+        if self.stack:
+            self.recordSpans(self.stack[-1], ctx)
+    return record
+
+
+for _name, _method in list(vars(ExpressoListener).items()):
+    if _name.startswith(('enter', 'exit')) and _name not in vars(SpanListener):
+        setattr(SpanListener, _name, _recording(_method))
+
+
 del ExpressoParser
\ No newline at end of file
@@ -0,0 +1,437 @@
+# Purpose: Hand-written recursive-descent parser for the Expresso language
+#
+# Builds ast_nodes directly in one pass, without the ANTLR lexer, parse tree or
+# listener. It accepts the same language as the generated ExpressoParser, and
+# the conformance suite in test_expresso_native checks that it produces the
+# same AST as the ExpressoListener path, logic-valued call arguments included.
+# Unlike the ANTLR path it does not recover from syntax errors: the first one
+# raises ExpressoSyntaxError.
+
+import re
+
+from ast_nodes import *
+
+
+# Token types, numbered as in Expresso.tokens
+T__0 = 1
+IF = 2
+TYPE = 3
+METHOD = 4
+LCURLY = 5
+RCURLY = 6
+LPAREN = 7
+RPAREN = 8
+SEMI = 9
+COMMA = 10
+ASSIGN = 11
+AND = 12
+OR = 13
+LT = 14
+LE = 15
+GT = 16
+GE = 17
+EQ = 18
+NE = 19
+PLUS = 20
+MINUS = 21
+STAR = 22
+SLASH = 23
+ID = 24
+NUMBER = 25
+WS = 26
+EOF = -1
+
+KEYWORDS = {
+    'placeholder': T__0,
+    'if': IF,
+    'type': TYPE,
+    'method': METHOD,
+    'and': AND,
+    'or': OR,
+}
+
+OPERATORS = {
+    '{': LCURLY, '}': RCURLY, '(': LPAREN, ')': RPAREN, ';': SEMI, ',': COMMA,
+    '=': ASSIGN, '<': LT, '<=': LE, '>': GT, '>=': GE, '==': EQ, '!=': NE,
+    '+': PLUS, '-': MINUS, '*': STAR, '/': SLASH,
+}
+
+# Two-character operators come first so that '<=' is never split into '<' '='
+TOKEN_RE = re.compile(r"""
+    (?P<ws>[ \t\r\n]+)
+  | (?P<id>[a-zA-Z_][a-zA-Z0-9_]*)
+  | (?P<number>[0-9]+)
+  | (?P<op><=|>=|==|!=|[{}();,=<>+\-*/])
+""", re.VERBOSE)
+
+# Binary operators of the logic sublanguage: token type -> (precedence, AST builder)
+LOGIC_OPERATORS = {
+    OR: (1, lambda left, op, right: Or(left, right)),
+    AND: (2, lambda left, op, right: And(left, right)),
+    EQ: (3, Equality),
+    NE: (3, Equality),
+    LT: (4, Relational),
+    LE: (4, Relational),
+    GT: (4, Relational),
+    GE: (4, Relational),
+}
+
+
+class ExpressoSyntaxError(Exception):
+    def __init__(self, msg, line, column):
+        super().__init__(f"line {line}:{column} {msg}")
+        self.msg = msg
+        self.line = line
+        self.column = column
+
+
+# Split source[pos:end] into parallel lists of token types, texts and start offsets.
+# Offsets are relative to the whole source, so positions stay correct for a slice.
+def tokenize(source, pos=0, end=None):
+    types = []
+    texts = []
+    starts = []
+    if end is None:
+        end = len(source)
+    match = TOKEN_RE.match
+    while pos < end:
+        m = match(source, pos, end)
+        if m is None:
+            line, column = _position(source, pos)
+            raise ExpressoSyntaxError(f"token recognition error at: '{source[pos]}'", line, column)
+        kind = m.lastgroup
+        text = m.group()
+        if kind == 'id':
+            types.append(KEYWORDS.get(text, ID))
+        elif kind == 'op':
+            types.append(OPERATORS[text])
+        elif kind == 'number':
+            types.append(NUMBER)
+        else:
+            pos = m.end()
+            continue
+        texts.append(text)
+        starts.append(pos)
+        pos = m.end()
+    types.append(EOF)
+    texts.append('<EOF>')
+    starts.append(end)
+    return types, texts, starts
+
+
+# Convert a character offset into an ANTLR-style (1-based line, 0-based column)
+def _position(source, pos):
+    line = source.count('\n', 0, pos) + 1
+    column = pos - (source.rfind('\n', 0, pos) + 1)
+    return line, column
+
+
+class NativeParser:
+
+    # With lazy_bodies, method bodies are skipped and left as LazyMethodBody nodes
+    def __init__(self, source, start=0, end=None, lazy_bodies=False):
+        self.source = source
+        self.types, self.texts, self.starts = tokenize(source, start, end)
+        self.pos = 0
+        self.lazy_bodies = lazy_bodies
+
+    def at_end(self):
+        return self.types[self.pos] == EOF
+
+    # Raise a syntax error at the current token
+    def error(self, expected):
+        line, column = _position(self.source, self.starts[self.pos])
+        raise ExpressoSyntaxError(f"mismatched input '{self.texts[self.pos]}' expecting {expected}", line, column)
+
+    # Consume a token of the given type and return its text
+    def match(self, token_type, expected):
+        if self.types[self.pos] != token_type:
+            self.error(expected)
+        text = self.texts[self.pos]
+        self.pos += 1
+        return text
+
+    # program: (type_declaration | method_declaration | variable_declaration | statement)*
+    # Like the generated parser, parsing stops at the first token that cannot start an item.
+    def program(self):
+        body = []
+        declaration = self.declaration
+        node = declaration()
+        while node is not None:
+            body.append(node)
+            node = declaration()
+        return Program(body)
+
+    # Parse one top-level item, or return None if the next token cannot start one
+    def declaration(self):
+        types = self.types
+        la = types[self.pos]
+        if la == TYPE:
+            return self.type_declaration()
+        if la == METHOD:
+            return self.method_declaration()
+        if la == ID and types[self.pos + 1] == ID:
+            return self.variable_declaration()
+        if la == ID or la == NUMBER or la == LPAREN:
+            return self.statement()
+        return None
+
+    # Yield (node, start, stop) for each top-level item, where start and stop are
+    # the offsets of its first character and just past its last one
+    def declarations(self):
+        starts = self.starts
+        while True:
+            first = self.pos
+            node = self.declaration()
+            if node is None:
+                return
+            last = self.pos - 1
+            yield node, starts[first], starts[last] + len(self.texts[last])
+
+    # type_declaration: TYPE ID (LCURLY type_body RCURLY | SEMI)
+    def type_declaration(self):
+        self.pos += 1
+        name = self.match(ID, 'ID')
+        if self.types[self.pos] == SEMI:
+            self.pos += 1
+            return TypeDeclaration(name, None)
+        self.match(LCURLY, "{'{', ';'}")
+        body = self.type_body()
+        self.match(RCURLY, "'}'")
+        return TypeDeclaration(name, body)
+
+    # type_body: (method_declaration | variable_declaration)*
+    def type_body(self):
+        body = []
+        types = self.types
+        while True:
+            la = types[self.pos]
+            if la == METHOD:
+                body.append(self.method_declaration())
+            elif la == ID:
+                body.append(self.variable_declaration())
+            else:
+                return TypeBody(body)
+
+    # method_declaration: METHOD ID LPAREN params RPAREN (LCURLY method_body RCURLY | SEMI)
+    def method_declaration(self):
+        self.pos += 1
+        name = self.match(ID, 'ID')
+        self.match(LPAREN, "'('")
+        params = self.params()
+        self.match(RPAREN, "')'")
+        if self.types[self.pos] == SEMI:
+            self.pos += 1
+            return MethodDeclaration(name, params, None)
+        self.match(LCURLY, "{'{', ';'}")
+        body = self.skip_method_body() if self.lazy_bodies else None
+        if body is None:
+            body = self.method_body()
+        self.match(RCURLY, "'}'")
+        return MethodDeclaration(name, params, body)
+
+    # params: (type_name ID (COMMA type_name ID)*)?
+    def params(self):
+        parameters = []
+        if self.types[self.pos] == ID:
+            param_type = self.texts[self.pos]
+            self.pos += 1
+            parameters.append(VariableDeclaration(param_type, self.match(ID, 'ID')))
+            while self.types[self.pos] == COMMA:
+                self.pos += 1
+                param_type = self.match(ID, 'ID')
+                parameters.append(VariableDeclaration(param_type, self.match(ID, 'ID')))
+        return Params(parameters)
+
+    # method_body: (variable_declaration | statement)*
+    def method_body(self):
+        body = []
+        types = self.types
+        while True:
+            la = types[self.pos]
+            if la == ID and types[self.pos + 1] == ID:
+                body.append(self.variable_declaration())
+            elif la == ID or la == NUMBER or la == LPAREN:
+                body.append(self.statement())
+            else:
+                return MethodBody(body)
+
+    # Step over a method body to its closing brace, matching braces on the token
+    # types, and return a LazyMethodBody for it. Returns None, without moving, if
+    # the braces do not match; the body is then parsed so that the error is reported.
+    def skip_method_body(self):
+        types = self.types
+        pos = self.pos
+        depth = 0
+        while True:
+            la = types[pos]
+            if la == RCURLY:
+                if not depth:
+                    break
+                depth -= 1
+            elif la == LCURLY:
+                depth += 1
+            elif la == EOF:
+                return None
+            pos += 1
+        body = LazyMethodBody(self.source, self.starts[self.pos], self.starts[pos])
+        self.pos = pos
+        return body
+
+    # variable_declaration: type_name ID (ASSIGN expression)? SEMI
+    def variable_declaration(self):
+        variable_type = self.texts[self.pos]
+        self.pos += 1
+        name = self.match(ID, 'ID')
+        expression = None
+        if self.types[self.pos] == ASSIGN:
+            self.pos += 1
+            expression = self.expression()
+        self.match(SEMI, "{'=', ';'}")
+        return VariableDeclaration(variable_type, name, expression)
+
+    # statement: expression SEMI
+    def statement(self):
+        expression = self.expression()
+        self.match(SEMI, "';'")
+        return Statement(expression)
+
+    # value: logic
+    # An operand followed by a logic operator is a logic value, anything else is a plain expression.
+    def value(self):
+        left = self.expression()
+        if self.types[self.pos] in LOGIC_OPERATORS:
+            return Logic(self.logic(left, 1))
+        return left
+
+    # Precedence climbing over or/and/equality/relational, all left-associative
+    def logic(self, left, min_precedence):
+        types = self.types
+        while True:
+            operator = LOGIC_OPERATORS.get(types[self.pos])
+            if operator is None or operator[0] < min_precedence:
+                return left
+            precedence, build = operator
+            op = self.texts[self.pos]
+            self.pos += 1
+            right = self.expression()
+            while True:
+                next_operator = LOGIC_OPERATORS.get(types[self.pos])
+                if next_operator is None or next_operator[0] <= precedence:
+                    break
+                right = self.logic(right, next_operator[0])
+            left = build(left, op, right)
+
+    # expression: term ((PLUS | MINUS) term)*
+    def expression(self):
+        term = self.term()
+        types = self.types
+        la = types[self.pos]
+        if la != PLUS and la != MINUS:
+            return Expression(term)
+        ops = []
+        while la == PLUS or la == MINUS:
+            op = self.texts[self.pos]
+            self.pos += 1
+            ops.append((op, self.term()))
+            la = types[self.pos]
+        return Expression(term, ops)
+
+    # term: factor ((STAR | SLASH) factor)*
+    def term(self):
+        factor = self.factor()
+        types = self.types
+        la = types[self.pos]
+        if la != STAR and la != SLASH:
+            return Term(factor)
+        ops = []
+        while la == STAR or la == SLASH:
+            op = self.texts[self.pos]
+            self.pos += 1
+            ops.append((op, self.factor()))
+            la = types[self.pos]
+        return Term(factor, ops)
+
+    # factor: LPAREN expression RPAREN | method_call | ID | NUMBER
+    def factor(self):
+        la = self.types[self.pos]
+        if la == ID:
+            if self.types[self.pos + 1] == LPAREN:
+                return Factor(self.method_call())
+            text = self.texts[self.pos]
+            self.pos += 1
+            return Factor(text)
+        if la == NUMBER:
+            text = self.texts[self.pos]
+            self.pos += 1
+            return Factor(int(text))
+        if la == LPAREN:
+            self.pos += 1
+            expression = self.expression()
+            self.match(RPAREN, "')'")
+            return Factor(expression)
+        self.error("{'(', ID, NUMBER}")
+
+    # method_call: ID LPAREN (value (COMMA value)*)? RPAREN
+    def method_call(self):
+        name = self.texts[self.pos]
+        self.pos += 2
+        args = []
+        if self.types[self.pos] != RPAREN:
+            args.append(self.value())
+            while self.types[self.pos] == COMMA:
+                self.pos += 1
+                args.append(self.value())
+        self.match(RPAREN, "{')', ','}")
+        return MethodCall(name, args)
+
+
+# The slot MethodBody keeps its statements in, which LazyMethodBody.body fills
+_METHOD_BODY_SLOT = MethodBody.body
+
+
+# A method body that was skipped by the outline parser. Its statements are
+# parsed from source[start:end] the first time body is read; a syntax error in
+# them is raised then. It compares, prints and serializes like a MethodBody.
+class LazyMethodBody(MethodBody):
+    __slots__ = ('source', 'start', 'end')
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    @property
+    def parsed(self):
+        return self.source is None
+
+    @property
+    def body(self):
+        if self.source is not None:
+            parser = NativeParser(self.source, self.start, self.end)
+            body = parser.method_body().body
+            if not parser.at_end():
+                parser.error("'}'")
+            _METHOD_BODY_SLOT.__set__(self, body)
+            self.source = None
+        return _METHOD_BODY_SLOT.__get__(self, MethodBody)
+
+    @body.setter
+    def body(self, value):
+        _METHOD_BODY_SLOT.__set__(self, value)
+        self.source = None
+
+    def __reduce__(self):
+        return MethodBody, (self.body,)
+
+
+# Parse Expresso source text into a Program AST
+def parse_native(source):
+    return NativeParser(source).program()
+
+
+# Parse the declaration outline of source: types, methods, their parameters and
+# variables are parsed as usual, but method bodies are only matched for braces
+# and parsed on first access (see LazyMethodBody)
+def parse_outline(source):
+    return NativeParser(source, lazy_bodies=True).program()
@@ -0,0 +1,250 @@
+# Purpose: Parsing entry points for the Expresso language
+#
+# The ANTLR runtime and the generated ExpressoLexer/ExpressoParser are only
+# imported inside the functions that use them. Importing them deserializes both
+# ATNs and builds every recognizer class, so importing this module stays cheap
+# until the first parse.
+
+
+# Parsing modes accepted by parse_program
+MODE_TWO_STAGE = 'two_stage'
+MODE_SLL = 'sll'
+MODE_LL = 'll'
+
+# Lexers accepted by parse_program
+LEXER_ANTLR = 'antlr'
+LEXER_REGEX = 'regex'
+LEXER_ARRAY = 'array'     # RegexLexer into a compact ArrayTokenStream
+
+# Stages reported back in ParseResult.stage
+STAGE_SLL = 'sll'
+STAGE_LL = 'll'
+
+
+# Where a SyntaxIssue was found
+KIND_LEXER = 'lexer'
+KIND_PARSER = 'parser'
+
+
+# One syntax error: 1-based line, 0-based column and character offset (-1 when
+# unknown) of where it was found, and the message ANTLR would have printed
+class SyntaxIssue:
+    __slots__ = ('line', 'column', 'offset', 'msg', 'kind')
+
+    def __init__(self, line, column, offset, msg, kind):
+        self.line = line
+        self.column = column
+        self.offset = offset
+        self.msg = msg
+        self.kind = kind
+
+    def __eq__(self, other):
+        if not isinstance(other, SyntaxIssue):
+            return False
+        return (self.line, self.column, self.offset, self.msg, self.kind) == \
+            (other.line, other.column, other.offset, other.msg, other.kind)
+
+    def __str__(self):
+        return f"line {self.line}:{self.column} {self.msg}"
+
+    def __repr__(self):
+        return f"SyntaxIssue(line={self.line}, column={self.column}, offset={self.offset}, msg={self.msg!r}, kind={self.kind})"
+
+
+# The outcome of a parse: the Program AST and the prediction stage that produced it
+class ParseResult:
+    def __init__(self, program, stage):
+        self.program = program
+        self.stage = stage
+
+    def __repr__(self):
+        return f"ParseResult(program={self.program}, stage={self.stage})"
+
+
+# Raised by parse_checked for source with syntax errors, and by parse_program
+# and the other AST entry points for syntax errors of the parser. issues holds
+# them as SyntaxIssues in source order.
+class ParseSyntaxError(Exception):
+
+    def __init__(self, issues):
+        more = f" (and {len(issues) - 1} more)" if len(issues) > 1 else ''
+        msg = f"{issues[0]}{more}"
+        super().__init__(msg)
+        self.msg = msg
+        self.issues = issues
+
+
+# Configure a parser for the fast stage: SLL prediction, bail out on the first error
+def _configure_sll(parser):
+    from antlr4.atn.PredictionMode import PredictionMode
+    from antlr4.error.ErrorStrategy import BailErrorStrategy
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    parser.removeErrorListeners()
+
+
+# Configure a parser for the full stage: LL prediction with the default
+# recovery, reporting to error_listener, or to the console without one
+def _configure_ll(parser, error_listener=None):
+    from antlr4.atn.PredictionMode import PredictionMode
+    from antlr4.error.ErrorStrategy import DefaultErrorStrategy
+    from antlr4.error.ErrorListener import ConsoleErrorListener
+    parser._interp.predictionMode = PredictionMode.LL
+    parser._errHandler = DefaultErrorStrategy()
+    parser.removeErrorListeners()
+    parser.addErrorListener(error_listener or ConsoleErrorListener.INSTANCE)
+
+
+# Parse a token stream into a parse tree, returning (tree, stage).
+# In two-stage mode SLL is tried first; only if it fails is the input rewound and
+# parsed again with full LL, so SLL is never trusted to report a syntax error.
+# limits, an expresso_limits.ParseLimits, bounds both stages together.
+# Syntax errors are recovered from, and reported to error_listener if given.
+def parse_tree(token_stream, mode=MODE_TWO_STAGE, limits=None, error_listener=None):
+    if limits is None:
+        from ExpressoParser import ExpressoParser
+        parser = ExpressoParser(token_stream)
+    else:
+        from expresso_limits import LimitedExpressoParser
+        parser = LimitedExpressoParser(token_stream, limits)
+    return run_parser(parser, mode, error_listener)
+
+
+# parse_tree for a tree to build an AST from: a syntax error raises
+# ParseSyntaxError, as a tree recovered from one has error nodes and missing
+# children that ExpressoListener cannot build an AST from
+def _parse_tree_for_ast(token_stream, mode=MODE_TWO_STAGE, limits=None):
+    from expresso_validate import IssueCollector
+    collector = IssueCollector(KIND_PARSER)
+    tree, stage = parse_tree(token_stream, mode, limits, collector)
+    if collector.issues:
+        raise ParseSyntaxError(collector.issues)
+    return tree, stage
+
+
+# Run a new ExpressoParser (or subclass) over its token stream in mode, as
+# parse_tree does, returning (tree, stage). error_listener, if given, is told
+# the syntax errors of the LL stage instead of the console.
+def run_parser(parser, mode=MODE_TWO_STAGE, error_listener=None):
+    from antlr4.error.Errors import ParseCancellationException
+    if mode == MODE_LL:
+        if error_listener is not None:
+            _configure_ll(parser, error_listener)
+        return parser.program(), STAGE_LL
+
+    _configure_sll(parser)
+    if mode == MODE_SLL:
+        return parser.program(), STAGE_SLL
+    if mode != MODE_TWO_STAGE:
+        raise ValueError(f"unknown parse mode: {mode!r}")
+
+    try:
+        return parser.program(), STAGE_SLL
+    except ParseCancellationException:
+        parser.reset()
+        _configure_ll(parser, error_listener)
+        return parser.program(), STAGE_LL
+
+
+# run_parser for a parser over source that must be free of syntax errors:
+# raises ParseSyntaxError with the issues of the parse, those the lexer
+# reported into lexer_issues, and tokens left over after the program, as
+# expresso_validate.validate reports them
+def run_parser_checked(parser, lexer_issues, mode=MODE_TWO_STAGE):
+    from antlr4.Token import Token
+    from expresso_validate import IssueCollector
+    collector = IssueCollector(KIND_PARSER)
+    tree, stage = run_parser(parser, mode, collector)
+    issues = lexer_issues + collector.issues
+    token = parser.getTokenStream().LT(1)
+    if token.type != Token.EOF:
+        issues.append(SyntaxIssue(token.line, token.column, token.start,
+                                  f"extraneous input '{token.text}' expecting <EOF>", KIND_PARSER))
+    if issues:
+        issues.sort(key=lambda issue: (issue.line, issue.column))
+        raise ParseSyntaxError(issues)
+    return tree, stage
+
+
+# Build the Program AST for a parse tree with the ExpressoListener
+def build_ast(tree):
+    from expresso_listener import ExpressoListener
+    from expresso_walker import IterativeParseTreeWalker
+    listener = ExpressoListener()
+    IterativeParseTreeWalker.DEFAULT.walk(listener, tree)
+    return listener.stack[0]
+
+
+# Parse source into a ParseResult and the source span of every node in it, as a
+# dict from id(node) to (start, end) character offsets (see SpanListener)
+def parse_spans(source, mode=MODE_TWO_STAGE):
+    from expresso_listener import SpanListener
+    from expresso_tokens import ArrayTokenStream
+    from expresso_walker import IterativeParseTreeWalker
+    tree, stage = _parse_tree_for_ast(ArrayTokenStream(source), mode)
+    listener = SpanListener()
+    IterativeParseTreeWalker.DEFAULT.walk(listener, tree)
+    return ParseResult(listener.stack[0], stage), listener.spans
+
+
+# Parse a TokenStream into a ParseResult
+def parse_token_stream(token_stream, mode=MODE_TWO_STAGE, limits=None):
+    tree, stage = _parse_tree_for_ast(token_stream, mode, limits)
+    return ParseResult(build_ast(tree), stage)
+
+
+# Parse the tokens of a TokenSource into a ParseResult
+def parse_tokens(token_source, mode=MODE_TWO_STAGE, limits=None):
+    from antlr4 import CommonTokenStream
+    return parse_token_stream(CommonTokenStream(token_source), mode, limits)
+
+
+# Lex and parse a CharStream into a ParseResult
+def parse_char_stream(char_stream, mode=MODE_TWO_STAGE, limits=None):
+    from ExpressoLexer import ExpressoLexer
+    return parse_tokens(ExpressoLexer(char_stream), mode, limits)
+
+
+# Parse Expresso source text into a ParseResult, lexing it with the generated
+# ExpressoLexer or with the equivalent RegexLexer. With limits (see
+# expresso_limits) the parse raises a ParseLimitError once it hits one of them.
+# Syntax errors raise ParseSyntaxError rather than yield an AST of a recovered
+# tree; parse_checked also
+# rejects lexing errors and tokens left over after the program.
+def parse_program(source, mode=MODE_TWO_STAGE, lexer=LEXER_ANTLR, limits=None):
+    if lexer == LEXER_ARRAY:
+        from expresso_tokens import ArrayTokenStream
+        max_tokens = limits.max_tokens if limits is not None else None
+        return parse_token_stream(ArrayTokenStream(source, max_tokens=max_tokens), mode, limits)
+    if lexer == LEXER_REGEX:
+        from expresso_regex_lexer import RegexLexer
+        return parse_tokens(RegexLexer(source), mode, limits)
+    if lexer != LEXER_ANTLR:
+        raise ValueError(f"unknown lexer: {lexer!r}")
+    from antlr4 import InputStream
+    return parse_char_stream(InputStream(source), mode, limits)
+
+
+# Parse source into a ParseResult like parse_program with LEXER_ARRAY, but
+# raise ParseSyntaxError if it has any syntax error instead of recovering
+def parse_checked(source, mode=MODE_TWO_STAGE, limits=None):
+    from expresso_tokens import ArrayTokenStream
+    from expresso_validate import IssueCollector
+    collector = IssueCollector(KIND_LEXER)
+    max_tokens = limits.max_tokens if limits is not None else None
+    token_stream = ArrayTokenStream(source, error_listener=collector, max_tokens=max_tokens)
+    if limits is None:
+        from ExpressoParser import ExpressoParser
+        parser = ExpressoParser(token_stream)
+    else:
+        from expresso_limits import LimitedExpressoParser
+        parser = LimitedExpressoParser(token_stream, limits)
+    tree, stage = run_parser_checked(parser, collector.issues, mode)
+    return ParseResult(build_ast(tree), stage)
+
+
+# Parse an Expresso file into a ParseResult, lexing it straight from a memory map
+def parse_file(path, mode=MODE_TWO_STAGE):
+    from expresso_charstream import MappedCharStream
+    with MappedCharStream(path) as char_stream:
+        return parse_char_stream(char_stream, mode)
@@ -0,0 +1,283 @@
+# Purpose: Per-rule and per-decision profiling of the generated Expresso parser
+#
+# The Python ANTLR runtime has no ProfilingATNSimulator, so this module has its
+# own, after the Java one: for every decision it counts predictions, the time
+# spent in them, how many tokens SLL and (on fallback) full-context LL looked
+# at, ambiguities, context sensitivities, prediction errors and how many steps
+# came from the DFA against how many needed ATN simulation. A parse listener
+# times every rule invocation, both inclusive of the rules it calls and on its
+# own, keyed by the rule's context class (ProgramContext, ExpressionContext...).
+#
+# A ParseProfile collects both over any number of parses and reports them
+# sorted by cost, as a table or as JSON for regression tracking:
+#
+#     python main.py build src --profile-parse [--profile-json profile.json]
+
+import json
+import time
+
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+from antlr4.tree.Tree import ParseTreeListener
+
+from ExpressoParser import ExpressoParser
+from expresso_parse import MODE_TWO_STAGE, ParseResult, build_ast, run_parser
+from expresso_tokens import ArrayTokenStream
+
+# Bump when the layout of as_json() changes
+FORMAT_VERSION = 1
+
+
+# Prediction statistics of one decision. Lookahead is in tokens; the min/max
+# fields are None until the decision is seen (LL ones until it falls back).
+class DecisionProfile:
+    __slots__ = ('decision', 'rule', 'invocations', 'seconds',
+                 'sll_total_look', 'sll_min_look', 'sll_max_look',
+                 'll_fallbacks', 'll_total_look', 'll_min_look', 'll_max_look',
+                 'ambiguities', 'context_sensitivities', 'errors',
+                 'sll_atn_transitions', 'sll_dfa_transitions', 'll_atn_transitions')
+
+    def __init__(self, decision, rule):
+        self.decision = decision
+        self.rule = rule
+        self.invocations = 0
+        self.seconds = 0.0
+        self.sll_total_look = 0
+        self.sll_min_look = None
+        self.sll_max_look = None
+        self.ll_fallbacks = 0
+        self.ll_total_look = 0
+        self.ll_min_look = None
+        self.ll_max_look = None
+        self.ambiguities = 0
+        self.context_sensitivities = 0
+        self.errors = 0
+        self.sll_atn_transitions = 0
+        self.sll_dfa_transitions = 0
+        self.ll_atn_transitions = 0
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"DecisionProfile(decision={self.decision}, rule={self.rule}, invocations={self.invocations})"
+
+
+# Invocations and time of one rule: seconds includes the rules it calls,
+# self_seconds does not
+class RuleProfile:
+    __slots__ = ('context', 'invocations', 'seconds', 'self_seconds')
+
+    def __init__(self, context):
+        self.context = context
+        self.invocations = 0
+        self.seconds = 0.0
+        self.self_seconds = 0.0
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"RuleProfile(context={self.context}, invocations={self.invocations}, seconds={self.seconds})"
+
+
+class ParseProfile:
+
+    def __init__(self):
+        self.decisions = {}     # decision number -> DecisionProfile
+        self.rules = {}         # context class name -> RuleProfile
+        self.parses = 0
+        self.tokens = 0
+        self.seconds = 0.0
+
+    def decision(self, decision):
+        profile = self.decisions.get(decision)
+        if profile is None:
+            rule = ExpressoParser.ruleNames[ExpressoParser.atn.decisionToState[decision].ruleIndex]
+            profile = self.decisions[decision] = DecisionProfile(decision, rule)
+        return profile
+
+    def rule(self, context):
+        profile = self.rules.get(context)
+        if profile is None:
+            profile = self.rules[context] = RuleProfile(context)
+        return profile
+
+    # Rules by time spent in them alone, decisions by time spent predicting
+    def sorted_rules(self):
+        return sorted(self.rules.values(), key=lambda rule: (-rule.self_seconds, rule.context))
+
+    def sorted_decisions(self):
+        return sorted(self.decisions.values(), key=lambda decision: (-decision.seconds, decision.decision))
+
+    def as_json(self):
+        return {
+            'version': FORMAT_VERSION,
+            'parses': self.parses,
+            'tokens': self.tokens,
+            'seconds': self.seconds,
+            'rules': [rule.as_dict() for rule in self.sorted_rules()],
+            'decisions': [decision.as_dict() for decision in self.sorted_decisions()],
+        }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_json(), f, indent=2)
+            f.write('\n')
+
+    # The report as lines of text
+    def table(self):
+        lines = [f"{self.parses} parses, {self.tokens} tokens, {self.seconds:.3f} s", "",
+                 f"{'rule context':<28} {'calls':>8} {'self ms':>10} {'total ms':>10} {'self %':>7}"]
+        total = sum(rule.self_seconds for rule in self.rules.values()) or 1.0
+        for rule in self.sorted_rules():
+            lines.append(f"{rule.context:<28} {rule.invocations:>8} {rule.self_seconds * 1000:>10.2f} "
+                         f"{rule.seconds * 1000:>10.2f} {rule.self_seconds / total * 100:>6.1f}%")
+        lines += ["", f"{'decision':>8} {'rule':<20} {'calls':>8} {'ms':>9} {'SLL k avg':>9} {'max':>4} "
+                      f"{'LL':>6} {'LL k max':>8} {'ambig':>6} {'ctx':>5} {'err':>5} {'ATN':>6} {'DFA':>8}"]
+        for d in self.sorted_decisions():
+            sll_avg = d.sll_total_look / d.invocations if d.invocations else 0.0
+            lines.append(f"{d.decision:>8} {d.rule:<20} {d.invocations:>8} {d.seconds * 1000:>9.2f} "
+                         f"{sll_avg:>9.2f} {d.sll_max_look or 0:>4} {d.ll_fallbacks:>6} {d.ll_max_look or 0:>8} "
+                         f"{d.ambiguities:>6} {d.context_sensitivities:>5} {d.errors:>5} "
+                         f"{d.sll_atn_transitions + d.ll_atn_transitions:>6} {d.sll_dfa_transitions:>8}")
+        return lines
+
+
+# ParserATNSimulator recording DecisionProfiles into a ParseProfile
+class ProfilingATNSimulator(ParserATNSimulator):
+
+    def __init__(self, parser, profile):
+        super().__init__(parser, parser.atn, parser.decisionsToDFA, parser.sharedContextCache)
+        self.profile = profile
+        self.current = None
+        self.sll_stop = -1
+        self.ll_stop = -1
+        self.resolved_by_sll = None
+
+    def adaptivePredict(self, input, decision, outerContext):
+        self.sll_stop = self.ll_stop = -1
+        self.current = current = self.profile.decision(decision)
+        start_index = input.index
+        start = time.perf_counter()
+        alt = super().adaptivePredict(input, decision, outerContext)
+        current.seconds += time.perf_counter() - start
+        current.invocations += 1
+        sll_k = self.sll_stop - start_index + 1
+        current.sll_total_look += sll_k
+        current.sll_min_look = sll_k if current.sll_min_look is None else min(current.sll_min_look, sll_k)
+        current.sll_max_look = sll_k if current.sll_max_look is None else max(current.sll_max_look, sll_k)
+        if self.ll_stop >= 0:
+            ll_k = self.ll_stop - start_index + 1
+            current.ll_total_look += ll_k
+            current.ll_min_look = ll_k if current.ll_min_look is None else min(current.ll_min_look, ll_k)
+            current.ll_max_look = ll_k if current.ll_max_look is None else max(current.ll_max_look, ll_k)
+        return alt
+
+    def getExistingTargetState(self, previousD, t):
+        self.sll_stop = self._input.index
+        existing = super().getExistingTargetState(previousD, t)
+        if existing is not None:
+            self.current.sll_dfa_transitions += 1
+            if existing is self.ERROR:
+                self.current.errors += 1
+        return existing
+
+    def computeReachSet(self, closure, t, fullCtx):
+        if fullCtx:
+            self.ll_stop = self._input.index
+        reach = super().computeReachSet(closure, t, fullCtx)
+        if fullCtx:
+            self.current.ll_atn_transitions += 1
+        else:
+            self.current.sll_atn_transitions += 1
+        if reach is None:
+            self.current.errors += 1
+        return reach
+
+    def reportAttemptingFullContext(self, dfa, conflictingAlts, configs, startIndex, stopIndex):
+        if conflictingAlts is None:
+            conflictingAlts = {config.alt for config in configs}
+        self.resolved_by_sll = min(conflictingAlts)
+        self.current.ll_fallbacks += 1
+        super().reportAttemptingFullContext(dfa, conflictingAlts, configs, startIndex, stopIndex)
+
+    def reportContextSensitivity(self, dfa, prediction, configs, startIndex, stopIndex):
+        if prediction != self.resolved_by_sll:
+            self.current.context_sensitivities += 1
+        super().reportContextSensitivity(dfa, prediction, configs, startIndex, stopIndex)
+
+    def reportAmbiguity(self, dfa, D, startIndex, stopIndex, exact, ambigAlts, configs):
+        self.current.ambiguities += 1
+        super().reportAmbiguity(dfa, D, startIndex, stopIndex, exact, ambigAlts, configs)
+
+
+# Parse listener timing every rule invocation into a ParseProfile
+class RuleTimer(ParseTreeListener):
+
+    def __init__(self, profile):
+        self.profile = profile
+        # [start time, time spent in the rules called so far] of every rule being parsed
+        self.frames = []
+
+    def enterEveryRule(self, ctx):
+        self.frames.append([time.perf_counter(), 0.0])
+
+    def exitEveryRule(self, ctx):
+        start, inner = self.frames.pop()
+        seconds = time.perf_counter() - start
+        rule = self.profile.rule(type(ctx).__name__)
+        rule.invocations += 1
+        rule.seconds += seconds
+        rule.self_seconds += seconds - inner
+        if self.frames:
+            self.frames[-1][1] += seconds
+
+
+# ExpressoParser recording into profile
+class ProfilingExpressoParser(ExpressoParser):
+
+    def __init__(self, input, profile):
+        super().__init__(input)
+        self._interp = ProfilingATNSimulator(self, profile)
+        self.addParseListener(RuleTimer(profile))
+
+    # Parser.reset fails, trying to remove a trace listener that was never added,
+    # when it finds parse listeners, so they are set aside while it runs
+    def reset(self):
+        listeners = self._parseListeners
+        self._parseListeners = None
+        super().reset()
+        self._parseListeners = listeners
+
+
+# Parse source as parse_program(source, mode, LEXER_ARRAY) does, profiling the
+# parse into profile
+def profile_program(source, profile, mode=MODE_TWO_STAGE):
+    token_stream = ArrayTokenStream(source)
+    start = time.perf_counter()
+    tree, stage = run_parser(ProfilingExpressoParser(token_stream, profile), mode)
+    profile.seconds += time.perf_counter() - start
+    profile.parses += 1
+    profile.tokens += len(token_stream.types) - 1
+    return ParseResult(build_ast(tree), stage)
+
+
+# Entry point of `expresso build <dir> --profile-parse`: profile the parse of every
+# source under root in this process, print the report and write it to json_path
+def profile_command(root, json_path=None, out=None):
+    from expresso_build import find_sources
+    profile = ParseProfile()
+    failures = 0
+    for path in find_sources(root):
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        try:
+            profile_program(source, profile)
+        except Exception as e:
+            failures += 1
+            print(f"{path}  FAILED {type(e).__name__}: {e}", file=out)
+    for line in profile.table():
+        print(line, file=out)
+    if json_path is not None:
+        profile.write_json(json_path)
+    return 1 if failures else 0
@@ -0,0 +1,103 @@
+# Purpose: Single-pass regex lexer for the Expresso language
+#
+# RegexLexer is a TokenSource that can stand in for the generated ExpressoLexer
+# in a CommonTokenStream. Instead of running the lexer ATN one character at a
+# time, it matches each token with the native parser's master regex and looks
+# keywords up among the ID matches. Its tokens carry the same types, text,
+# offsets, lines and columns as ExpressoLexer's, and unrecognized characters are
+# reported and skipped the same way, so the parser cannot tell the two apart.
+
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.Lexer import TokenSource
+from antlr4.Recognizer import Recognizer
+from antlr4.Token import Token
+from antlr4.error.Errors import LexerNoViableAltException
+
+from expresso_native import TOKEN_RE, KEYWORDS, OPERATORS, ID, NUMBER
+
+# How ANTLR's Lexer.getErrorDisplay shows control characters
+_ERROR_DISPLAY = str.maketrans({'\n': '\\n', '\t': '\\t', '\r': '\\r'})
+
+
+class RegexLexer(Recognizer, TokenSource):
+
+    def __init__(self, source, name='<unknown>'):
+        super().__init__()
+        self.source = source
+        self.sourceName = name
+        self._factory = CommonTokenFactory.DEFAULT
+        self._source_pair = (self, None)
+        self._pos = 0
+        self._end = len(source)
+        self.line = 1
+        self._line_start = 0     # offset of the first character of the current line
+        self._tokens = self.scan()
+
+    @property
+    def column(self):
+        return self._pos - self._line_start
+
+    def getSourceName(self):
+        return self.sourceName
+
+    # Advance past source[pos:end], keeping line and column up to date
+    def _advance(self, end):
+        newlines = self.source.count('\n', self._pos, end)
+        if newlines:
+            self.line += newlines
+            self._line_start = self.source.rfind('\n', self._pos, end) + 1
+        self._pos = end
+
+    # Report an unrecognized character and skip it. Like the ATN lexer, a '!' that
+    # does not start '!=' is reported and skipped together with the character after it.
+    def _recover(self):
+        pos = self._pos
+        end = pos + 2 if self.source[pos] == '!' and pos + 1 < self._end else pos + 1
+        text = self.source[pos:end].translate(_ERROR_DISPLAY)
+        e = LexerNoViableAltException(self, None, pos, None)
+        self.getErrorListenerDispatch().syntaxError(self, None, self.line, self.column,
+                                                    f"token recognition error at: '{text}'", e)
+        self._advance(end)
+
+    # Yield (type, start, stop, line, column) for every token, then for EOF forever.
+    # This is the lexer without the token objects, for token stores that keep the
+    # fields in columns of their own.
+    def scan(self):
+        source = self.source
+        match = TOKEN_RE.match
+        while self._pos < self._end:
+            m = match(source, self._pos, self._end)
+            if m is None:
+                self._recover()
+                continue
+            kind = m.lastgroup
+            if kind == 'ws':
+                self._advance(m.end())
+                continue
+            if kind == 'id':
+                token_type = KEYWORDS.get(m.group(), ID)
+            elif kind == 'op':
+                token_type = OPERATORS[m.group()]
+            else:
+                token_type = NUMBER
+            start = self._pos
+            # Tokens never span lines, so only the offset moves
+            self._pos = m.end()
+            yield token_type, start, self._pos - 1, self.line, start - self._line_start
+        while True:
+            yield Token.EOF, self._pos, self._pos - 1, self.line, self.column
+
+    def nextToken(self):
+        token_type, start, stop, line, column = next(self._tokens)
+        text = '<EOF>' if token_type == Token.EOF else self.source[start:stop + 1]
+        return self._factory.create(self._source_pair, token_type, text, Token.DEFAULT_CHANNEL,
+                                    start, stop, line, column)
+
+    # Every token up to, but not including, EOF
+    def getAllTokens(self):
+        tokens = []
+        token = self.nextToken()
+        while token.type != Token.EOF:
+            tokens.append(token)
+            token = self.nextToken()
+        return tokens
@@ -0,0 +1,422 @@
+# Purpose: Long-lived parse daemon over a Unix domain socket, and its client
+#
+# Every CLI run pays for importing the ANTLR runtime, deserializing both ATNs
+# and learning the DFAs from scratch. `expresso serve` pays for it once: a
+# ParseServer loads the DFA cache, warms up on WARMUP_SOURCE and then answers
+# parse and check requests with the same ExpressoParser, keeping the encoded
+# results of recent requests in memory (and, with an ASTCache, on disk).
+#
+# Requests and responses are frames over a stream socket:
+#
+#     request:   op:u8 frontend:u8 length:u32 payload
+#     response:  status:u8 length:u32 payload
+#
+# all little-endian. The payload of a request is the UTF-8 source. A parse
+# answers with the Program in expresso_binary encoding, a check with its syntax
+# errors as an encoded list of (line, column, offset, msg, kind) tuples, and a
+# failed request with STATUS_ERROR and the error as UTF-8 text. A parse of source
+# with syntax errors answers STATUS_SYNTAX_ERROR with the errors, encoded as a
+# check's are, and is never cached; the client raises them as the exception the
+# front-end raises in process. Text is UTF-8 with lone surrogates passed
+# through, on both ends. A connection can carry any number of requests.
+#
+# Requests of different connections are served by threads of their own. They
+# share the LRU of results under one lock, held only to look up and insert.
+# Every ANTLR parse, the parses of check requests included, holds another: the
+# ExpressoParser and ExpressoLexer classes share their DFAs and prediction
+# context cache across instances, and the ANTLR runtime does not lock them.
+#
+# ParseClient is the thin side: it imports neither ANTLR nor the parser, and
+# when no daemon answers on the socket, or one stops answering within its
+# timeout, it parses in its own process instead, with the same results.
+
+import hashlib
+import os
+import socket
+import socketserver
+import struct
+import threading
+from collections import OrderedDict
+
+from expresso_binary import decode, encode
+from expresso_build import FRONTEND_ANTLR, FRONTEND_NATIVE, WARMUP_SOURCE, _parser_for
+from expresso_native import ExpressoSyntaxError
+from expresso_parse import KIND_PARSER, ParseSyntaxError, SyntaxIssue
+
+OP_PARSE = 1
+OP_CHECK = 2
+OP_PING = 3
+OP_SHUTDOWN = 4
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_SYNTAX_ERROR = 2
+
+# Error handler of every encoding and decoding of text, on both ends
+_ERRORS = 'surrogatepass'
+
+# Front-ends by their number in a request
+FRONTENDS = (FRONTEND_ANTLR, FRONTEND_NATIVE)
+
+_REQUEST = struct.Struct('<BBI')
+_RESPONSE = struct.Struct('<BI')
+
+# Largest payload either side accepts
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+# Results a ParseServer keeps in memory
+MEMORY_ENTRIES = 1024
+
+# Seconds a client waits to connect to the daemon, and for each answer
+CONNECT_TIMEOUT = 1.0
+REQUEST_TIMEOUT = 60.0
+
+
+# A request the daemon could not answer; msg is its error
+class ServeError(Exception):
+
+    def __init__(self, msg):
+        super().__init__(msg)
+        self.msg = msg
+
+
+# Socket of the daemon: EXPRESSO_SOCKET, or serve.sock in the Expresso cache
+# directory, which EXPRESSO_CACHE_DIR overrides
+def default_socket_path():
+    path = os.environ.get('EXPRESSO_SOCKET')
+    if path:
+        return path
+    root = os.environ.get('EXPRESSO_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'expresso')
+    return os.path.join(root, 'serve.sock')
+
+
+# Read exactly size bytes from sock; None if it is closed before the first one
+def _read_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            if data:
+                raise ConnectionError("connection closed in the middle of a frame")
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def _read_payload(sock, length):
+    if length > MAX_PAYLOAD:
+        raise ConnectionError(f"frame of {length} bytes is larger than {MAX_PAYLOAD}")
+    if not length:
+        return b''
+    payload = _read_exactly(sock, length)
+    if payload is None:
+        raise ConnectionError("connection closed in the middle of a frame")
+    return payload
+
+
+# The (line, column, offset, msg, kind) tuples of validate(source)
+def _check(source):
+    from expresso_validate import validate
+    return [(issue.line, issue.column, issue.offset, issue.msg, issue.kind) for issue in validate(source)]
+
+
+# The (line, column, offset, msg, kind) tuples of a syntax error of a front-end
+def _syntax_error_issues(error):
+    if isinstance(error, ExpressoSyntaxError):
+        return [(error.line, error.column, -1, error.msg, KIND_PARSER)]
+    return [(issue.line, issue.column, issue.offset, issue.msg, issue.kind) for issue in error.issues]
+
+
+# The exception frontend raises in process for the syntax errors in issues
+def _syntax_error(frontend, issues):
+    if frontend == FRONTEND_NATIVE:
+        line, column, _, msg, _ = issues[0]
+        return ExpressoSyntaxError(msg, line, column)
+    return ParseSyntaxError([SyntaxIssue(*issue) for issue in issues])
+
+
+class ParseServer:
+
+    # cache, an ASTCache, also keeps the ASTs of parse requests on disk
+    def __init__(self, socket_path=None, cache=None, memory_entries=MEMORY_ENTRIES):
+        self.socket_path = socket_path or default_socket_path()
+        self.cache = cache
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()     # request key -> encoded response payload
+        self.lock = threading.Lock()    # guards memory and the counters
+        self.parser = None
+        self.parser_lock = threading.Lock()     # held by every ANTLR parse
+        self.server = None
+        self.stopping = False
+        self.known_states = 0
+        self.requests = 0
+        self.hits = 0
+
+    # Load the DFA cache and the front-ends, and parse WARMUP_SOURCE once
+    def warm(self):
+        from ExpressoParser import ExpressoParser
+        from expresso_dfa_cache import dfa_state_count, load_dfa_cache
+        from expresso_tokens import ArrayTokenStream
+        load_dfa_cache()
+        self.known_states = dfa_state_count()
+        self.parser = ExpressoParser(ArrayTokenStream(''))
+        self.parse(WARMUP_SOURCE, FRONTEND_ANTLR)
+        self.parse(WARMUP_SOURCE, FRONTEND_NATIVE)
+
+    # Parse source with the server's ExpressoParser, or the native parser.
+    # Raises on syntax errors (expresso_parse.ParseSyntaxError and
+    # expresso_native.ExpressoSyntaxError) rather than recover from them.
+    def parse(self, source, frontend):
+        if frontend == FRONTEND_NATIVE:
+            from expresso_native import parse_native
+            return parse_native(source)
+        from expresso_parse import build_ast, run_parser_checked
+        from expresso_tokens import ArrayTokenStream
+        from expresso_validate import KIND_LEXER, IssueCollector
+        collector = IssueCollector(KIND_LEXER)
+        token_stream = ArrayTokenStream(source, error_listener=collector)
+        with self.parser_lock:
+            self.parser.setTokenStream(token_stream)
+            tree, _ = run_parser_checked(self.parser, collector.issues)
+        return build_ast(tree)
+
+    # Answer one request, returning (status, payload)
+    def handle(self, op, frontend, payload):
+        if op == OP_PING:
+            return STATUS_OK, b''
+        if op not in (OP_PARSE, OP_CHECK):
+            return STATUS_ERROR, f"unknown request {op}".encode('utf-8', _ERRORS)
+        if frontend >= len(FRONTENDS):
+            return STATUS_ERROR, f"unknown front-end {frontend}".encode('utf-8', _ERRORS)
+        frontend = FRONTENDS[frontend]
+        key = hashlib.sha256(bytes([op]) + frontend.encode('ascii') + b'\0' + payload).digest()
+        with self.lock:
+            self.requests += 1
+            result = self.memory.get(key)
+            if result is not None:
+                self.hits += 1
+                self.memory.move_to_end(key)
+                return STATUS_OK, result
+        try:
+            source = payload.decode('utf-8', _ERRORS)
+            if op == OP_CHECK:
+                with self.parser_lock:
+                    issues = _check(source)
+                result = encode(issues)
+            else:
+                result = self.cache.load_payload(self.cache.key(source, frontend)) if self.cache else None
+                if result is None:
+                    result = encode(self.parse(source, frontend))
+                    if self.cache is not None:
+                        self.cache.store_payload(self.cache.key(source, frontend), result)
+        except (ParseSyntaxError, ExpressoSyntaxError) as e:
+            return STATUS_SYNTAX_ERROR, encode(_syntax_error_issues(e))
+        except Exception as e:
+            return STATUS_ERROR, f"{type(e).__name__}: {e}".encode('utf-8', _ERRORS)
+        with self.lock:
+            self.memory[key] = result
+            if len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+        return STATUS_OK, result
+
+    # Bind the socket; fails if a daemon already answers on it, and removes a
+    # socket file left behind by one that did not stop cleanly
+    def bind(self):
+        if os.path.exists(self.socket_path):
+            try:
+                ParseClient.connect(self.socket_path).close()
+            except OSError:
+                os.unlink(self.socket_path)
+            else:
+                raise ServeError(f"a daemon is already serving on {self.socket_path}")
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.server = _UnixServer(self.socket_path, _Handler)
+        self.server.parse_server = self
+        os.chmod(self.socket_path, 0o600)
+
+    # Answer requests until OP_SHUTDOWN or stop(); then remove the socket and
+    # save the DFA states learned meanwhile to the DFA cache
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            from expresso_dfa_cache import dfa_state_count, save_dfa_cache
+            if dfa_state_count() > self.known_states:
+                save_dfa_cache()
+
+    # Make serve_forever return, and close every connection at its next
+    # request; from any thread but the one running serve_forever
+    def stop(self):
+        self.stopping = True
+        self.server.shutdown()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+# Serves the requests of one connection, one frame after another
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        parse_server = self.server.parse_server
+        sock = self.request
+        while True:
+            try:
+                header = _read_exactly(sock, _REQUEST.size)
+                if header is None:
+                    return
+                op, frontend, length = _REQUEST.unpack(header)
+                payload = _read_payload(sock, length)
+            except ConnectionError:
+                return
+            if parse_server.stopping:
+                return
+            if op == OP_SHUTDOWN:
+                sock.sendall(_RESPONSE.pack(STATUS_OK, 0))
+                threading.Thread(target=parse_server.stop, daemon=True).start()
+                return
+            status, result = parse_server.handle(op, frontend, payload)
+            sock.sendall(_RESPONSE.pack(status, len(result)) + result)
+
+
+# Client of a ParseServer, or of this process when there is none: parse() and
+# check() go to the daemon while it answers and are done in process otherwise
+class ParseClient:
+
+    # timeout is how long to wait for each answer of the daemon. A daemon that
+    # does not answer in time counts as gone, like one that closed the socket.
+    def __init__(self, socket_path=None, fallback=True, timeout=REQUEST_TIMEOUT):
+        self.socket_path = socket_path or default_socket_path()
+        self.fallback = fallback
+        try:
+            self.sock = self.connect(self.socket_path)
+            self.sock.settimeout(timeout)
+        except OSError:
+            if not fallback:
+                raise
+            self.sock = None
+        self._parsers = {}
+
+    # A socket connected to the daemon on socket_path; OSError (socket.timeout
+    # among them) if none answers within timeout seconds
+    @staticmethod
+    def connect(socket_path, timeout=CONNECT_TIMEOUT):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    @property
+    def connected(self):
+        return self.sock is not None
+
+    # Send one request and return the payload of its response. ServeError if the
+    # daemon failed it, OSError if the daemon went away or did not answer in
+    # time, ConnectionError if there is no daemon to ask, and for source with
+    # syntax errors the exception of the front-end (see _syntax_error).
+    def request(self, op, payload=b'', frontend=FRONTEND_ANTLR):
+        if self.sock is None:
+            raise ConnectionError(f"not connected to a daemon on {self.socket_path}")
+        self.sock.sendall(_REQUEST.pack(op, FRONTENDS.index(frontend), len(payload)) + payload)
+        header = _read_exactly(self.sock, _RESPONSE.size)
+        if header is None:
+            raise ConnectionError("the daemon closed the connection")
+        status, length = _RESPONSE.unpack(header)
+        result = _read_payload(self.sock, length)
+        if status == STATUS_SYNTAX_ERROR:
+            raise _syntax_error(frontend, [tuple(issue) for issue in decode(result)])
+        if status != STATUS_OK:
+            raise ServeError(result.decode('utf-8', _ERRORS))
+        return result
+
+    # Send op to the daemon, or return None when there is none (any more) and
+    # the request is to be done in process
+    def _remote(self, op, source, frontend):
+        if self.sock is None:
+            return None
+        try:
+            return self.request(op, source.encode('utf-8', _ERRORS), frontend)
+        except OSError:
+            if not self.fallback:
+                raise
+            self.close()
+            return None
+
+    # The Program of source
+    def parse(self, source, frontend=FRONTEND_ANTLR):
+        result = self._remote(OP_PARSE, source, frontend)
+        if result is not None:
+            return decode(result)
+        parse = self._parsers.get(frontend)
+        if parse is None:
+            parse = self._parsers[frontend] = _parser_for(frontend)
+        return parse(source)
+
+    # The syntax errors of source as (line, column, offset, msg, kind) tuples
+    # in source order, as expresso_validate.validate finds them
+    def check(self, source):
+        result = self._remote(OP_CHECK, source, FRONTEND_ANTLR)
+        if result is not None:
+            return [tuple(issue) for issue in decode(result)]
+        return _check(source)
+
+    def ping(self):
+        self.request(OP_PING)
+
+    # Ask the daemon to stop
+    def shutdown(self):
+        self.request(OP_SHUTDOWN)
+        self.close()
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Entry point of `expresso serve`: warm up and answer requests on socket_path
+# until stopped with OP_SHUTDOWN (`expresso serve --stop`) or an interrupt
+def serve_command(socket_path=None, cache=None, out=None):
+    server = ParseServer(socket_path, cache)
+    try:
+        server.bind()
+    except ServeError as e:
+        print(e.msg, file=out)
+        return 1
+    server.warm()
+    print(f"serving on {server.socket_path}", file=out, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# Entry point of `expresso serve --stop`
+def stop_command(socket_path=None, out=None):
+    socket_path = socket_path or default_socket_path()
+    try:
+        client = ParseClient(socket_path, fallback=False)
+    except OSError:
+        print(f"no daemon is serving on {socket_path}", file=out)
+        return 1
+    client.shutdown()
+    return 0
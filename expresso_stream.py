@@ -0,0 +1,242 @@
+# Purpose: Streaming, declaration-at-a-time parsing of very large Expresso sources
+#
+# iter_declarations() yields the top-level AST nodes of a source one by one.
+# Characters are read from a file in chunks and tokens are pulled from the
+# lexer on demand, and both are discarded once the parser no longer needs them.
+# Each declaration's parse-tree subtree is detached from the program context
+# as soon as ExpressoListener has built its AST node. Peak memory is therefore
+# bounded by the largest single declaration rather than by the size of the file.
+
+import io
+
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.Token import Token
+from antlr4.error.Errors import IllegalStateException, RecognitionException, UnsupportedOperationException
+
+from ExpressoLexer import ExpressoLexer
+from ExpressoParser import ExpressoParser
+from expresso_listener import ExpressoListener
+from expresso_walker import IterativeParseTreeWalker
+
+
+# A CharStream over a text file that only keeps the characters still reachable
+# through a mark (or the current position) in memory
+class UnbufferedCharStream:
+
+    def __init__(self, stream, chunk_size=1 << 16, name='<unknown>'):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.name = name
+        self.data = ''
+        self.data_start = 0      # absolute index of data[0]
+        self._index = 0
+        self.markers = 0
+        self.marked_index = 0    # lowest index reachable through a mark
+        self.exhausted = False
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def size(self):
+        raise UnsupportedOperationException("Unbuffered stream cannot know its size")
+
+    def _fill(self, index):
+        while not self.exhausted and index >= self.data_start + len(self.data):
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                self.exhausted = True
+                break
+            keep = (self.marked_index if self.markers else self._index) - self.data_start
+            self.data = self.data[keep:] + chunk
+            self.data_start += keep
+
+    def LA(self, offset):
+        if offset == 0:
+            return 0
+        index = self._index + offset - 1 if offset > 0 else self._index + offset
+        if index < self.data_start:
+            raise IllegalStateException("cannot look back before the buffer")
+        self._fill(index)
+        if index >= self.data_start + len(self.data):
+            return Token.EOF
+        return ord(self.data[index - self.data_start])
+
+    def LT(self, offset):
+        return self.LA(offset)
+
+    def consume(self):
+        if self.LA(1) == Token.EOF:
+            raise IllegalStateException("cannot consume EOF")
+        self._index += 1
+
+    def mark(self):
+        if self.markers == 0:
+            self.marked_index = self._index
+        self.markers += 1
+        return -self.markers
+
+    def release(self, marker):
+        self.markers -= 1
+
+    def seek(self, index):
+        if index < self.data_start:
+            raise IllegalStateException(f"cannot seek to index {index} before the buffer")
+        self._index = index
+
+    def getText(self, start, stop):
+        if start < self.data_start:
+            raise IllegalStateException("text is no longer buffered")
+        self._fill(stop)
+        return self.data[start - self.data_start:stop - self.data_start + 1]
+
+
+# A TokenStream that pulls tokens from its source on demand and only keeps the
+# tokens still reachable through a mark (or the current position) in memory
+class UnbufferedTokenStream:
+
+    def __init__(self, tokenSource):
+        self.tokenSource = tokenSource
+        self.tokens = []
+        self.tokens_start = 0    # absolute index of tokens[0]
+        self._index = 0
+        self.markers = 0
+        self.marked_index = 0
+        self.last_token = None   # LT(-1), kept even after it leaves the buffer
+        self.fetched_eof = False
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def size(self):
+        raise UnsupportedOperationException("Unbuffered stream cannot know its size")
+
+    @property
+    def sourceName(self):
+        return self.tokenSource.sourceName
+
+    def _fill(self, index):
+        while not self.fetched_eof and index >= self.tokens_start + len(self.tokens):
+            token = self.tokenSource.nextToken()
+            token.tokenIndex = self.tokens_start + len(self.tokens)
+            self.tokens.append(token)
+            self.fetched_eof = token.type == Token.EOF
+
+    def get(self, index):
+        if index < self.tokens_start:
+            raise IllegalStateException(f"token {index} is no longer buffered")
+        self._fill(index)
+        return self.tokens[min(index - self.tokens_start, len(self.tokens) - 1)]
+
+    def LT(self, offset):
+        if offset == 0:
+            return None
+        if offset < 0:
+            if offset == -1 and self._index - 1 < self.tokens_start:
+                return self.last_token
+            return self.get(self._index + offset)
+        return self.get(self._index + offset - 1)
+
+    def LA(self, offset):
+        return self.LT(offset).type
+
+    def consume(self):
+        token = self.LT(1)
+        if token.type == Token.EOF:
+            raise IllegalStateException("cannot consume EOF")
+        self.last_token = token
+        self._index += 1
+        # Drop the tokens nothing can seek back to any more
+        if self.markers == 0 and self._index - self.tokens_start >= 64:
+            del self.tokens[:self._index - self.tokens_start]
+            self.tokens_start = self._index
+
+    def mark(self):
+        if self.markers == 0:
+            self.marked_index = self._index
+        self.markers += 1
+        return -self.markers
+
+    def release(self, marker):
+        self.markers -= 1
+
+    def seek(self, index):
+        if index < self.tokens_start:
+            raise IllegalStateException(f"cannot seek to token {index} before the buffer")
+        self._index = index
+
+    def getText(self, start=None, stop=None):
+        if isinstance(start, Token):
+            start = start.tokenIndex
+        if isinstance(stop, Token):
+            stop = stop.tokenIndex
+        start = max(start if start is not None else 0, self.tokens_start)
+        stop = stop if stop is not None else self.tokens_start + len(self.tokens) - 1
+        return ''.join(token.text for token in self.tokens[start - self.tokens_start:stop - self.tokens_start + 1]
+                       if token.type != Token.EOF)
+
+
+# Yield the top-level AST nodes of an Expresso source read from a text stream.
+#
+# This drives the loop of ExpressoParser.program() itself, one declaration at a
+# time. The loop's ATN states, decision and rule alternatives are read from the
+# ATN rather than copied from the generated code.
+def iter_declarations(stream, chunk_size=1 << 16):
+    lexer = ExpressoLexer(UnbufferedCharStream(stream, chunk_size))
+    lexer._factory = CommonTokenFactory(copyText=True)   # token text must outlive the char buffer
+    tokens = UnbufferedTokenStream(lexer)
+    parser = ExpressoParser(tokens)
+
+    atn = parser.atn
+    loop_entry = atn.ruleToStartState[ExpressoParser.RULE_program].transitions[0].target
+    block = loop_entry.transitions[0].target
+    alternatives = []
+    for transition in block.transitions:
+        call_state = transition.target
+        rule_name = parser.ruleNames[call_state.transitions[0].ruleIndex]
+        rule = getattr(parser, rule_name, None) or getattr(parser, rule_name + '_')
+        alternatives.append((call_state.stateNumber, rule))
+    first_tokens = atn.nextTokens(block)
+
+    listener = ExpressoListener()
+    walker = IterativeParseTreeWalker.DEFAULT
+    program_ctx = ExpressoParser.ProgramContext(parser, parser._ctx, parser.state)
+    parser.enterRule(program_ctx, 0, ExpressoParser.RULE_program)
+    listener.enterProgram(program_ctx)
+    body = listener.stack[0].body
+    try:
+        parser.enterOuterAlt(program_ctx, 1)
+        parser.state = loop_entry.stateNumber
+        parser._errHandler.sync(parser)
+        while tokens.LA(1) in first_tokens:
+            parser.state = block.stateNumber
+            parser._errHandler.sync(parser)
+            alt = parser._interp.adaptivePredict(tokens, block.decision, program_ctx)
+            call_state, rule = alternatives[alt - 1]
+            parser.state = call_state
+            subtree = rule()
+            walker.walk(listener, subtree)
+            program_ctx.removeLastChild()
+            yield body.pop()
+            parser.state = loop_entry.loopBackState.stateNumber
+            parser._errHandler.sync(parser)
+    except RecognitionException as re:
+        program_ctx.exception = re
+        parser._errHandler.reportError(parser, re)
+        parser._errHandler.recover(parser, re)
+    finally:
+        parser.exitRule()
+
+
+# Yield the top-level AST nodes of an Expresso source text
+def iter_source_declarations(source, chunk_size=1 << 16):
+    return iter_declarations(io.StringIO(source), chunk_size)
+
+
+# Yield the top-level AST nodes of an Expresso file, reading it in chunks
+def iter_file_declarations(path, chunk_size=1 << 16):
+    with open(path, encoding='utf-8') as f:
+        yield from iter_declarations(f, chunk_size)
@@ -0,0 +1,158 @@
+# Purpose: Columnar NumPy node table for whole-program AST queries
+#
+# A NodeTable lays the nodes of a Program out as rows, in pre-order, with one
+# NumPy array per column:
+#
+#     kind          index of the node class in expresso_binary.KINDS
+#     parent        row of the parent node, -1 for the root
+#     first_child   row of the first child, -1 for leaves
+#     next_sibling  row of the next child of the same parent, -1 for the last
+#     end           one past the last row of the node's subtree
+#     start, stop   source span in characters (stop excluded), -1 when unknown
+#     name          id in names of the node's identifier, -1 for none
+#
+# The identifier of a declaration or method call is its name; that of a Factor
+# is the identifier it refers to. Since rows are in pre-order, the subtree of
+# row r is rows r .. end[r] - 1, so "inside" queries and counts are a handful of
+# array operations rather than a walk over millions of Python objects.
+# node(row) maps a row back to its ast_nodes object.
+#
+# NumPy is an optional dependency: it is only needed to build a NodeTable.
+
+from ast_nodes import ASTNode, node_layout
+from expresso_binary import KINDS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_KIND_INDEX = {cls: kind for kind, cls in enumerate(KINDS)}
+
+
+# The identifier of a node, or None
+def node_name(node):
+    name = getattr(node, 'name', None)
+    if isinstance(name, str):
+        return name
+    value = getattr(node, 'value', None)
+    return value if isinstance(value, str) else None
+
+
+class NodeTable:
+
+    # spans, if given, maps id(node) to (start, stop) offsets, as parse_spans returns
+    def __init__(self, program, spans=None):
+        if np is None:
+            raise ImportError("NodeTable needs NumPy (pip install numpy)")
+        self.objects = []
+        self.names = []
+        self.name_ids = {}
+        kinds = []
+        parents = []
+        first_children = []
+        next_siblings = []
+        ends = []
+        starts = []
+        stops = []
+        names = []
+        # Row of the last child seen so far of every row
+        last_child = []
+
+        # Entries are (value, parent row); an int entry closes the subtree of that row
+        stack = [(program, -1)]
+        while stack:
+            entry = stack.pop()
+            if entry.__class__ is int:
+                ends[entry] = len(self.objects)
+                continue
+            value, parent = entry
+            if isinstance(value, ASTNode):
+                cls, fields = node_layout(type(value))
+                row = len(self.objects)
+                self.objects.append(value)
+                kinds.append(_KIND_INDEX[cls])
+                parents.append(parent)
+                first_children.append(-1)
+                next_siblings.append(-1)
+                ends.append(row + 1)
+                last_child.append(-1)
+                if parent >= 0:
+                    if last_child[parent] < 0:
+                        first_children[parent] = row
+                    else:
+                        next_siblings[last_child[parent]] = row
+                    last_child[parent] = row
+                span = spans.get(id(value)) if spans is not None else None
+                starts.append(span[0] if span is not None else -1)
+                stops.append(span[1] if span is not None else -1)
+                names.append(self._name_id(node_name(value)))
+                stack.append(row)
+                stack.extend((getattr(value, field), row) for field in reversed(fields))
+            elif isinstance(value, (list, tuple)):
+                stack.extend((item, parent) for item in reversed(value))
+
+        self.kind = np.array(kinds, dtype=np.int16)
+        self.parent = np.array(parents, dtype=np.int32)
+        self.first_child = np.array(first_children, dtype=np.int32)
+        self.next_sibling = np.array(next_siblings, dtype=np.int32)
+        self.end = np.array(ends, dtype=np.int32)
+        self.start = np.array(starts, dtype=np.int32)
+        self.stop = np.array(stops, dtype=np.int32)
+        self.name = np.array(names, dtype=np.int32)
+
+    def _name_id(self, name):
+        if name is None:
+            return -1
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def __len__(self):
+        return len(self.objects)
+
+    # The ast_nodes object of a row
+    def node(self, row):
+        return self.objects[row]
+
+    # Rows of the nodes of class cls (all nodes when None) with identifier name
+    # (any, when None), in pre-order
+    def rows(self, cls=None, name=None):
+        mask = np.ones(len(self), dtype=bool)
+        if cls is not None:
+            mask &= self.kind == _KIND_INDEX[cls]
+        if name is not None:
+            name_id = self.name_ids.get(name)
+            if name_id is None:
+                return np.zeros(0, dtype=np.int64)
+            mask &= self.name == name_id
+        return np.flatnonzero(mask)
+
+    # Mask of the rows strictly inside the subtree of any of ancestors
+    def inside_mask(self, ancestors):
+        ancestors = np.asarray(ancestors, dtype=np.int64)
+        depth = np.zeros(len(self) + 1, dtype=np.int32)
+        np.add.at(depth, ancestors + 1, 1)
+        np.add.at(depth, self.end[ancestors], -1)
+        return np.cumsum(depth[:-1]) > 0
+
+    # The rows that lie strictly inside the subtree of any of ancestors
+    def inside(self, rows, ancestors):
+        rows = np.asarray(rows, dtype=np.int64)
+        return rows[self.inside_mask(ancestors)[rows]]
+
+    # Rows of the direct children of row
+    def children(self, row):
+        children = []
+        child = self.first_child[row]
+        while child >= 0:
+            children.append(int(child))
+            child = self.next_sibling[child]
+        return children
+
+    # Number of nodes of every class that occurs, by class name
+    def counts(self):
+        counts = np.bincount(self.kind, minlength=len(KINDS))
+        return {KINDS[kind].__name__: int(count) for kind, count in enumerate(counts) if count}
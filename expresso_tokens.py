@@ -0,0 +1,177 @@
+# Purpose: Compact array-backed token stream for ExpressoParser
+#
+# A CommonTokenStream keeps one CommonToken per token, with its own text string
+# and boxed offsets: a couple of hundred bytes each. ArrayTokenStream keeps the
+# tokens of a source in parallel array('i') columns instead, about 20 bytes a
+# token, and the parser's lookahead reads the type column directly. Token
+# objects are only made when the parser asks for one (to put in the parse tree,
+# or to report an error), and then as a TokenView: two slots that read their
+# fields from the columns and slice their text from the source on demand.
+
+from array import array
+from itertools import islice
+
+from antlr4.Token import Token
+from antlr4.error.Errors import IllegalStateException
+
+from expresso_regex_lexer import RegexLexer
+
+
+# A token of an ArrayTokenStream, read from its columns when a field is accessed
+class TokenView:
+    __slots__ = ('stream', 'tokenIndex')
+
+    channel = Token.DEFAULT_CHANNEL
+
+    def __init__(self, stream, tokenIndex):
+        self.stream = stream
+        self.tokenIndex = tokenIndex
+
+    @property
+    def type(self):
+        return self.stream.types[self.tokenIndex]
+
+    @property
+    def start(self):
+        return self.stream.starts[self.tokenIndex]
+
+    @property
+    def stop(self):
+        return self.stream.stops[self.tokenIndex]
+
+    @property
+    def line(self):
+        return self.stream.lines[self.tokenIndex]
+
+    @property
+    def column(self):
+        return self.stream.columns[self.tokenIndex]
+
+    @property
+    def text(self):
+        return self.stream.text(self.tokenIndex)
+
+    @property
+    def source(self):
+        return self.stream.tokenSource._source_pair
+
+    def getTokenSource(self):
+        return self.stream.tokenSource
+
+    def getInputStream(self):
+        return None
+
+    def __str__(self):
+        text = self.text.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+        return f"[@{self.tokenIndex},{self.start}:{self.stop}='{text}',<{self.type}>,{self.line}:{self.column}]"
+
+
+# A TokenStream over the whole of a source, lexed up front by RegexLexer into
+# parallel columns of token type, start and stop offsets, line and column
+class ArrayTokenStream:
+
+    # Lexing errors go to error_listener if given, and to the console otherwise.
+    # With max_tokens, lexing stops as soon as the source turns out to hold more
+    # tokens than that, raising expresso_limits.TokenBudgetExceeded, so that an
+    # oversized source is rejected before it is lexed in full.
+    def __init__(self, source, name='<unknown>', error_listener=None, max_tokens=None):
+        self.source = source
+        self.tokenSource = RegexLexer(source, name)
+        if error_listener is not None:
+            self.tokenSource.removeErrorListeners()
+            self.tokenSource.addErrorListener(error_listener)
+        self.types = array('i')
+        self.starts = array('i')
+        self.stops = array('i')
+        self.lines = array('i')
+        self.columns = array('i')
+        self._index = 0
+        self._fill(max_tokens)
+
+    def _fill(self, max_tokens=None):
+        append_type = self.types.append
+        append_start = self.starts.append
+        append_stop = self.stops.append
+        append_line = self.lines.append
+        append_column = self.columns.append
+        tokens = self.tokenSource.scan()
+        if max_tokens is not None:
+            # EOF sits at index max_tokens at the latest
+            tokens = islice(tokens, max_tokens + 1)
+        for token_type, start, stop, line, column in tokens:
+            append_type(token_type)
+            append_start(start)
+            append_stop(stop)
+            append_line(line)
+            append_column(column)
+            if token_type == Token.EOF:
+                break
+        else:
+            if max_tokens is not None:
+                from expresso_limits import TokenBudgetExceeded
+                raise TokenBudgetExceeded(f"token budget of {max_tokens} exceeded", len(self.types))
+
+    @property
+    def index(self):
+        return self._index
+
+    # Number of tokens, EOF included
+    @property
+    def size(self):
+        return len(self.types)
+
+    def getSourceName(self):
+        return self.tokenSource.getSourceName()
+
+    # Text of the token at index, sliced from the source
+    def text(self, index):
+        if self.types[index] == Token.EOF:
+            return '<EOF>'
+        return self.source[self.starts[index]:self.stops[index] + 1]
+
+    def get(self, index):
+        return TokenView(self, index)
+
+    def LA(self, i):
+        if i < 0:
+            i += 1
+        index = self._index + i - 1
+        if index < 0:
+            return Token.INVALID_TYPE
+        return self.types[min(index, len(self.types) - 1)]
+
+    def LT(self, k):
+        if k == 0:
+            return None
+        if k < 0:
+            index = self._index + k
+            return TokenView(self, index) if index >= 0 else None
+        return TokenView(self, min(self._index + k - 1, len(self.types) - 1))
+
+    def consume(self):
+        if self.types[self._index] == Token.EOF:
+            raise IllegalStateException("cannot consume EOF")
+        self._index += 1
+
+    # The whole source is lexed up front, so marks need no bookkeeping
+    def mark(self):
+        return 0
+
+    def release(self, marker):
+        pass
+
+    def reset(self):
+        self._index = 0
+
+    def seek(self, index):
+        self._index = min(index, len(self.types) - 1)
+
+    # Text of the tokens from start to stop (indexes or tokens), EOF excluded
+    def getText(self, start=None, stop=None):
+        if start is not None and not isinstance(start, int):
+            start = start.tokenIndex
+        if stop is not None and not isinstance(stop, int):
+            stop = stop.tokenIndex
+        start = 0 if start is None or start < 0 else start
+        stop = len(self.types) - 1 if stop is None else min(stop, len(self.types) - 1)
+        return ''.join(self.text(i) for i in range(start, stop + 1) if self.types[i] != Token.EOF)
@@ -0,0 +1,74 @@
+# Purpose: Syntax-only validation of Expresso source
+#
+# validate() accepts or rejects a source without building a parse tree or an
+# AST: ExpressoParser runs with buildParseTrees off and no listeners, so all it
+# allocates are the rule contexts it passes through. As in parse_tree, a fast
+# SLL pass that bails out on the first error runs first; only a source that
+# fails it is parsed again with full LL and the default error recovery, to
+# collect every error in one pass. Errors come back as a list of SyntaxIssues,
+# in source order, instead of being printed to the console.
+#
+# Unlike parse_program, a source is only valid if the program covers all of it:
+# tokens left over after the last declaration are reported as an error.
+
+from antlr4.Token import Token
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+
+from ExpressoParser import ExpressoParser
+from expresso_parse import KIND_LEXER, KIND_PARSER, SyntaxIssue
+from expresso_tokens import ArrayTokenStream
+
+
+# Error listener that keeps what it is told as SyntaxIssues
+class IssueCollector(ErrorListener):
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.issues = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        if offendingSymbol is not None:
+            offset = offendingSymbol.start
+        elif e is not None and getattr(e, 'startIndex', None) is not None:
+            offset = e.startIndex
+        else:
+            offset = -1
+        self.issues.append(SyntaxIssue(line, column, offset, msg, self.kind))
+
+
+# Validate the tokens of token_stream, which must be at its start
+def validate_token_stream(token_stream):
+    parser = ExpressoParser(token_stream)
+    parser.buildParseTrees = False
+    parser.removeErrorListeners()
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    issues = []
+    try:
+        parser.program()
+    except ParseCancellationException:
+        collector = IssueCollector(KIND_PARSER)
+        parser.reset()
+        parser._interp.predictionMode = PredictionMode.LL
+        parser._errHandler = DefaultErrorStrategy()
+        parser.addErrorListener(collector)
+        parser.program()
+        issues = collector.issues
+    token = token_stream.LT(1)
+    if token.type != Token.EOF:
+        issues.append(SyntaxIssue(token.line, token.column, token.start,
+                                  f"extraneous input '{token.text}' expecting <EOF>", KIND_PARSER))
+    return issues
+
+
+# Validate source, returning its syntax errors, lexing and parsing ones alike,
+# in source order. An empty list means the source is valid.
+def validate(source, name='<unknown>'):
+    collector = IssueCollector(KIND_LEXER)
+    issues = validate_token_stream(ArrayTokenStream(source, name, error_listener=collector))
+    issues.extend(collector.issues)
+    issues.sort(key=lambda issue: (issue.line, issue.column))
+    return issues
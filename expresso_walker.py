@@ -0,0 +1,41 @@
+# Purpose: Explicit-stack parse tree walker for the Expresso listeners
+#
+# ANTLR's ParseTreeWalker recurses once per level of the parse tree, so deeply
+# nested input exhausts the recursion limit while the AST is being built.
+# IterativeParseTreeWalker sends the same events in the same order, keeping the
+# nodes still to be visited and exited on a stack of its own instead.
+
+from antlr4.tree.Tree import ErrorNode, ParseTreeWalker, TerminalNode
+
+
+class IterativeParseTreeWalker(ParseTreeWalker):
+
+    # The enterRule/exitRule steps are inlined rather than called per node
+    def walk(self, listener, t):
+        enter_every_rule = listener.enterEveryRule
+        exit_every_rule = listener.exitEveryRule
+        # Rule nodes to exit are pushed as (node,) so they can be told from nodes to visit
+        stack = [t]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            node = pop()
+            if node.__class__ is tuple:
+                ctx = node[0]
+                ctx.exitRule(listener)
+                exit_every_rule(ctx)
+            elif isinstance(node, TerminalNode):
+                if isinstance(node, ErrorNode):
+                    listener.visitErrorNode(node)
+                else:
+                    listener.visitTerminal(node)
+            else:
+                enter_every_rule(node)
+                node.enterRule(listener)
+                push((node,))
+                children = node.children
+                if children:
+                    stack.extend(reversed(children))
+
+
+IterativeParseTreeWalker.DEFAULT = IterativeParseTreeWalker()
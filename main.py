@@ -1,23 +1,88 @@
-from antlr4 import InputStream, CommonTokenStream, ParseTreeWalker
-from ExpressoLexer import ExpressoLexer
-from ExpressoParser import ExpressoParser
-from expresso_listener import ExpressoListener
+import argparse
+import sys
 
-def main():
-    input_str = "type Example { method test() { } }"
-    input_stream = InputStream(input_str)
-    lexer = ExpressoLexer(input_stream)
-    token_stream = CommonTokenStream(lexer)
-    parser = ExpressoParser(token_stream)
-    tree = parser.program()
+from expresso_build import build_command, FRONTEND_ANTLR, FRONTEND_NATIVE
+
+def run_example():
+    from expresso_dfa_cache import load_dfa_cache, save_dfa_cache, dfa_state_count
+    from expresso_parse import parse_program
+
+    # Start from the DFA states learned by earlier runs, and keep any new ones
+    known_states = load_dfa_cache()
 
-    listener = ExpressoListener()
-    walker = ParseTreeWalker()
-    walker.walk(listener, tree)
+    input_str = "type Example { method test() { } }"
+    result = parse_program(input_str)
 
     # Process the result, e.g., print the AST, execute the code, etc.
-    program = listener.stack[0]  # Get the root Program node
+    program = result.program  # Get the root Program node
     # ... (do something with the generated AST)
 
+    if dfa_state_count() > known_states:
+        save_dfa_cache()
+
+# Print every syntax error of files as path:line:column: message, asking the
+# `expresso serve` daemon when one is running and checking in process otherwise
+def check_command(files, socket_path=None):
+    from expresso_serve import ParseClient
+    failed = False
+    with ParseClient(socket_path) as client:
+        for path in files:
+            with open(path, encoding='utf-8') as f:
+                issues = client.check(f.read())
+            for line, column, _, msg, _ in issues:
+                print(f"{path}:{line}:{column}: {msg}")
+            failed = failed or bool(issues)
+    return 1 if failed else 0
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='expresso')
+    subparsers = arg_parser.add_subparsers(dest='command')
+
+    build_parser = subparsers.add_parser('build', help='parse every .xprs file under a directory')
+    build_parser.add_argument('directory')
+    build_parser.add_argument('-j', '--jobs', type=int, default=None, help='number of worker processes')
+    build_parser.add_argument('--frontend', choices=[FRONTEND_ANTLR, FRONTEND_NATIVE], default=FRONTEND_ANTLR)
+    build_parser.add_argument('--no-cache', action='store_true', help='parse every file, ignoring the AST cache')
+    build_parser.add_argument('--cache-dir', default=None, help='directory of the AST cache')
+    build_parser.add_argument('--profile-parse', action='store_true',
+                              help='parse in this process with per-rule and per-decision profiling, and report it')
+    build_parser.add_argument('--profile-json', default=None, help='also write the profile to this JSON file')
+
+    check_parser = subparsers.add_parser('check', help='report the syntax errors of .xprs files without building ASTs')
+    check_parser.add_argument('files', nargs='+')
+    check_parser.add_argument('--socket', default=None, help='socket of the daemon to ask')
+
+    serve_parser = subparsers.add_parser('serve', help='keep a warm parser running, answering on a Unix socket')
+    serve_parser.add_argument('--socket', default=None, help='socket to serve on')
+    serve_parser.add_argument('--no-cache', action='store_true', help='keep parsed ASTs in memory only')
+    serve_parser.add_argument('--cache-dir', default=None, help='directory of the AST cache')
+    serve_parser.add_argument('--stop', action='store_true', help='stop the daemon serving on the socket')
+
+    args = arg_parser.parse_args(argv)
+    if args.command == 'build' and args.profile_parse:
+        if args.frontend != FRONTEND_ANTLR:
+            arg_parser.error('--profile-parse profiles the ANTLR front-end')
+        from expresso_profile import profile_command
+        return profile_command(args.directory, args.profile_json)
+    if args.command == 'build':
+        cache = None
+        if not args.no_cache:
+            from expresso_ast_cache import ASTCache
+            cache = ASTCache(args.cache_dir)
+        return build_command(args.directory, args.jobs, args.frontend, cache=cache)
+    if args.command == 'check':
+        return check_command(args.files, args.socket)
+    if args.command == 'serve':
+        from expresso_serve import serve_command, stop_command
+        if args.stop:
+            return stop_command(args.socket)
+        cache = None
+        if not args.no_cache:
+            from expresso_ast_cache import ASTCache
+            cache = ASTCache(args.cache_dir)
+        return serve_command(args.socket, cache)
+    run_example()
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
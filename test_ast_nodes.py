@@ -0,0 +1,58 @@
+import pickle
+import unittest
+from ast_nodes import *
+
+class TestASTNodes(unittest.TestCase):
+
+    def test_nodes_have_no_instance_dict(self):
+        node = Statement(Expression(Term(Factor(MethodCall('foo')))))
+        for value in (node, node.body, node.body.term, node.body.term.factor, node.body.term.factor.value):
+            self.assertFalse(hasattr(value, '__dict__'), type(value).__name__)
+
+    def test_empty_ops_and_args_share_the_empty_tuple(self):
+        self.assertIs(Expression(Term(Factor(1))).ops, Expression(Term(Factor(2)), []).ops)
+        self.assertIs(Term(Factor(1)).ops, ())
+        self.assertIs(MethodCall('foo', []).args, ())
+
+    def test_equality_ignores_list_or_tuple(self):
+        ops = [('+', Term(Factor(2)))]
+        self.assertEqual(Expression(Term(Factor(1)), ops), Expression(Term(Factor(1)), tuple(ops)))
+        self.assertNotEqual(Expression(Term(Factor(1)), ops), Expression(Term(Factor(1))))
+
+    def test_equal_nodes_hash_equal(self):
+        def program():
+            return Program([VariableDeclaration('int', 'x', Expression(Term(Factor(1), [('*', Factor('y'))]))),
+                            Statement(MethodCall('f', [Factor(2), Factor(Placeholder())]))])
+        self.assertEqual(hash(program()), hash(program()))
+        self.assertEqual({program(): 'x'}[program()], 'x')
+        self.assertNotEqual(hash(Factor(1)), hash(Factor(2)))
+        self.assertNotEqual(hash(Factor([1])), hash(Factor((1,))))
+
+    def test_pickle_round_trip(self):
+        program = Program([VariableDeclaration('int', 'x', Expression(Term(Factor(1), [('*', Factor('y'))])))])
+        self.assertEqual(pickle.loads(pickle.dumps(program)), program)
+
+    def test_deep_trees(self):
+        def chain(depth):
+            node = Factor(1)
+            for _ in range(depth):
+                node = Factor(Expression(Term(node)))
+            return node
+        a, b = chain(100000), chain(100000)
+        self.assertEqual(a, b)
+        self.assertTrue(nodes_equal(a, b))
+        self.assertNotEqual(a, chain(99999))
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(hash(a), node_hash(b))
+        text = repr(a)
+        self.assertTrue(text.startswith('Factor(value=Expression(term=Term(factor=Factor(value='))
+        self.assertEqual(text, node_repr(a))
+
+    def test_node_repr_matches_repr(self):
+        node = Program([VariableDeclaration('int', 'x', Expression(Term(Factor(1), [('*', Factor('y'))]), [('+', Term(Factor(MethodCall('f', [Factor(2)]))))])),
+                        Statement(Or(And(Factor('a'), Relational(Factor(1), '<', Factor(2))), Equality(Factor('b'), '==', Factor(())))),
+                        Params([('int', 'a')])])
+        self.assertEqual(node_repr(node), repr(node))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -258,6 +258,31 @@ class TestExpresso(unittest.TestCase):
 
         self.assertEqual(parse_expresso_code(code).body, expected_ast)
 
+    def test_logic_arguments(self):
+        code = "foo(a < b, a == b + 1 and c or d);"
+        relational = Relational(Expression(Term(Factor('a'))), '<', Expression(Term(Factor('b'))))
+        equality = Equality(Expression(Term(Factor('a'))), '==',
+                            Expression(Term(Factor('b')), [('+', Term(Factor(1)))]))
+        logic = Or(And(equality, Expression(Term(Factor('c')))), Expression(Term(Factor('d'))))
+        call = MethodCall('foo', [Logic(relational), Logic(logic)])
+        self.assertEqual(parse_expresso_code(code).body, [Statement(Expression(Term(Factor(call))))])
+
+    def test_operator_chains_are_left_associative(self):
+        code = "foo(a < b <= c); 1 - 2 + 3;"
+        a, b, c = (Expression(Term(Factor(name))) for name in 'abc')
+        call = MethodCall('foo', [Logic(Relational(Relational(a, '<', b), '<=', c))])
+        expected_ast = [
+            Statement(Expression(Term(Factor(call)))),
+            Statement(Expression(Term(Factor(1)), [('-', Term(Factor(2))), ('+', Term(Factor(3)))])),
+        ]
+        self.assertEqual(parse_expresso_code(code).body, expected_ast)
+
+    def test_long_operator_chain(self):
+        code = " + ".join(f"a{i}" for i in range(2000)) + ";"
+        expression = parse_expresso_code(code).body[0].body
+        self.assertEqual(len(expression.ops), 1999)
+        self.assertEqual(expression.ops[-1], ('+', Term(Factor('a1999'))))
+
 # Add more test cases for other language features
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ast_nodes import *
+import expresso_ast_cache
+from expresso_ast_cache import ASTCache, cached_parse
+from expresso_build import build, FRONTEND_NATIVE
+from expresso_native import parse_native
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a) {
+        foo(a, 0) + 2 * a;
+    }
+}
+int globalVar = 0;
+"""
+
+class TestASTCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.cache = ASTCache(os.path.join(self.root, 'cache'))
+
+    def entries(self):
+        return [name for _, _, files in os.walk(self.cache.cache_dir) for name in files]
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.load(CODE, 'native'))
+        self.cache.store(CODE, 'native', parse_native(CODE))
+        self.assertEqual(self.cache.load(CODE, 'native'), parse_native(CODE))
+        self.assertIsNone(self.cache.load(CODE + ' ', 'native'))
+        self.assertIsNone(self.cache.load(CODE, 'antlr'))
+        self.assertEqual(len(self.entries()), 1)
+        self.assertTrue(self.entries()[0].endswith('.xprsc'))
+
+    def test_cached_parse_parses_once(self):
+        parse = mock.Mock(side_effect=parse_native)
+        first = cached_parse(CODE, parse, 'native', self.cache)
+        second = cached_parse(CODE, parse, 'native', self.cache)
+        self.assertEqual(second, first)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_parser_changes_invalidate_entries(self):
+        self.cache.store(CODE, 'native', parse_native(CODE))
+        with mock.patch.object(expresso_ast_cache, '_fingerprint', b'\0' * 32):
+            self.assertIsNone(self.cache.load(CODE, 'native'))
+        self.assertIsNotNone(self.cache.load(CODE, 'native'))
+
+    def test_damaged_entries_count_as_missing(self):
+        key = self.cache.key(CODE, 'native')
+        self.cache.store(CODE, 'native', parse_native(CODE))
+        path = self.cache.path(key)
+        with open(path, 'rb') as f:
+            data = f.read()
+        for damaged in (data[:10], data[:-10], b'XPRSC\x00' + data[6:]):
+            with open(path, 'wb') as f:
+                f.write(damaged)
+            self.assertIsNone(self.cache.load(CODE, 'native'))
+
+    def test_damaged_bodies_are_deleted(self):
+        key = self.cache.key(CODE, 'native')
+        path = self.cache.path(key)
+        for damage in (lambda data: data[:-10], lambda data: data[:-1] + bytes([data[-1] ^ 1])):
+            self.cache.store(CODE, 'native', parse_native(CODE))
+            with open(path, 'rb') as f:
+                data = f.read()
+            with open(path, 'wb') as f:
+                f.write(damage(data))
+            self.assertIsNone(self.cache.load_payload(key))
+            self.assertFalse(os.path.exists(path))
+
+    def test_fingerprint_covers_the_parse_entry_points(self):
+        for name in ('expresso_parse.py', 'ast_nodes.py'):
+            self.assertIn(name, expresso_ast_cache.FINGERPRINT_FILES)
+
+    def test_build_loads_unchanged_sources(self):
+        sources = os.path.join(self.root, 'src')
+        os.makedirs(sources)
+        for name, text in (('a.xprs', "int globalVar = 0;"), ('b.xprs', "type Example;")):
+            with open(os.path.join(sources, name), 'w') as f:
+                f.write(text)
+        first = build(sources, workers=1, frontend=FRONTEND_NATIVE, cache=self.cache)
+        self.assertEqual([result.cached for result in first], [False, False])
+        self.assertEqual(len(self.entries()), 2)
+
+        with open(os.path.join(sources, 'b.xprs'), 'w') as f:
+            f.write("type Changed;")
+        second = build(sources, workers=1, frontend=FRONTEND_NATIVE, cache=self.cache)
+        self.assertEqual([result.cached for result in second], [True, False])
+        self.assertEqual(second[0].program, first[0].program)
+        self.assertEqual(second[1].program, Program([TypeDeclaration('Changed', None)]))
+        self.assertFalse([name for name in self.entries() if name.endswith('.tmp')])
+
+    def test_fingerprint_covers_the_binary_encoding(self):
+        self.assertIn('expresso_binary.py', expresso_ast_cache.FINGERPRINT_FILES)
+
+    def test_build_does_not_cache_broken_sources(self):
+        sources = os.path.join(self.root, 'src')
+        os.makedirs(sources)
+        for name, text in (('a.xprs', "int globalVar = 0;"), ('broken.xprs', "int x = 1")):
+            with open(os.path.join(sources, name), 'w') as f:
+                f.write(text)
+        for _ in range(2):
+            results = build(sources, workers=1, cache=self.cache)
+            self.assertIsNone(results[0].error)
+            self.assertTrue(results[1].error.startswith('ParseSyntaxError: '))
+            self.assertFalse(results[1].cached)
+            self.assertEqual(len(self.entries()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
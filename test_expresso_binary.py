@@ -0,0 +1,91 @@
+import math
+import mmap
+import pickle
+import tempfile
+import unittest
+from ast_nodes import *
+from expresso_binary import ASTReader, LazyNode, decode, encode
+from expresso_intern import HashConsFactory
+from expresso_native import parse_native
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a, float b) {
+        int total = a + b * (c - 1);
+        foo(total, 2 < 3 and b or a == b) / 3;
+    }
+}
+int globalVar = 0;
+method declared();
+type Empty;
+"""
+
+class TestBinaryFormat(unittest.TestCase):
+
+    def test_round_trip(self):
+        program = parse_native(CODE)
+        self.assertEqual(decode(encode(program)), program)
+
+    def test_scalars_and_containers(self):
+        values = [None, True, False, 0, -1, 2 ** 70, -2 ** 70, 1.5, '', 'é☃', (), [], (1,), [()] * 300,
+                  Placeholder(), Factor(-7)]
+        decoded = decode(encode(values))
+        self.assertEqual(decoded, values)
+        self.assertEqual([type(value) for value in decoded], [type(value) for value in values])
+
+    def test_signed_zeros(self):
+        for values in ([0.0, -0.0], [-0.0, 0.0]):
+            decoded = decode(encode([Factor(value) for value in values]))
+            self.assertEqual([math.copysign(1.0, node.value) for node in decoded],
+                             [math.copysign(1.0, value) for value in values])
+
+    def test_buffers(self):
+        data = encode(parse_native(CODE))
+        for buffer in (bytearray(data), memoryview(b'padding' + data)[7:]):
+            self.assertEqual(decode(buffer), parse_native(CODE))
+        with tempfile.TemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.assertEqual(decode(mapped), parse_native(CODE))
+
+    def test_lazy_nodes(self):
+        program = parse_native(CODE)
+        root = ASTReader(encode(program)).root()
+        self.assertIsInstance(root, LazyNode)
+        self.assertIs(root.kind, Program)
+        example, global_var, declared, empty = root.body
+        self.assertEqual(example.name, 'Example')
+        self.assertEqual(global_var.materialize(), program.body[1])
+        self.assertIsNone(declared.body)
+        self.assertIsNone(empty.body)
+        method = example.body.body[1]
+        self.assertEqual(method.params.materialize(), program.body[0].body.body[1].params)
+        with self.assertRaises(AttributeError):
+            method.value
+
+    def test_deep_tree(self):
+        node = Factor(1)
+        for _ in range(100000):
+            node = Factor(Expression(Term(node)))
+        self.assertEqual(decode(encode(node)), node)
+
+    def test_interned_nodes_encode_as_plain_nodes(self):
+        program = parse_native(CODE)
+        decoded = decode(encode(HashConsFactory().intern(program)))
+        self.assertIs(type(decoded), Program)
+        self.assertEqual(decoded, program)
+
+    def test_smaller_than_pickle(self):
+        program = parse_native(CODE * 10)
+        self.assertLess(len(encode(program)) * 2, len(pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def test_rejects_other_data(self):
+        data = encode(parse_native(CODE))
+        for bad in (b'', b'XAST', b'JUNK' + data[4:], data[:4] + b'\xff' + data[5:], data[:5] + b'\0\0\0\0' + data[9:]):
+            with self.assertRaises((ValueError, IndexError)):
+                decode(bad)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import io
+import os
+import tempfile
+import unittest
+from ast_nodes import *
+from expresso_build import build, build_command, find_sources, FRONTEND_NATIVE
+
+class TestBuild(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        os.makedirs(os.path.join(self.root, 'nested'))
+        self.write('b.xprs', "type Example;")
+        self.write('a.xprs', "int globalVar = 0;")
+        self.write(os.path.join('nested', 'c.xprs'), "method doSomething();")
+        self.write('notes.txt', "not a source")
+
+    def write(self, name, text):
+        with open(os.path.join(self.root, name), 'w') as f:
+            f.write(text)
+
+    def test_find_sources(self):
+        names = [os.path.relpath(path, self.root) for path in find_sources(self.root)]
+        self.assertEqual(names, ['a.xprs', 'b.xprs', os.path.join('nested', 'c.xprs')])
+
+    def test_build(self):
+        results = build(self.root, workers=2)
+        self.assertEqual([result.error for result in results], [None, None, None])
+        self.assertEqual(results[1].program, Program([TypeDeclaration('Example', None)]))
+        self.assertEqual(results[2].program, Program([MethodDeclaration('doSomething', Params([]), None)]))
+
+    def test_build_command_reports_failures(self):
+        self.write('broken.xprs', "type Example {")
+        out = io.StringIO()
+        self.assertEqual(build_command(self.root, workers=2, frontend=FRONTEND_NATIVE, out=out), 1)
+        lines = out.getvalue().splitlines()
+        self.assertIn('broken.xprs  FAILED ExpressoSyntaxError', lines[2])
+        self.assertTrue(lines[-1].startswith('4 files, 1 failed, in '))
+
+    def test_build_fails_on_syntax_errors(self):
+        self.write('broken.xprs', "int x = 1")
+        results = build(self.root, workers=2)
+        self.assertEqual([result.error for result in results[:2]], [None, None])
+        self.assertIsNone(results[2].payload)
+        self.assertEqual(results[2].error, "ParseSyntaxError: line 1:9 missing ';' at '<EOF>'")
+        out = io.StringIO()
+        self.assertEqual(build_command(self.root, workers=2, out=out), 1)
+        self.assertIn('broken.xprs  FAILED ParseSyntaxError', out.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
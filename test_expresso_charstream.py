@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from antlr4 import InputStream
+from ExpressoLexer import ExpressoLexer
+from expresso_charstream import ByteCharStream
+from expresso_parse import parse_char_stream, parse_file, parse_program
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a, float b) {
+        foo(a, 2) / 3;
+    }
+}
+"""
+
+def lex(stream):
+    return [(token.type, token.text, token.line, token.column) for token in ExpressoLexer(stream).getAllTokens()]
+
+class TestByteCharStream(unittest.TestCase):
+
+    def test_ascii_is_lexed_in_place(self):
+        data = CODE.encode('ascii')
+        stream = ByteCharStream(data)
+        self.assertIs(stream.data, data)
+        self.assertEqual(lex(stream), lex(InputStream(CODE)))
+
+    def test_non_ascii_input(self):
+        code = "int café = 1; // ☃\n"
+        stream = ByteCharStream(code.encode('utf-8'))
+        self.assertEqual(stream.size, len(code))
+        self.assertEqual(stream.getText(4, 7), "café")
+        self.assertEqual(lex(stream), lex(InputStream(code)))
+
+    def test_parse_char_stream(self):
+        result = parse_char_stream(ByteCharStream(CODE.encode('ascii')))
+        self.assertEqual(result.program, parse_program(CODE).program)
+
+    def test_parse_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'example.xprs')
+            with open(path, 'w') as f:
+                f.write(CODE)
+            self.assertEqual(parse_file(path).program, parse_program(CODE).program)
+            open(path, 'w').close()
+            self.assertEqual(parse_file(path).program.body, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+from expresso_complexity import (GROWERS, MIN_TOKENS, NESTING_START, Measurement, growth_exponent,
+                                 load_manifest, measure, minimize_unit, save_reproducer)
+from expresso_native import parse_native
+from expresso_validate import validate
+from test_expresso import parse_expresso_code
+
+UNITS = ['a', 'customer(delta - 1, food * gamma) + 727', 'f(a < b and c == d, (e))']
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'perf_corpus')
+
+
+class TestComplexity(unittest.TestCase):
+
+    def test_growth_exponent(self):
+        sizes = [100, 200, 400, 800]
+        self.assertAlmostEqual(growth_exponent(sizes, [size * 1e-6 for size in sizes]), 1.0)
+        self.assertAlmostEqual(growth_exponent(sizes, [size ** 2 * 1e-9 for size in sizes]), 2.0)
+        # One slow size does not make linear growth look quadratic
+        self.assertAlmostEqual(growth_exponent(sizes, [1e-4, 2e-4, 1.2e-3, 8e-4]), 1.0)
+
+    def test_growers_make_valid_programs(self):
+        for grower in GROWERS.values():
+            for unit in UNITS:
+                for size in (1, 2, 5):
+                    with self.subTest(grower=grower.name, unit=unit, size=size):
+                        source = grower.build(unit, size)
+                        self.assertEqual(validate(source), [])
+                        self.assertEqual(parse_native(source), parse_expresso_code(source))
+
+    def test_sizes(self):
+        self.assertEqual(GROWERS['calls'].sizes(10, 3), [NESTING_START, NESTING_START * 2, NESTING_START * 4])
+        sizes = GROWERS['arguments'].sizes(5, 3)
+        self.assertEqual(sizes[0], MIN_TOKENS // 5)
+        self.assertEqual(sizes[2], sizes[0] * 4)
+
+    def test_measure(self):
+        measurement = measure(GROWERS['program'], 'a', steps=3, repeat=1)
+        self.assertEqual(len(measurement.tokens), 3)
+        self.assertEqual(measurement.tokens[1], measurement.tokens[0] * 2)
+        self.assertEqual(len(measurement.parse_seconds), 3)
+
+    def test_minimize_unit(self):
+        grower = GROWERS['arguments']
+        small = minimize_unit(grower, 'customer(delta - gamma, 1) + 727', lambda unit: 'gamma' in unit)
+        self.assertEqual(small, 'gamma')
+        self.assertEqual(minimize_unit(grower, 'x + y', lambda unit: True), 'a')
+
+    def test_save_reproducer(self):
+        grower = GROWERS['relational']
+        with tempfile.TemporaryDirectory() as directory:
+            for exponent in (1.9, 2.1):
+                measurement = Measurement(grower, 'a + b', [2, 4], [10, 20], [1.0, 2 ** exponent], [1.0, 2.0])
+                path = save_reproducer(directory, measurement, 2)
+            with open(path) as f:
+                self.assertEqual(f.read(), grower.build('a + b', 4) + '\n')
+            entries = load_manifest(directory)['entries']
+            self.assertEqual(len(entries), 1)
+            self.assertEqual(entries[0]['file'], os.path.basename(path))
+            self.assertEqual((entries[0]['unit'], entries[0]['parse_exponent']), ('a + b', 2.1))
+
+    def test_perf_corpus(self):
+        with open(os.path.join(CORPUS, 'manifest.json')) as f:
+            entries = json.load(f)['entries']
+        self.assertTrue(entries)
+        for entry in entries:
+            with open(os.path.join(CORPUS, entry['file'])) as f:
+                source = f.read()
+            self.assertEqual(validate(source), [])
+            self.assertEqual(parse_native(source), parse_expresso_code(source))
+
+if __name__ == '__main__':
+    unittest.main()
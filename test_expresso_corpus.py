@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from ast_nodes import *
+from expresso_corpus import ProgramGenerator, write_corpus
+from expresso_native import parse_native
+from expresso_validate import validate
+from test_expresso import parse_expresso_code
+
+SETTINGS = [
+    {},
+    {'depth': 6, 'chain': 6, 'logic': 0.8},
+    {'depth': 0, 'chain': 1, 'mix': {'statement': 1}},
+    {'members': 0, 'statements': 0},
+]
+
+
+# Deepest nesting of Factors inside Factors below node
+def factor_depth(node):
+    deepest = 0
+    stack = [(node, 0)]
+    while stack:
+        value, depth = stack.pop()
+        if isinstance(value, Factor):
+            depth += 1
+            deepest = max(deepest, depth)
+        if isinstance(value, ASTNode):
+            stack.extend((getattr(value, field), depth) for field in node_layout(type(value))[1])
+        elif isinstance(value, (list, tuple)):
+            stack.extend((item, depth) for item in value)
+    return deepest
+
+
+class TestProgramGenerator(unittest.TestCase):
+
+    def test_programs_are_valid(self):
+        for settings in SETTINGS:
+            for seed in range(5):
+                with self.subTest(settings=settings, seed=seed):
+                    source = ProgramGenerator(seed, **settings).program()
+                    self.assertEqual(validate(source), [])
+                    self.assertEqual(parse_native(source), parse_expresso_code(source))
+
+    def test_deterministic(self):
+        self.assertEqual(ProgramGenerator(3).program(), ProgramGenerator(3).program())
+        self.assertNotEqual(ProgramGenerator(3).program(), ProgramGenerator(4).program())
+
+    def test_settings(self):
+        program = parse_native(ProgramGenerator(0, declarations=30, mix={'statement': 1}, depth=5).program())
+        self.assertEqual(len(program.body), 30)
+        self.assertTrue(all(isinstance(item, Statement) for item in program.body))
+        # Every statement nests its expression five factors deep, plus the innermost factor
+        self.assertEqual({factor_depth(item) for item in program.body}, {6})
+
+    def test_write_corpus(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_corpus(directory, 3, seed=1, declarations=5)
+            self.assertEqual([os.path.basename(path) for path in paths],
+                             ['corpus_0000.xprs', 'corpus_0001.xprs', 'corpus_0002.xprs'])
+            with open(paths[0]) as f:
+                self.assertEqual(f.read(), ProgramGenerator(1, declarations=5).program())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+from antlr4 import InputStream, CommonTokenStream
+from antlr4.PredictionContext import PredictionContextCache
+from antlr4.dfa.DFA import DFA
+from ExpressoLexer import ExpressoLexer
+from ExpressoParser import ExpressoParser
+import ExpressoLexer as ExpressoLexerModule
+import ExpressoParser as ExpressoParserModule
+import expresso_dfa_cache
+from expresso_dfa_cache import save_dfa_cache, load_dfa_cache, dfa_state_count
+from expresso_parse import parse_tree
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a, float b) {
+        int total = a + b * (c - 1);
+        foo(total, 2 < 3, x and y) / 3;
+    }
+}
+int globalVar = bar();
+"""
+
+def parse(code):
+    return parse_tree(CommonTokenStream(ExpressoLexer(InputStream(code))))[0].toStringTree(recog=ExpressoParser)
+
+def fresh_dfa(recognizer):
+    return [DFA(state, i) for i, state in enumerate(recognizer.atn.decisionToState)]
+
+class TestDFACache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+
+    # Run with empty DFAs, as in a freshly started process
+    def cold_process(self):
+        patchers = [
+            mock.patch.object(ExpressoParser, 'decisionsToDFA', fresh_dfa(ExpressoParser)),
+            mock.patch.object(ExpressoParser, 'sharedContextCache', PredictionContextCache()),
+            mock.patch.object(ExpressoLexer, 'decisionsToDFA', fresh_dfa(ExpressoLexer)),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_round_trip_restores_learned_states(self):
+        self.cold_process()
+        expected = parse(CODE)
+        learned = dfa_state_count()
+        save_dfa_cache(self.cache_dir)
+
+        self.cold_process()
+        self.assertEqual(load_dfa_cache(self.cache_dir), learned)
+        self.assertEqual(parse(CODE), expected)
+        self.assertEqual(dfa_state_count(), learned)
+
+    def test_stale_cache_is_ignored(self):
+        self.cold_process()
+        parse(CODE)
+        save_dfa_cache(self.cache_dir)
+
+        self.cold_process()
+        with mock.patch.object(expresso_dfa_cache, 'FORMAT_VERSION', expresso_dfa_cache.FORMAT_VERSION + 1):
+            self.assertEqual(load_dfa_cache(self.cache_dir), 0)
+        self.assertEqual(dfa_state_count(), 0)
+
+    def test_damaged_cache_starts_cold(self):
+        self.cold_process()
+        parse(CODE)
+        save_dfa_cache(self.cache_dir)
+        os.unlink(expresso_dfa_cache.cache_path(ExpressoLexerModule, self.cache_dir))
+        path = expresso_dfa_cache.cache_path(ExpressoParserModule, self.cache_dir)
+        with open(path, 'rb') as f:
+            valid = f.read()
+
+        for damaged in (b'\x80\x04garbage', valid[:len(valid) // 2], pickle.dumps(['not', 'a', 'cache']),
+                        pickle.dumps({'version': expresso_dfa_cache.FORMAT_VERSION,
+                                      'atn': expresso_dfa_cache.atn_hash(ExpressoParserModule),
+                                      'dfa': {'contexts': [None], 'executors': [],
+                                              'decisions': [(0, [None])]}})):
+            with open(path, 'wb') as f:
+                f.write(damaged)
+            self.cold_process()
+            self.assertEqual(load_dfa_cache(self.cache_dir), 0)
+            self.assertEqual(dfa_state_count(), 0)
+            self.assertFalse(os.path.exists(path))
+
+    def test_missing_cache(self):
+        self.cold_process()
+        self.assertEqual(load_dfa_cache(os.path.join(self.cache_dir, 'missing')), 0)
+
+if __name__ == '__main__':
+    unittest.main()
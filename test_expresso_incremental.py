@@ -0,0 +1,83 @@
+import random
+import unittest
+from ast_nodes import *
+from expresso_incremental import TextEdit, parse_with_spans, reparse
+from expresso_native import parse_native, ExpressoSyntaxError
+
+CODE = """type Example {
+    int exampleVar = 0;
+    method doSomething() {
+    }
+}
+int globalVar = 0;
+method doAnotherThing(int a) {
+    foo(a) + 1;
+}
+x * 2;
+"""
+
+class TestIncremental(unittest.TestCase):
+
+    def assertMatchesFullParse(self, parsed):
+        expected = parse_with_spans(parsed.source)
+        self.assertEqual(parsed.program, expected.program)
+        self.assertEqual(parsed.spans, expected.spans)
+
+    def test_spans(self):
+        parsed = parse_with_spans(CODE)
+        self.assertEqual(parsed.program, parse_native(CODE))
+        texts = [CODE[start:stop] for start, stop in parsed.spans]
+        self.assertEqual(texts[1], "int globalVar = 0;")
+        self.assertEqual(texts[3], "x * 2;")
+
+    def test_untouched_items_are_reused(self):
+        parsed = parse_with_spans(CODE)
+        previous = list(parsed.program.body)
+        start = CODE.index("globalVar = 0") + len("globalVar = ")
+        updated = reparse(parsed, TextEdit(start, start + 1, "42"))
+        self.assertMatchesFullParse(updated)
+        self.assertEqual(updated.program.body[1], VariableDeclaration('int', 'globalVar', Expression(Term(Factor(42)))))
+        for i in (0, 2, 3):
+            self.assertIs(updated.program.body[i], previous[i])
+
+    def test_insert_declarations_between_items(self):
+        parsed = parse_with_spans(CODE)
+        start = CODE.index("int globalVar")
+        updated = reparse(parsed, TextEdit(start, start, "type Inserted; method m();\n"))
+        self.assertMatchesFullParse(updated)
+        self.assertEqual(len(updated.program.body), 6)
+
+    def test_edit_merging_items(self):
+        code = "type A;\nfoo;\nbar;\n"
+        parsed = parse_with_spans(code)
+        start = code.index(";\nbar")
+        updated = reparse(parsed, TextEdit(start, start + 1, ""))
+        self.assertMatchesFullParse(updated)
+        self.assertEqual(updated.program.body[1], VariableDeclaration('foo', 'bar'))
+
+    def test_syntax_error_is_raised(self):
+        parsed = parse_with_spans(CODE)
+        start = CODE.index("= 0;\nmethod")
+        with self.assertRaises(ExpressoSyntaxError):
+            reparse(parsed, TextEdit(start, start + 1, "=="))
+
+    def test_random_edits_match_full_parse(self):
+        rng = random.Random(7)
+        fragments = ["", " ", ";", "}", "a", "1", "+", "(", ")", "type T;", "int y = 3;", "\n", "foo(1);"]
+        parsed = parse_with_spans(CODE)
+        for _ in range(300):
+            start = rng.randrange(len(parsed.source) + 1)
+            end = min(len(parsed.source), start + rng.randrange(4))
+            edit = TextEdit(start, end, rng.choice(fragments))
+            source = parsed.source
+            try:
+                updated = reparse(parsed, edit)
+            except ExpressoSyntaxError:
+                with self.assertRaises(ExpressoSyntaxError):
+                    parse_native(edit.apply(source))
+                continue
+            self.assertMatchesFullParse(updated)
+            parsed = updated
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import math
+import pickle
+import unittest
+from ast_nodes import *
+from expresso_intern import HashConsFactory, Interned
+from expresso_native import parse_native
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a) {
+        int total = 0;
+        foo(a, 0) + 2 * a;
+    }
+}
+int globalVar = 0;
+"""
+
+class TestHashConsFactory(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = HashConsFactory()
+
+    def test_identical_subtrees_are_shared(self):
+        program = self.factory.intern(parse_native(CODE))
+        example = program.body[0].body.body
+        self.assertIs(example[0].expression, program.body[1].expression)
+        self.assertIs(example[1].body.body[0].expression, example[0].expression)
+        self.assertIs(self.factory.intern(parse_native(CODE)), program)
+
+    def test_constructors(self):
+        expression = self.factory.Expression(self.factory.Term(self.factory.Factor(0)))
+        self.assertIsInstance(expression, Interned)
+        self.assertIsInstance(expression, Expression)
+        self.assertIs(expression, self.factory.intern(Expression(Term(Factor(0)))))
+
+    def test_equality_with_plain_nodes(self):
+        plain = parse_native(CODE)
+        interned = self.factory.intern(plain)
+        self.assertEqual(interned, plain)
+        self.assertEqual(plain, interned)
+        self.assertNotEqual(interned, self.factory.intern(parse_native("int globalVar = 1;")))
+
+    def test_nodes_are_dict_keys(self):
+        memo = {self.factory.intern(parse_native(CODE)): 'example'}
+        self.assertEqual(memo[self.factory.intern(parse_native(CODE))], 'example')
+        self.assertEqual(hash(self.factory.Factor('x')), hash(self.factory.Factor('x')))
+
+    def test_hash_matches_plain_nodes(self):
+        plain = parse_native(CODE)
+        interned = self.factory.intern(plain)
+        self.assertEqual(hash(interned), hash(plain))
+        self.assertEqual({plain: 'example'}[interned], 'example')
+        self.assertEqual({interned: 'example'}[parse_native(CODE)], 'example')
+
+    def test_signed_zeros_stay_apart(self):
+        self.factory.Factor(0.0)
+        self.assertEqual(math.copysign(1.0, self.factory.Factor(-0.0).value), -1.0)
+
+    def test_leaf_types_stay_apart(self):
+        for first, second in ((1, True), (0, False), (1.0, 1), (0.0, False)):
+            with self.subTest(first=first, second=second):
+                self.factory.Factor(first)
+                self.factory.intern(Factor((first,)))
+                self.assertIs(type(self.factory.Factor(second).value), type(second))
+                self.assertIs(type(self.factory.intern(Factor((second,))).value[0]), type(second))
+
+    def test_lists_and_tuples_stay_apart(self):
+        self.assertIsNot(self.factory.intern(Program([Factor(1)])), self.factory.intern(Program((Factor(1),))))
+
+    def test_pickles_as_plain_nodes(self):
+        program = pickle.loads(pickle.dumps(self.factory.intern(parse_native(CODE))))
+        self.assertNotIsInstance(program, Interned)
+        self.assertEqual(program, parse_native(CODE))
+
+    def test_deep_tree(self):
+        node = Factor(1)
+        for _ in range(100000):
+            node = Factor(Expression(Term(node)))
+        interned = self.factory.intern(node)
+        self.assertIs(self.factory.intern(interned), interned)
+        self.assertEqual(len(self.factory), 3 * 100000 + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import unittest
+from unittest import mock
+from expresso_limits import (ParseLimits, CancelToken, ParseLimitError, TokenBudgetExceeded,
+                             DeadlineExceeded, ParseCancelled)
+from expresso_parse import parse_program, LEXER_ANTLR, LEXER_ARRAY, MODE_LL
+from expresso_regex_lexer import RegexLexer
+from expresso_tokens import ArrayTokenStream
+
+SOURCE = "type A { int x = 1; method m(int a) { f(a) + 1; } }\n"
+
+
+class TestParseLimits(unittest.TestCase):
+
+    def test_within_limits(self):
+        limits = ParseLimits(max_tokens=1000, timeout=60, cancel=CancelToken())
+        self.assertEqual(parse_program(SOURCE * 10, limits=limits).program, parse_program(SOURCE * 10).program)
+
+    def test_token_budget(self):
+        # "x; y;" is four tokens
+        for lexer in (LEXER_ANTLR, LEXER_ARRAY):
+            with self.subTest(lexer=lexer):
+                parse_program("x; y;", lexer=lexer, limits=ParseLimits(max_tokens=4))
+                with self.assertRaises(TokenBudgetExceeded) as cm:
+                    parse_program("x; y;", lexer=lexer, limits=ParseLimits(max_tokens=3))
+                self.assertEqual(cm.exception.token_index, 4)
+
+    def test_token_budget_while_lexing(self):
+        lexed = []
+        scan = RegexLexer.scan
+
+        def counting_scan(lexer):
+            for token in scan(lexer):
+                lexed.append(token)
+                yield token
+
+        with mock.patch.object(RegexLexer, 'scan', counting_scan):
+            with self.assertRaises(TokenBudgetExceeded) as cm:
+                parse_program("x; " * 100000, lexer=LEXER_ARRAY, limits=ParseLimits(max_tokens=3))
+        self.assertEqual(cm.exception.token_index, 4)
+        self.assertEqual(len(lexed), 4)
+        self.assertEqual(ArrayTokenStream("x; y;", max_tokens=4).size, 5)
+
+    def test_deadline(self):
+        with self.assertRaises(DeadlineExceeded):
+            parse_program(SOURCE * 10, mode=MODE_LL, limits=ParseLimits(timeout=-1))
+
+    def test_cancel(self):
+        cancel = CancelToken()
+        cancel.cancel()
+        with self.assertRaises(ParseCancelled) as cm:
+            parse_program(SOURCE, limits=ParseLimits(cancel=cancel))
+        self.assertIsInstance(cm.exception, ParseLimitError)
+
+    def test_cancel_from_another_thread(self):
+        cancel = CancelToken()
+        timer = threading.Timer(0.02, cancel.cancel)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        with self.assertRaises(ParseCancelled):
+            parse_program(SOURCE * 20000, limits=ParseLimits(cancel=cancel))
+
+    def test_parser_usable_after_abort(self):
+        with self.assertRaises(TokenBudgetExceeded):
+            parse_program(SOURCE * 10, limits=ParseLimits(max_tokens=30))
+        self.assertEqual(len(parse_program(SOURCE * 10).program.body), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import pickle
+import unittest
+from unittest import mock
+import test_expresso
+from ast_nodes import *
+from expresso_native import parse_native, parse_outline, ExpressoSyntaxError, LazyMethodBody
+from test_expresso import parse_expresso_code
+
+# Sources the ANTLR path accepts, compared node for node with the native parser
+CONFORMANCE_SOURCES = [
+    "",
+    "x; y;",
+    "(1);",
+    "1 * 2 / 3 - 4 + 5;",
+    "((a + b) * (c - d)) / e;",
+    "foo(1 + 2, (3), bar(x, baz()));",
+    "int x = foo(a) * (b + 2);",
+    "int x; type T { float y; method m() { bool z; } }",
+    "type Example; type Other { method m(int a, float b); int y = 1; }",
+    "method m(int a) { int total = a + 1; total * 2; print(total); }",
+    "typeName; methods(1); iff; placeholders;",
+    "type Example; )",
+    "foo(a < b, a == b + 1 and c or d, x != y > z);",
+    "f(a or b or c and d and e == f);",
+    "f(a < b);",
+    "f(g(a <= 1), h(b) >= c and d);",
+    "int v = f((a), b > c or d != e);",
+    "method m() { f(a and b, (c) + 1 == d); }",
+]
+
+
+class TestNativeExpresso(test_expresso.TestExpresso):
+
+    # Rerun the whole ANTLR-path suite against the native parser
+    def setUp(self):
+        patcher = mock.patch.object(test_expresso, 'parse_expresso_code', parse_native)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestNativeConformance(unittest.TestCase):
+
+    def test_matches_antlr_path(self):
+        for code in CONFORMANCE_SOURCES:
+            with self.subTest(code=code):
+                self.assertEqual(parse_native(code), parse_expresso_code(code))
+
+    def test_syntax_error_position(self):
+        with self.assertRaises(ExpressoSyntaxError) as cm:
+            parse_native("type Example {\n  int x = ;\n}")
+        self.assertEqual((cm.exception.line, cm.exception.column), (2, 10))
+
+    def test_sample_is_rejected(self):
+        with open(os.path.join(os.path.dirname(__file__), 'sample.xprs')) as f:
+            source = f.read()
+        with self.assertRaises(ExpressoSyntaxError):
+            parse_native(source)
+
+class TestOutlineExpresso(test_expresso.TestExpresso):
+
+    # Rerun the whole ANTLR-path suite against the outline parser; comparing
+    # the results reads, and so parses, every method body
+    def setUp(self):
+        patcher = mock.patch.object(test_expresso, 'parse_expresso_code', parse_outline)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestOutline(unittest.TestCase):
+
+    def test_matches_full_parse(self):
+        for code in CONFORMANCE_SOURCES:
+            with self.subTest(code=code):
+                self.assertEqual(parse_outline(code), parse_native(code))
+
+    def test_bodies_are_parsed_on_first_access(self):
+        program = parse_outline("type T { method m(int a) { a + 1; } } method n() { f(); }")
+        method = program.body[0].body.body[0]
+        self.assertEqual(method.params, Params([VariableDeclaration('int', 'a')]))
+        self.assertIsInstance(method.body, LazyMethodBody)
+        self.assertFalse(method.body.parsed)
+        statements = method.body.body
+        self.assertTrue(method.body.parsed)
+        self.assertIs(method.body.body, statements)
+        self.assertEqual(statements, [Statement(Expression(Term(Factor('a')), [('+', Term(Factor(1)))]))])
+        self.assertFalse(program.body[1].body.parsed)
+
+    def test_body_errors_are_raised_on_access(self):
+        code = "method m() {\n  int x = ;\n}\nmethod n();"
+        program = parse_outline(code)
+        self.assertEqual(program.body[1], MethodDeclaration('n', Params([]), None))
+        with self.assertRaises(ExpressoSyntaxError) as cm:
+            program.body[0].body.body
+        self.assertEqual((cm.exception.line, cm.exception.column), (2, 10))
+        with self.assertRaises(ExpressoSyntaxError) as cm:
+            parse_outline("method m() { f(1); type T; }").body[0].body.body
+        self.assertEqual(cm.exception.msg, "mismatched input 'type' expecting '}'")
+
+    def test_unbalanced_braces_fail_at_once(self):
+        with self.assertRaises(ExpressoSyntaxError):
+            parse_outline("method m() { f(1);")
+
+    def test_pickles_as_method_body(self):
+        program = parse_outline("method m() { f(1); }")
+        copy = pickle.loads(pickle.dumps(program))
+        self.assertIs(type(copy.body[0].body), MethodBody)
+        self.assertEqual(copy, parse_native("method m() { f(1); }"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from antlr4.error.ErrorListener import ErrorListener
+from ast_nodes import *
+from ExpressoParser import ExpressoParser
+from expresso_tokens import ArrayTokenStream
+from expresso_parse import (parse_program, parse_spans, ParseSyntaxError, LEXER_ANTLR, LEXER_ARRAY,
+                           MODE_SLL, MODE_LL, STAGE_SLL, STAGE_LL)
+from test_expresso import parse_expresso_code
+
+class TestParseProgram(unittest.TestCase):
+
+    def test_two_stage_succeeds_with_sll(self):
+        code = """
+        type Example {
+            int exampleVar = 0;
+            method doSomething() {
+                foo(1, 2 * x) + 3;
+            }
+        }
+        """
+        result = parse_program(code)
+        self.assertEqual(result.stage, STAGE_SLL)
+        self.assertEqual(result.program, parse_expresso_code(code))
+
+    def test_syntax_errors_raise(self):
+        # SLL bails out, and LL reports the error instead of recovering from it
+        for code, msg in (("method doSomething(int a b);", "line 1:25 extraneous input 'b' expecting ')'"),
+                          ("foo(a < ;", "line 1:8 mismatched input ';' expecting {'(', ID, NUMBER}")):
+            for lexer in (LEXER_ANTLR, LEXER_ARRAY):
+                with self.subTest(code=code, lexer=lexer):
+                    with self.assertRaises(ParseSyntaxError) as raised:
+                        parse_program(code, lexer=lexer)
+                    self.assertEqual(str(raised.exception).split(' (and ')[0], msg)
+                    self.assertEqual(raised.exception.issues[0].kind, 'parser')
+        with self.assertRaises(ParseSyntaxError):
+            parse_program("foo(a < ;", mode=MODE_LL)
+        with self.assertRaises(ParseSyntaxError):
+            parse_spans("foo(a < ;")
+
+    def test_forced_modes(self):
+        code = "method doSomething() { 1 + 2; }"
+        expected = parse_expresso_code(code)
+        self.assertEqual(parse_program(code, mode=MODE_LL).stage, STAGE_LL)
+        self.assertEqual(parse_program(code, mode=MODE_LL).program, expected)
+        self.assertEqual(parse_program(code, mode=MODE_SLL).program, expected)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            parse_program("type Example;", mode='fast')
+
+    def test_spans(self):
+        code = "type A { method m(int a, float b) { f(a < 1 and b, 2) - 3; } } int g = (h);"
+        result, spans = parse_spans(code)
+        self.assertEqual(result.program, parse_expresso_code(code))
+        text = lambda node: code[slice(*spans[id(node)])]
+        method = result.program.body[0].body.body[0]
+        self.assertEqual(text(method.params), 'int a, float b')
+        self.assertEqual([text(param) for param in method.params.parameters], ['int a', 'float b'])
+        expression = method.body.body[0].body
+        self.assertEqual(text(expression), 'f(a < 1 and b, 2) - 3')
+        call = expression.term.factor.value
+        self.assertEqual(text(call), 'f(a < 1 and b, 2)')
+        self.assertEqual(text(call.args[0].or_expression), 'a < 1 and b')
+        self.assertEqual(text(call.args[0].or_expression.left), 'a < 1')
+        self.assertEqual(text(result.program.body[1].expression), '(h)')
+
+    def test_values_need_no_full_context(self):
+        code = "f(a * (b + 1), g(x) < 2 and y == z or h(), (c) - d);"
+        attempts = []
+
+        class Counter(ErrorListener):
+            def reportAttemptingFullContext(self, recognizer, dfa, startIndex, stopIndex, conflictingAlts, configs):
+                attempts.append(dfa.decision)
+
+        parser = ExpressoParser(ArrayTokenStream(code))
+        parser.addErrorListener(Counter())
+        parser.program()
+        self.assertEqual(attempts, [])
+        args = parse_program(code, mode=MODE_LL).program.body[0].body.term.factor.value.args
+        self.assertEqual([type(arg) for arg in args], [Expression, Logic, Expression])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from expresso_parse import parse_program, LEXER_ARRAY, STAGE_LL
+from expresso_profile import ParseProfile, profile_program, profile_command
+
+CODE = "type A { method m(int a) { f(a < 1 and b, 2) - 3; } } int g = (h);"
+
+
+class TestProfile(unittest.TestCase):
+
+    def test_same_result_as_parse_program(self):
+        profile = ParseProfile()
+        self.assertEqual(profile_program(CODE, profile).program, parse_program(CODE).program)
+        self.assertEqual((profile.parses, profile.tokens), (1, 32))
+
+    def test_rules(self):
+        profile = ParseProfile()
+        profile_program(CODE, profile)
+        profile_program(CODE, profile)
+        rules = profile.rules
+        self.assertEqual(rules['ProgramContext'].invocations, 2)
+        self.assertEqual(rules['Method_callContext'].invocations, 2)
+        # f(...) - 3, a, 1, b, 2, (h) and h in each parse
+        self.assertEqual(rules['ExpressionContext'].invocations, 14)
+        for rule in rules.values():
+            self.assertLessEqual(rule.self_seconds, rule.seconds)
+        self.assertAlmostEqual(sum(rule.self_seconds for rule in rules.values()),
+                               rules['ProgramContext'].seconds, places=6)
+
+    def test_decisions(self):
+        profile = ParseProfile()
+        profile_program(CODE, profile)
+        factor = [decision for decision in profile.decisions.values() if decision.rule == 'factor']
+        self.assertEqual(len(factor), 1)
+        self.assertEqual((factor[0].sll_min_look, factor[0].sll_max_look), (1, 2))
+        self.assertEqual(factor[0].ll_fallbacks, 0)
+        self.assertGreater(factor[0].sll_atn_transitions + factor[0].sll_dfa_transitions, factor[0].invocations)
+
+    def test_syntax_error_falls_back_to_ll(self):
+        profile = ParseProfile()
+        with redirect_stderr(io.StringIO()):
+            result = profile_program("method doSomething(int a b);", profile)
+        self.assertEqual(result.stage, STAGE_LL)
+        self.assertEqual(profile.rules['ProgramContext'].invocations, 2)
+
+    def test_json(self):
+        profile = ParseProfile()
+        profile_program(CODE, profile)
+        data = json.loads(json.dumps(profile.as_json()))
+        self.assertEqual(data['parses'], 1)
+        seconds = [rule['self_seconds'] for rule in data['rules']]
+        self.assertEqual(seconds, sorted(seconds, reverse=True))
+        self.assertIn('ll_fallbacks', data['decisions'][0])
+
+    def test_profile_command(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'a.xprs'), 'w') as f:
+                f.write(CODE)
+            json_path = os.path.join(root, 'profile.json')
+            out = io.StringIO()
+            self.assertEqual(profile_command(root, json_path, out=out), 0)
+            self.assertTrue(out.getvalue().startswith('1 parses, 32 tokens'))
+            with open(json_path) as f:
+                self.assertEqual(json.load(f)['parses'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
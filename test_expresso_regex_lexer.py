@@ -0,0 +1,67 @@
+import random
+import unittest
+from antlr4 import InputStream
+from antlr4.error.ErrorListener import ErrorListener
+from ExpressoLexer import ExpressoLexer
+from expresso_parse import parse_program, ParseSyntaxError, LEXER_REGEX
+from expresso_regex_lexer import RegexLexer
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a, float b) {
+        int total = a + b * (c - 1);
+        foo(total <= 2, a != b) / 3;
+    }
+}
+"""
+
+# Fragments the random inputs are built from, including invalid characters
+FRAGMENTS = list("abz_09 \t\r\n{}();,=<>!+-*/#é") + [
+    'type', 'method', 'and', 'or', 'if', 'placeholder', 'concept', 'throw', '<=', '>=', '==', '!=']
+
+class RecordingErrorListener(ErrorListener):
+    def __init__(self):
+        self.errors = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.errors.append((line, column, msg))
+
+# Every token up to and including EOF, and every error reported on the way
+def lex(lexer):
+    listener = RecordingErrorListener()
+    lexer.removeErrorListeners()
+    lexer.addErrorListener(listener)
+    tokens = []
+    while not tokens or tokens[-1][0] != -1:
+        token = lexer.nextToken()
+        tokens.append((token.type, token.text, token.line, token.column, token.start, token.stop, token.channel))
+    return tokens, listener.errors
+
+class TestRegexLexer(unittest.TestCase):
+
+    def assertSameAsExpressoLexer(self, source):
+        self.assertEqual(lex(RegexLexer(source)), lex(ExpressoLexer(InputStream(source))), repr(source))
+
+    def test_matches_expresso_lexer(self):
+        for source in (CODE, "", "a<=b>=c==d!=e<f>g=h", "x # y\n\té ! z", "a!", "!\nb"):
+            self.assertSameAsExpressoLexer(source)
+
+    def test_matches_expresso_lexer_on_random_input(self):
+        rng = random.Random(9)
+        for _ in range(500):
+            self.assertSameAsExpressoLexer(''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40))))
+
+    def test_parse_program_with_regex_lexer(self):
+        source = "type Example { method doSomething(int a) { foo(a, 1) + 2 * a; } }"
+        expected = parse_program(source)
+        result = parse_program(source, lexer=LEXER_REGEX)
+        self.assertEqual((result.program, result.stage), (expected.program, expected.stage))
+        with self.assertRaises(ParseSyntaxError) as expected:
+            parse_program("method doSomething(int a b);")
+        with self.assertRaises(ParseSyntaxError) as result:
+            parse_program("method doSomething(int a b);", lexer=LEXER_REGEX)
+        self.assertEqual(result.exception.issues, expected.exception.issues)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from expresso_build import FRONTEND_ANTLR, FRONTEND_NATIVE
+from expresso_native import ExpressoSyntaxError, parse_native
+from expresso_parse import ParseSyntaxError, parse_program
+from expresso_serve import (OP_PARSE, STATUS_ERROR, STATUS_OK, ParseClient, ParseServer, ServeError,
+                            _REQUEST, _RESPONSE, _read_exactly)
+from expresso_validate import validate
+
+CODE = "type A { method m(int a) { f(a < 1 and b, 2) - 3; } } int g = (h);"
+BROKEN = "type A { int x = ; }"
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'needs Unix domain sockets')
+class TestServe(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.dict(os.environ, {'EXPRESSO_CACHE_DIR': tmp.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.socket_path = os.path.join(tmp.name, 'serve.sock')
+
+    def start_server(self):
+        server = ParseServer(self.socket_path)
+        server.bind()
+        server.warm()
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def stop():
+            if thread.is_alive():
+                server.stop()
+                thread.join()
+        self.addCleanup(stop)
+        return server, thread
+
+    def test_parse(self):
+        server, _ = self.start_server()
+        with ParseClient(self.socket_path) as client:
+            self.assertTrue(client.connected)
+            self.assertEqual(client.parse(CODE), parse_program(CODE).program)
+            self.assertEqual(client.parse(CODE, FRONTEND_NATIVE), parse_native(CODE))
+            self.assertEqual(client.parse(CODE), parse_program(CODE).program)
+        self.assertEqual((server.requests, server.hits), (3, 1))
+
+    def test_check(self):
+        self.start_server()
+        expected = [(issue.line, issue.column, issue.offset, issue.msg, issue.kind) for issue in validate(BROKEN)]
+        with ParseClient(self.socket_path) as client:
+            self.assertEqual(client.check(BROKEN), expected)
+            self.assertEqual(client.check(CODE), [])
+
+    def test_failed_request(self):
+        self.start_server()
+        with ParseClient(self.socket_path) as client:
+            with self.assertRaises(ServeError) as raised:
+                client.request(99)
+            self.assertEqual(raised.exception.msg, 'unknown request 99')
+            # The connection carries on after a failed request
+            client.ping()
+
+    def test_syntax_errors_raise_as_in_process(self):
+        server, _ = self.start_server()
+        local = ParseClient(os.path.join(os.path.dirname(self.socket_path), 'none.sock'))
+        with ParseClient(self.socket_path) as client:
+            for source in (BROKEN, "int x = 1; \ud800", "int \ud800 = 1;"):
+                for frontend, error in ((FRONTEND_ANTLR, ParseSyntaxError), (FRONTEND_NATIVE, ExpressoSyntaxError)):
+                    with self.subTest(source=source, frontend=frontend):
+                        with self.assertRaises(error) as expected:
+                            local.parse(source, frontend)
+                        # Twice: a broken parse is never cached
+                        for _ in range(2):
+                            with self.assertRaises(error) as raised:
+                                client.parse(source, frontend)
+                            self.assertEqual(str(raised.exception), str(expected.exception))
+                            if error is ParseSyntaxError:
+                                self.assertEqual(raised.exception.issues, expected.exception.issues)
+            self.assertEqual(client.check("int x = 1; \ud800"), local.check("int x = 1; \ud800"))
+        self.assertEqual(len(server.memory), 1)
+        self.assertEqual(server.hits, 0)
+
+    def test_requests_are_answered_while_the_parser_is_busy(self):
+        server, _ = self.start_server()
+        with ParseClient(self.socket_path) as client:
+            client.parse(CODE)
+        results = []
+        with server.parser_lock:
+            parsing = threading.Thread(target=lambda: results.append(ParseClient(self.socket_path).parse(CODE + ' ')))
+            checking = threading.Thread(target=lambda: results.append(ParseClient(self.socket_path).check(BROKEN)))
+            parsing.start()
+            checking.start()
+            with ParseClient(self.socket_path, fallback=False, timeout=5) as client:
+                client.ping()
+                # From memory, without the parser
+                self.assertEqual(client.parse(CODE), parse_program(CODE).program)
+            parsing.join(0.2)
+            checking.join(0.2)
+            # Both parse with ANTLR, so both wait for the lock
+            self.assertEqual(results, [])
+        parsing.join(5)
+        checking.join(5)
+        self.assertEqual(len(results), 2)
+
+    def test_concurrent_parses_and_checks(self):
+        self.start_server()
+        sources = [f"type A{i} {{ method m(int a) {{ f(a < {i} and b, g({i}) == c) - {i}; }} }} int g{i} = (h);"
+                   for i in range(12)]
+        broken = [f"type A{i} {{ int x = ; }} f({i} <;" for i in range(12)]
+        expected = ([parse_program(source).program for source in sources],
+                    [ParseClient(self.socket_path + '.none').check(source) for source in broken])
+        results = {}
+
+        def run(worker):
+            with ParseClient(self.socket_path, fallback=False, timeout=30) as client:
+                results[worker] = ([client.parse(source) for source in sources[worker::3]],
+                                   [client.check(source) for source in broken[worker::3]])
+
+        threads = [threading.Thread(target=run, args=(worker,)) for worker in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+        for worker in range(3):
+            self.assertEqual(results[worker], (expected[0][worker::3], expected[1][worker::3]))
+
+    def test_framing(self):
+        self.start_server()
+        sock = ParseClient.connect(self.socket_path)
+        self.addCleanup(sock.close)
+        source = b'int x = 1;'
+        # Two requests in one write, the second for an unknown front-end
+        sock.sendall(_REQUEST.pack(OP_PARSE, 0, len(source)) + source + _REQUEST.pack(OP_PARSE, 9, 0))
+        status, length = _RESPONSE.unpack(_read_exactly(sock, _RESPONSE.size))
+        self.assertEqual(status, STATUS_OK)
+        self.assertEqual(len(_read_exactly(sock, length)), length)
+        status, length = _RESPONSE.unpack(_read_exactly(sock, _RESPONSE.size))
+        self.assertEqual((status, _read_exactly(sock, length)), (STATUS_ERROR, b'unknown front-end 9'))
+
+    def test_fallback_without_daemon(self):
+        client = ParseClient(self.socket_path)
+        self.assertFalse(client.connected)
+        self.assertEqual(client.parse(CODE), parse_program(CODE).program)
+        self.assertEqual(client.parse(CODE, FRONTEND_NATIVE), parse_native(CODE))
+        self.assertEqual(len(client.check(BROKEN)), 1)
+        with self.assertRaises(OSError):
+            ParseClient(self.socket_path, fallback=False)
+        with self.assertRaises(ConnectionError):
+            client.ping()
+        with self.assertRaises(ConnectionError):
+            client.shutdown()
+
+    def test_fallback_when_daemon_does_not_answer(self):
+        # Accepts connections into its backlog, but never answers
+        silent = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(silent.close)
+        silent.bind(self.socket_path)
+        silent.listen(1)
+        client = ParseClient(self.socket_path, timeout=0.2)
+        self.assertTrue(client.connected)
+        self.assertEqual(client.parse(CODE), parse_program(CODE).program)
+        self.assertFalse(client.connected)
+
+    def test_shutdown(self):
+        _, thread = self.start_server()
+        client = ParseClient(self.socket_path)
+        ParseClient(self.socket_path).shutdown()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+        # A client whose daemon went away parses in process
+        self.assertEqual(client.parse(CODE), parse_program(CODE).program)
+        self.assertFalse(client.connected)
+
+    def test_bind(self):
+        self.start_server()
+        with self.assertRaises(ServeError):
+            ParseServer(self.socket_path).bind()
+
+    def test_bind_replaces_stale_socket(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+        self.start_server()
+        with ParseClient(self.socket_path) as client:
+            client.ping()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import io
+import unittest
+from ast_nodes import *
+from expresso_stream import iter_declarations, iter_source_declarations
+from test_expresso import parse_expresso_code
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a, float b) {
+        int total = a + b * (c - 1);
+        foo(total, 2) / 3;
+    }
+}
+int globalVar = 0;
+method doAnotherThing();
+x * (2 + y);
+"""
+
+# A text stream that records how much of it has been read
+class CountingStream(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+class TestStream(unittest.TestCase):
+
+    def test_matches_full_parse(self):
+        expected = parse_expresso_code(CODE).body
+        for chunk_size in (1, 7, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_source_declarations(CODE, chunk_size)), expected)
+
+    def test_stops_at_first_token_that_cannot_start_a_declaration(self):
+        code = "type Example; ) type Ignored;"
+        self.assertEqual(list(iter_source_declarations(code)), [TypeDeclaration('Example', None)])
+
+    def test_reads_lazily(self):
+        stream = CountingStream(CODE * 100)
+        declarations = iter_declarations(stream, chunk_size=64)
+        first = next(declarations)
+        self.assertEqual(first.name, 'Example')
+        self.assertLess(stream.consumed, len(CODE))
+        declarations.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from ast_nodes import *
+from expresso_intern import HashConsFactory
+from expresso_native import parse_native
+from expresso_parse import parse_spans
+from expresso_table import NodeTable, np
+
+CODE = """
+type Example {
+    int exampleVar = log(0);
+    method doSomething(int a) {
+        log(a, b);
+        other(log(1));
+    }
+}
+method log(int message);
+int globalVar = log(2);
+"""
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestNodeTable(unittest.TestCase):
+
+    def setUp(self):
+        result, spans = parse_spans(CODE)
+        self.program = result.program
+        self.table = NodeTable(self.program, spans)
+
+    def test_rows_map_back_to_nodes(self):
+        table = self.table
+        self.assertIs(table.node(0), self.program)
+        self.assertEqual(table.parent[0], -1)
+        for row in range(1, len(table)):
+            parent = table.node(table.parent[row])
+            self.assertIn(table.node(row), [table.node(child) for child in table.children(table.parent[row])])
+            self.assertLess(table.parent[row], row)
+            self.assertLessEqual(table.end[row], table.end[table.parent[row]])
+            self.assertIsInstance(parent, ASTNode)
+
+    def test_structure(self):
+        table = self.table
+        self.assertEqual([type(table.node(row)) for row in table.children(0)],
+                         [TypeDeclaration, MethodDeclaration, VariableDeclaration])
+        self.assertEqual(table.end[0], len(table))
+        self.assertEqual(table.counts()['MethodCall'], 5)
+        self.assertEqual(sum(table.counts().values()), len(table))
+
+    def test_queries(self):
+        table = self.table
+        calls = table.rows(MethodCall, 'log')
+        self.assertEqual(len(calls), 4)
+        inside = table.inside(calls, table.rows(TypeDeclaration))
+        self.assertEqual([CODE[table.start[row]:table.stop[row]] for row in inside], ['log(0)', 'log(a, b)', 'log(1)'])
+        self.assertEqual(len(table.rows(MethodCall, 'missing')), 0)
+        self.assertEqual([table.names[table.name[row]] for row in table.rows(MethodDeclaration)],
+                         ['doSomething', 'log'])
+        references = table.rows(Factor, 'a')
+        self.assertEqual(len(references), 1)
+
+    def test_without_spans(self):
+        table = NodeTable(parse_native(CODE))
+        self.assertEqual(len(table), len(self.table))
+        self.assertTrue((table.start == -1).all())
+        self.assertTrue((table.kind == self.table.kind).all())
+
+    def test_interned_and_deep_trees(self):
+        interned = NodeTable(HashConsFactory().intern(self.program))
+        self.assertTrue((interned.kind == self.table.kind).all())
+        node = Factor(1)
+        for _ in range(50000):
+            node = Factor(Expression(Term(node)))
+        self.assertEqual(len(NodeTable(Program([node]))), 150002)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from antlr4 import CommonTokenStream, InputStream
+from ExpressoLexer import ExpressoLexer
+from expresso_parse import parse_program, parse_tree, LEXER_ARRAY
+from expresso_tokens import ArrayTokenStream
+from expresso_regex_lexer import RegexLexer
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a, float b) {
+        foo(a, 2) / 3;
+    }
+}
+"""
+
+class TestArrayTokenStream(unittest.TestCase):
+
+    def test_tokens_match_regex_lexer(self):
+        stream = ArrayTokenStream(CODE)
+        tokens = RegexLexer(CODE).getAllTokens()
+        self.assertEqual(stream.size, len(tokens) + 1)
+        for index, token in enumerate(tokens):
+            view = stream.get(index)
+            self.assertEqual((view.type, view.text, view.start, view.stop, view.line, view.column),
+                             (token.type, token.text, token.start, token.stop, token.line, token.column))
+        self.assertEqual(stream.get(stream.size - 1).text, '<EOF>')
+
+    def test_get_text(self):
+        stream = ArrayTokenStream("int x = 1;")
+        self.assertEqual(stream.getText(), "intx=1;")
+        self.assertEqual(stream.getText(stream.get(1), stream.get(2)), "x=")
+
+    def test_parse_program(self):
+        result = parse_program(CODE, lexer=LEXER_ARRAY)
+        self.assertEqual(result.program, parse_program(CODE).program)
+
+    def test_same_parse_tree_as_common_token_stream(self):
+        for source in (CODE, "method doSomething(int a b) { foo(1,, 2); }", "type A { ) int x; }", "type"):
+            expected, expected_stage = parse_tree(CommonTokenStream(ExpressoLexer(InputStream(source))))
+            tree, stage = parse_tree(ArrayTokenStream(source))
+            self.assertEqual(stage, expected_stage)
+            self.assertEqual(tree.toStringTree(recog=tree.parser), expected.toStringTree(recog=expected.parser))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from expresso_validate import validate, SyntaxIssue, KIND_LEXER, KIND_PARSER
+from test_expresso_native import CONFORMANCE_SOURCES
+
+
+class TestValidate(unittest.TestCase):
+
+    def test_valid_sources(self):
+        for code in CONFORMANCE_SOURCES:
+            if code.endswith(')'):
+                continue
+            with self.subTest(code=code):
+                self.assertEqual(validate(code), [])
+
+    def test_collects_every_error(self):
+        stderr = StringIO()
+        with redirect_stderr(stderr):
+            issues = validate("int x = ;\nmethod m( { 1 + ; }\nint y = 2 $ 3;")
+        self.assertEqual(stderr.getvalue(), "")
+        self.assertEqual([(issue.line, issue.column, issue.kind) for issue in issues], [
+            (1, 8, KIND_PARSER), (2, 10, KIND_PARSER), (2, 16, KIND_PARSER),
+            (3, 10, KIND_LEXER), (3, 12, KIND_PARSER)])
+        self.assertEqual(str(issues[1]), "line 2:10 missing ')' at '{'")
+        self.assertEqual(issues[3].offset, 40)
+
+    def test_trailing_tokens(self):
+        self.assertEqual(validate("type Example;\n)"), [
+            SyntaxIssue(2, 0, 14, "extraneous input ')' expecting <EOF>", KIND_PARSER)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from antlr4 import ParseTreeListener, ParseTreeWalker
+from antlr4.ParserRuleContext import ParserRuleContext
+from antlr4.Token import CommonToken
+from antlr4.tree.Tree import TerminalNodeImpl
+from expresso_listener import ExpressoListener
+from expresso_parse import parse_tree
+from expresso_tokens import ArrayTokenStream
+from expresso_walker import IterativeParseTreeWalker
+
+CODE = """
+type Example {
+    int exampleVar = 0;
+    method doSomething(int a, int b) {
+        foo(a, b < 2) + 2 * a - (b);
+    }
+}
+int globalVar = 0;
+"""
+
+# Records every event it is sent
+class RecordingListener(ParseTreeListener):
+
+    def __init__(self):
+        self.events = []
+
+    def visitTerminal(self, node):
+        self.events.append(('terminal', node.getText()))
+
+    def visitErrorNode(self, node):
+        self.events.append(('error', node.getText()))
+
+    def enterEveryRule(self, ctx):
+        self.events.append(('enter', id(ctx)))
+
+    def exitEveryRule(self, ctx):
+        self.events.append(('exit', id(ctx)))
+
+class TestIterativeParseTreeWalker(unittest.TestCase):
+
+    def walk(self, walker, listener, source):
+        tree, _ = parse_tree(ArrayTokenStream(source))
+        walker.walk(listener, tree)
+        return listener
+
+    def test_same_events_as_parse_tree_walker(self):
+        for source in (CODE, 'int x = ;', 'type A { ) int x; }'):
+            tree, _ = parse_tree(ArrayTokenStream(source))
+            expected = RecordingListener()
+            ParseTreeWalker().walk(expected, tree)
+            actual = RecordingListener()
+            IterativeParseTreeWalker().walk(actual, tree)
+            self.assertEqual(actual.events, expected.events, source)
+
+    def test_same_ast_as_parse_tree_walker(self):
+        expected = self.walk(ParseTreeWalker(), ExpressoListener(), CODE).stack
+        actual = self.walk(IterativeParseTreeWalker.DEFAULT, ExpressoListener(), CODE).stack
+        self.assertEqual(actual, expected)
+
+    def test_deep_tree(self):
+        depth = 100000
+        root = ctx = ParserRuleContext()
+        for _ in range(depth):
+            ctx = ctx.addChild(ParserRuleContext(ctx))
+        token = CommonToken(type=1)
+        token.text = 'x'
+        ctx.addTokenNode(token)
+        listener = RecordingListener()
+        IterativeParseTreeWalker.DEFAULT.walk(listener, root)
+        self.assertEqual(len(listener.events), 2 * (depth + 1) + 1)
+        self.assertEqual(listener.events[depth + 1], ('terminal', 'x'))
+        self.assertEqual(listener.events[0], ('enter', id(root)))
+        self.assertEqual(listener.events[-1], ('exit', id(root)))
+
+if __name__ == '__main__':
+    unittest.main()